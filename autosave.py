@@ -0,0 +1,54 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+import time
+
+import projectFile
+from canvas import Canvas
+
+class SaveTask(QRunnable):
+    def __init__(self, saver: "AutoSaver", filePath: str, name: str, projectType: str, canvas: Canvas, layers: list | None) -> None:
+        super().__init__()
+        self.saver = saver
+        self.filePath = filePath
+        self.name = name
+        self.projectType = projectType
+        self.canvas = canvas
+        self.layers = layers
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        try:
+            projectFile.saveProject(self.filePath, self.name, self.projectType, self.canvas, layers=self.layers)
+        except Exception as e:
+            self.saver.failed.emit(self.filePath, str(e))
+            return
+
+        self.saver.saved.emit(self.filePath, (time.perf_counter() - start)*1000)
+
+class AutoSaver(QObject):
+    """Encodes and writes project snapshots on a worker thread, one save at a time"""
+
+    #file path, save duration in ms
+    saved = pyqtSignal(str, float)
+    #file path, error message
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, parent: QObject = None) -> None:
+        super().__init__(parent)
+        self.busy = False
+        self.saved.connect(self.finished)
+        self.failed.connect(self.finished)
+
+    def finished(self) -> None:
+        self.busy = False
+
+    def save(self, filePath: str, name: str, projectType: str, canvas: Canvas, layers: list | None = None) -> bool:
+        """Starts saving canvas in background, canvas and layers must not be modified afterwards
+
+        Returns:
+            bool: False if previous save is still running and nothing was started
+        """
+        if self.busy: return False
+        self.busy = True
+        QThreadPool.globalInstance().start(SaveTask(self, filePath, name, projectType, canvas, layers))
+        return True
@@ -0,0 +1,82 @@
+"""Measures saving and loading of a project in the pickled v2 format and in .dpct v3 raw and zlib,
+and reading palette indices of raw tiles with and without memory mapping
+
+Usage: python benchmarks/fileFormat.py --size 500 500 --colors 12 --runs 30
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import numpy as np
+
+#modules of the app live in the repository root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import projectFile
+from canvas import Canvas
+from exporter import ensureGuiApplication
+
+def makeDesign(size: tuple[int, int], colorCount: int, blockSize: int = 10) -> Canvas:
+    """Blocky design of random colors, close to a real pattern made of larger areas of a single color"""
+    width, height = size
+    random = np.random.default_rng(1)
+    palette = random.integers(0, 256, (colorCount, 3)).astype(np.uint8)
+    blocks = random.integers(0, colorCount, (-(-height//blockSize), -(-width//blockSize)))
+    pixels = palette[blocks].repeat(blockSize, axis=0).repeat(blockSize, axis=1)
+    return Canvas.fromArray(np.ascontiguousarray(pixels[:height, :width]))
+
+def measure(function, runs: int) -> float:
+    """Mean time of a single call in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(runs): function()
+    return (time.perf_counter()-start)/runs*1000
+
+def saveLegacyProject(filePath: str, canvas: Canvas) -> None:
+    """Saves project the way 2.0 did, as a pickled PickablePixmap"""
+    from PyQt5.QtGui import QPixmap
+    from customWidgets import PickablePixmap
+
+    projectData = {
+        "version": "2.0",
+        "type": "bracelet",
+        "size": canvas.size,
+        "contents": PickablePixmap(QPixmap.fromImage(canvas.toImage())),
+        "name": "benchmark",
+    }
+    with open(filePath, "wb") as file:
+        pickle.dump(projectData, file)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures saving and loading of project file formats")
+    parser.add_argument("--size", type=int, nargs=2, default=[500, 500], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--colors", type=int, default=12, help="Number of colors in the design")
+    parser.add_argument("--runs", type=int, default=30, help="Runs of every measurement")
+    args = parser.parse_args()
+
+    #legacy pixmaps need a running QGuiApplication
+    ensureGuiApplication()
+    canvas = makeDesign(tuple(args.size), args.colors)
+
+    with tempfile.TemporaryDirectory() as directory:
+        formats = [
+            ("v2 pickle+PNG", lambda filePath: saveLegacyProject(filePath, canvas)),
+            ("v3 zlib", lambda filePath: projectFile.saveProject(filePath, "benchmark", "bracelet", canvas)),
+            ("v3 raw", lambda filePath: projectFile.saveProject(filePath, "benchmark", "bracelet", canvas, projectFile.COMPRESSION_RAW)),
+        ]
+        print(f"{args.size[0]}x{args.size[1]}, {args.colors} colors, mean of {args.runs} runs")
+        for number, (name, save) in enumerate(formats):
+            filePath = os.path.join(directory, f"{number}.dpct")
+            saveTime = measure(lambda: save(filePath), args.runs)
+            loadTime = measure(lambda: projectFile.loadProject(filePath), args.runs)
+            print(f"{name:>14}: save {saveTime:6.1f} ms, load {loadTime:6.1f} ms, {os.path.getsize(filePath)/1024:8.1f} KB")
+
+        #palette indices alone, which is what memory mapping of raw tiles saves on
+        filePath = os.path.join(directory, f"{len(formats)-1}.dpct")
+        for name, mmap in (("raw read", False), ("raw mmap", True)):
+            loadTime = measure(lambda: projectFile.loadPixelIndices(filePath, mmap), args.runs)
+            print(f"{name:>14}: indices {loadTime:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
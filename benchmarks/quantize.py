@@ -0,0 +1,56 @@
+"""Measures every step of turning a photo into a project: downsampling, palette search, mapping and dithering
+
+Usage: python benchmarks/quantize.py --size 500 500 --colors 16 --runs 10
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+#modules of the app live in the repository root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.quantize
+
+def makePhoto(width: int, height: int) -> np.ndarray:
+    """Smooth gradients with noise, close to a real photo, which has many colors but few sharp edges"""
+    ys, xs = np.mgrid[0:height, 0:width] / max(width, height)
+    channels = [np.sin(xs*5 + ys*2), np.cos(xs*3 - ys*4), np.sin((xs+ys)*7)]
+    pixels = (np.stack(channels, axis=2) + 1) * 120
+    pixels += np.random.default_rng(1).normal(0, 8, pixels.shape)
+    return np.clip(pixels, 0, 255).astype(np.uint8)
+
+def measure(function, runs: int) -> float:
+    """Mean time of a single call in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(runs): function()
+    return (time.perf_counter()-start)/runs*1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures photo import steps")
+    parser.add_argument("--size", type=int, nargs=2, default=[500, 500], metavar=("WIDTH", "HEIGHT"), help="Size of the project")
+    parser.add_argument("--colors", type=int, default=16, help="Number of colors of the palette")
+    parser.add_argument("--runs", type=int, default=10, help="Runs of every measurement")
+    args = parser.parse_args()
+
+    width, height = args.size
+    #photo is imported from a larger image, like it is in the new project window
+    photo = makePhoto(2*width, 2*height)
+    pixels = tools.quantize.downsample(photo, width, height)
+    palette = tools.quantize.kMeans(pixels, args.colors)
+
+    steps = [
+        ("downsample", lambda: tools.quantize.downsample(photo, width, height)),
+        ("median cut", lambda: tools.quantize.medianCut(pixels, args.colors)),
+        ("k-means", lambda: tools.quantize.kMeans(pixels, args.colors)),
+        ("catalogue", lambda: tools.quantize.limitPalette(pixels, tools.quantize.getCataloguePalette(), args.colors)),
+        ("map", lambda: tools.quantize.mapToPalette(pixels, palette)),
+        ("dithering", lambda: tools.quantize.floydSteinberg(pixels, palette)),
+    ]
+    print(f"{width}x{height}, {args.colors} colors, mean of {args.runs} runs")
+    for name, step in steps:
+        print(f"{name:>14}: {measure(step, args.runs):6.1f} ms")
+
+if __name__ == "__main__":
+    main()
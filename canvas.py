@@ -0,0 +1,348 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import numpy as np
+
+TILESIZE = 64
+
+def imageToArray(image: QImage) -> np.ndarray:
+    """Copies a QImage into (height, width, 3) RGB array, one image pixel becomes one bead"""
+    image = image.convertToFormat(QImage.Format_RGB888)
+    width, height = image.width(), image.height()
+
+    bits = image.constBits()
+    bits.setsize(image.bytesPerLine() * height)
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(height, image.bytesPerLine())
+    return rows[:, :width*3].reshape(height, width, 3).copy()
+
+class Canvas:
+    """Project-resolution pixel buffer. Every tool writes here, the zoomed view is derived from it
+
+    Pixels are stored in TILESIZE x TILESIZE tiles and tiles holding only the background color are not
+    stored at all, so memory use follows how much of the project is drawn, not its size
+    """
+
+    def __init__(self, width: int, height: int, color: tuple[int, int, int] = (255, 255, 255)) -> None:
+        self.width = width
+        self.height = height
+        self.setBackground(color)
+        #tile xy -> (TILESIZE, TILESIZE, 3) pixels, parts of edge tiles outside of the canvas stay background
+        self.tiles = {}
+        self.revision = 0
+        #called with (n, 2) array of tile xy coordinates right before those tiles change
+        self.writeListeners = []
+        #called with (n, 2) array of tile xy coordinates right after those tiles changed
+        self.changeListeners = []
+
+    @classmethod
+    def fromArray(cls, data: np.ndarray, background: tuple[int, int, int] | None = None) -> "Canvas":
+        """Creates canvas from (height, width, 3) RGB array, the array is copied
+
+        Args:
+            data (np.ndarray): (height, width, 3) RGB pixels
+            background (tuple[int, int, int] | None, optional): Color that is not stored. Defaults to color of the top left pixel.
+        """
+        height, width = data.shape[:2]
+        if background is None: background = tuple(int(x) for x in data[0, 0])
+        canvas = cls(width, height, background)
+
+        for tile in canvas.getRectTiles(0, 0, width, height).tolist():
+            rows, columns = canvas.getTileSlice(tile)
+            pixels = data[rows, columns]
+            if (pixels != canvas.background).any():
+                canvas.materializeTile(tuple(tile))[:pixels.shape[0], :pixels.shape[1]] = pixels
+        return canvas
+
+    @classmethod
+    def fromImage(cls, image: QImage) -> "Canvas":
+        """Creates canvas from a QImage, one image pixel becomes one bead
+
+        Args:
+            image (QImage): Image in project resolution
+
+        Returns:
+            Canvas: New canvas with copied image data
+        """
+        return cls.fromArray(imageToArray(image))
+
+    def setBackground(self, color: tuple[int, int, int]) -> None:
+        self.background = tuple(int(x) for x in color)
+        #new tiles are copied from this one
+        self.backgroundTile = np.empty((TILESIZE, TILESIZE, 3), dtype=np.uint8)
+        self.backgroundTile[:] = self.background
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by stored tiles"""
+        return len(self.tiles) * TILESIZE*TILESIZE*3
+
+    def copy(self) -> "Canvas":
+        """Returns canvas with copied tiles and no listeners"""
+        canvas = Canvas(self.width, self.height, self.background)
+        canvas.tiles = {tile: pixels.copy() for tile, pixels in self.tiles.items()}
+        canvas.revision = self.revision
+        return canvas
+
+    def toArray(self) -> np.ndarray:
+        """Returns (height, width, 3) RGB array with all pixels of the canvas"""
+        data = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        data[:] = self.background
+        for tile, pixels in self.tiles.items():
+            rows, columns = self.getTileSlice(tile)
+            target = data[rows, columns]
+            target[:] = pixels[:target.shape[0], :target.shape[1]]
+        return data
+
+    def toImage(self) -> QImage:
+        """Returns QImage of the whole canvas owning its memory"""
+        data = self.toArray()
+        return QImage(data.data, self.width, self.height, self.width*3, QImage.Format_RGB888).copy()
+
+    def getTileImage(self, tile: tuple[int, int]) -> QImage | None:
+        """Returns QImage sharing memory with a stored tile, None if the tile holds only background
+
+        The image always has TILESIZE x TILESIZE pixels, even on the right and bottom edge
+        """
+        pixels = self.tiles.get(tile)
+        if pixels is None: return None
+        return QImage(pixels.data, TILESIZE, TILESIZE, TILESIZE*3, QImage.Format_RGB888)
+
+    def sample(self, columns: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Returns pixels at every combination of sorted columns and rows, used to scale the canvas down
+
+        Returns:
+            np.ndarray: (len(rows), len(columns), 3) RGB pixels
+        """
+        result = np.empty((len(rows), len(columns), 3), dtype=np.uint8)
+        result[:] = self.background
+        for (tileX, tileY), pixels in self.tiles.items():
+            x, y = tileX*TILESIZE, tileY*TILESIZE
+            first, last = np.searchsorted(rows, (y, y+TILESIZE))
+            left, right = np.searchsorted(columns, (x, x+TILESIZE))
+            if first == last or left == right: continue
+            result[first:last, left:right] = pixels[rows[first:last]-y][:, columns[left:right]-x]
+        return result
+
+    def contains(self, pixel: tuple[int, int]) -> bool:
+        return 0 <= pixel[0] < self.width and 0 <= pixel[1] < self.height
+
+    def getPixel(self, pixel: tuple[int, int]) -> tuple[int, int, int]:
+        pixels = self.tiles.get((pixel[0]//TILESIZE, pixel[1]//TILESIZE))
+        if pixels is None: return self.background
+        return tuple(int(x) for x in pixels[pixel[1] % TILESIZE, pixel[0] % TILESIZE])
+
+    def getRow(self, y: int) -> np.ndarray:
+        """Returns (width, 3) copy of pixels of a single row"""
+        tilesX = self.tileCount[0]
+        row = np.empty((tilesX*TILESIZE, 3), dtype=np.uint8)
+        row[:] = self.background
+        for tileX in range(tilesX):
+            pixels = self.tiles.get((tileX, y//TILESIZE))
+            if pixels is not None: row[tileX*TILESIZE:(tileX+1)*TILESIZE] = pixels[y % TILESIZE]
+        return row[:self.width]
+
+    def setPixels(self, points: np.ndarray, color: tuple[int, int, int]) -> np.ndarray:
+        """Colors all points that are inside of the canvas
+
+        Args:
+            points (np.ndarray): (n, 2) array of xy coordinates
+            color (tuple[int, int, int]): RGB color
+
+        Returns:
+            np.ndarray: Points that were actually painted
+        """
+        points = np.asarray(points, dtype=np.intp).reshape(-1, 2)
+        inside = (points[:, 0] >= 0) & (points[:, 0] < self.width) & (points[:, 1] >= 0) & (points[:, 1] < self.height)
+        points = points[inside]
+        if len(points) == 0: return points
+
+        #points grouped by tile, so every tile is written with a single assignment
+        tilesX = self.tileCount[0]
+        keys = points[:, 1]//TILESIZE*tilesX + points[:, 0]//TILESIZE
+        order = np.argsort(keys, kind="stable")
+        points, keys = points[order], keys[order]
+        tileKeys, starts = np.unique(keys, return_index=True)
+        tiles = np.stack((tileKeys % tilesX, tileKeys // tilesX), axis=1)
+
+        self.notifyWrite(tiles)
+        erasing = tuple(color) == self.background
+        for tile, start, end in zip(map(tuple, tiles.tolist()), starts, np.append(starts[1:], len(points))):
+            if erasing and tile not in self.tiles: continue
+            tilePoints = points[start:end] % TILESIZE
+            self.materializeTile(tile)[tilePoints[:, 1], tilePoints[:, 0]] = color
+        if erasing: self.dropBackgroundTiles(tiles)
+        self.revision += 1
+        self.notifyChange(tiles)
+        return points
+
+    def setRuns(self, runs: list, color: tuple[int, int, int]) -> np.ndarray:
+        """Colors horizontal runs of pixels, as returned by flood fill
+
+        Args:
+            runs (list): (y, first x, last x) runs, both ends are included
+            color (tuple[int, int, int]): RGB color
+
+        Returns:
+            np.ndarray: (n, 2) array of xy coordinates of written tiles
+        """
+        tilesX = self.tileCount[0]
+        #runs are drawn into masks of whole rows of tiles, which are then cut into single tiles
+        bands = {}
+        for y, start, end in runs:
+            if y not in range(self.height): continue
+            band = bands.get(y//TILESIZE)
+            if band is None:
+                band = bands[y//TILESIZE] = np.zeros((TILESIZE, tilesX*TILESIZE), dtype=bool)
+            band[y % TILESIZE, max(start, 0):min(end+1, self.width)] = True
+
+        masks = {}
+        for tileY, band in bands.items():
+            band = band.reshape(TILESIZE, tilesX, TILESIZE)
+            for tileX in np.flatnonzero(band.any(axis=(0, 2))).tolist():
+                masks[tileX, tileY] = band[:, tileX]
+        tiles = np.array(list(masks), dtype=np.intp).reshape(-1, 2)
+        if len(tiles) == 0: return tiles
+
+        self.notifyWrite(tiles)
+        erasing = tuple(color) == self.background
+        for tile, mask in masks.items():
+            if erasing and tile not in self.tiles: continue
+            pixels = self.materializeTile(tile)
+            if mask.all(): pixels[:] = color
+            else: pixels[mask] = color
+        if erasing: self.dropBackgroundTiles(tiles)
+        self.revision += 1
+        self.notifyChange(tiles)
+        return tiles
+
+    @property
+    def tileCount(self) -> tuple[int, int]:
+        return -(-self.width // TILESIZE), -(-self.height // TILESIZE)
+
+    def getRectTiles(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """Returns (n, 2) array of xy coordinates of tiles overlapping rect, right and bottom are excluded"""
+        columns = np.arange(left//TILESIZE, (right-1)//TILESIZE+1)
+        rows = np.arange(top//TILESIZE, (bottom-1)//TILESIZE+1)
+        return np.stack(np.meshgrid(columns, rows), axis=-1).reshape(-1, 2)
+
+    def readRect(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """Returns copy of pixels of a rect lying inside of the canvas, right and bottom are excluded"""
+        result = np.empty((bottom-top, right-left, 3), dtype=np.uint8)
+        result[:] = self.background
+        for tileX, tileY in self.getRectTiles(left, top, right, bottom).tolist():
+            pixels = self.tiles.get((tileX, tileY))
+            if pixels is None: continue
+            x, y = tileX*TILESIZE, tileY*TILESIZE
+            tileLeft, tileTop = max(left, x), max(top, y)
+            tileRight, tileBottom = min(right, x+TILESIZE), min(bottom, y+TILESIZE)
+            result[tileTop-top:tileBottom-top, tileLeft-left:tileRight-left] = pixels[tileTop-y:tileBottom-y, tileLeft-x:tileRight-x]
+        return result
+
+    def getRegion(self, position: tuple[int, int], size: tuple[int, int]) -> tuple[tuple[int, int], np.ndarray] | None:
+        """Returns position and copy of the part of rect lying inside of the canvas, None if there is none"""
+        x, y = position
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x+size[0], self.width), min(y+size[1], self.height)
+        if right <= left or bottom <= top: return None
+        return (left, top), self.readRect(left, top, right, bottom)
+
+    def setRegion(self, position: tuple[int, int], pixels: np.ndarray, mask: np.ndarray | None = None) -> None:
+        """Writes block of pixels with a single slice assignment per tile, the part outside of the canvas is dropped
+
+        Args:
+            position (tuple[int, int]): xy coordinates of the top left pixel of the block
+            pixels (np.ndarray): (height, width, 3) RGB pixels
+            mask (np.ndarray | None, optional): (height, width) mask of pixels to write. Defaults to all of them.
+        """
+        x, y = position
+        height, width = pixels.shape[:2]
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x+width, self.width), min(y+height, self.height)
+        if right <= left or bottom <= top: return
+
+        tiles = self.getRectTiles(left, top, right, bottom)
+        self.notifyWrite(tiles)
+        for tileX, tileY in tiles.tolist():
+            tileLeft, tileTop = tileX*TILESIZE, tileY*TILESIZE
+            #part of the block lying on this tile, in project coordinates
+            partLeft, partTop = max(left, tileLeft), max(top, tileTop)
+            partRight, partBottom = min(right, tileLeft+TILESIZE), min(bottom, tileTop+TILESIZE)
+            source = slice(partTop-y, partBottom-y), slice(partLeft-x, partRight-x)
+            if mask is not None and not mask[source].any(): continue
+
+            target = self.materializeTile((tileX, tileY))[partTop-tileTop:partBottom-tileTop, partLeft-tileLeft:partRight-tileLeft]
+            if mask is None: target[:] = pixels[source]
+            else: np.copyto(target, pixels[source], where=mask[source][..., None])
+        self.dropBackgroundTiles(tiles)
+        self.revision += 1
+        self.notifyChange(tiles)
+
+    def fill(self, color: tuple[int, int, int]) -> None:
+        """Fills the whole canvas with a single color, which becomes its background"""
+        tiles = self.getRectTiles(0, 0, self.width, self.height)
+        self.notifyWrite(tiles)
+        self.tiles = {}
+        self.setBackground(color)
+        self.revision += 1
+        self.notifyChange(tiles)
+
+    def notifyWrite(self, tiles: np.ndarray) -> None:
+        for listener in self.writeListeners:
+            listener(tiles)
+
+    def notifyChange(self, tiles: np.ndarray) -> None:
+        for listener in self.changeListeners:
+            listener(tiles)
+
+    def materializeTile(self, tile: tuple[int, int]) -> np.ndarray:
+        """Returns stored pixels of a tile, tiles holding only background are created on first write"""
+        pixels = self.tiles.get(tile)
+        if pixels is None: pixels = self.tiles[tile] = self.backgroundTile.copy()
+        return pixels
+
+    def dropBackgroundTiles(self, tiles: np.ndarray) -> None:
+        """Frees tiles that were written back to background only"""
+        for tile in map(tuple, tiles.tolist()):
+            pixels = self.tiles.get(tile)
+            if pixels is not None and np.array_equal(pixels, self.backgroundTile): del self.tiles[tile]
+
+    def getTileSlice(self, tile: tuple[int, int]) -> tuple[slice, slice]:
+        """Returns slices of the tile in project coordinates, cut to the canvas"""
+        x, y = tile[0]*TILESIZE, tile[1]*TILESIZE
+        return slice(y, min(y+TILESIZE, self.height)), slice(x, min(x+TILESIZE, self.width))
+
+    def getTileView(self, tile: tuple[int, int]) -> np.ndarray | None:
+        """Returns stored pixels of a tile cut to the canvas without copying, None if it holds only background"""
+        pixels = self.tiles.get(tile)
+        if pixels is None: return None
+        rows, columns = self.getTileSlice(tile)
+        return pixels[:rows.stop-rows.start, :columns.stop-columns.start]
+
+    def getTile(self, tile: tuple[int, int]) -> np.ndarray:
+        """Returns a copy of tile contents, tiles on the right and bottom edge can be smaller"""
+        pixels = self.getTileView(tile)
+        if pixels is not None: return pixels.copy()
+
+        rows, columns = self.getTileSlice(tile)
+        return self.backgroundTile[:rows.stop-rows.start, :columns.stop-columns.start].copy()
+
+    def setTile(self, tile: tuple[int, int], data: np.ndarray | None) -> None:
+        """Overwrites tile contents, None fills it with background
+
+        Args:
+            tile (tuple[int, int]): xy coordinates of the tile
+            data (np.ndarray | None): Pixels shaped like getTile() returns them
+        """
+        tiles = np.array([tile])
+        self.notifyWrite(tiles)
+        if data is None:
+            self.tiles.pop(tile, None)
+        else:
+            self.materializeTile(tile)[:data.shape[0], :data.shape[1]] = data
+            self.dropBackgroundTiles(tiles)
+        self.revision += 1
+        self.notifyChange(tiles)
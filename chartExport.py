@@ -0,0 +1,217 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtSvg import QSvgGenerator
+import os
+import numpy as np
+
+from canvas import Canvas
+from colorStats import packColors
+
+SYMBOLS = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789abdefghknqrtxyz+=#%&@*?<>"
+
+def getSymbol(index: int) -> str:
+    """Returns symbol for index-th color of the legend, single characters come first, then all pairs of them,
+    then triples and so on, so every color gets a distinct symbol"""
+    symbol = ""
+    index += 1
+    while index > 0:
+        index, digit = divmod(index-1, len(SYMBOLS))
+        symbol = SYMBOLS[digit] + symbol
+    return symbol
+
+def getTextColor(color: tuple[int, int, int]) -> QColor:
+    return QColor(Qt.black) if sum(color) > 382 else QColor(Qt.white)
+
+class BeadChart:
+    """Printable chart of a project: colored cells with symbols, row and column numbers and a legend
+
+    Pages are rendered one at a time, each reading only its block of the canvas, so memory use
+    does not depend on the size of the pattern
+    """
+
+    def __init__(self, canvas: Canvas, name: str, totals: list, cellSize: float = 4, majorInterval: int = 10) -> None:
+        """
+        Args:
+            canvas (Canvas): Composite of the project
+            name (str): Project name, printed on every page
+            totals (list): (color, count) pairs from ColorStatistics.getTotals(), the legend keeps their order
+            cellSize (float, optional): Size of one bead in mm. Defaults to 4.
+            majorInterval (int, optional): Every majorInterval-th grid line is thicker. Defaults to 10.
+        """
+        self.canvas = canvas
+        self.name = name
+        self.totals = totals
+        self.cellSize = cellSize
+        self.majorInterval = majorInterval
+
+        #sorted packed colors and their legend index, used to look up symbols of a page
+        packed = np.array([color[0] << 16 | color[1] << 8 | color[2] for color, _ in totals], dtype=np.uint32)
+        order = np.argsort(packed)
+        self.packedColors = packed[order]
+        self.legendIndices = order
+        self.symbols = [getSymbol(index) for index in range(len(totals))]
+        self.colors = [QColor(*color) for color, _ in totals]
+        self.textColors = [getTextColor(color) for color, _ in totals]
+
+    #!Layout, all sizes are in device units
+    def setupLayout(self, pageSize: QSize, resolution: int) -> None:
+        self.dotsPerMm = resolution/25.4
+        self.pageSize = pageSize
+        self.cell = self.cellSize*self.dotsPerMm
+        self.labelSize = self.cell*1.5
+        self.headerSize = 8*self.dotsPerMm
+
+        self.columnsPerPage = max(1, int((pageSize.width() - self.labelSize) // self.cell))
+        self.rowsPerPage = max(1, int((pageSize.height() - self.headerSize - self.labelSize) // self.cell))
+        self.legendRowHeight = 6*self.dotsPerMm
+        self.legendRowsPerPage = max(1, int((pageSize.height() - self.headerSize) // self.legendRowHeight))
+
+    def getPages(self) -> list:
+        """Returns list of pages, ("legend", first, last) or ("chart", top, left)"""
+        width, height = self.canvas.size
+        pages = [("legend", first, min(first+self.legendRowsPerPage, len(self.totals)))
+                 for first in range(0, max(len(self.totals), 1), self.legendRowsPerPage)]
+        pages += [("chart", top, left) for top in range(0, height, self.rowsPerPage)
+                                       for left in range(0, width, self.columnsPerPage)]
+        return pages
+
+    #!Rendering
+    def getFont(self, size: float, bold: bool = False) -> QFont:
+        font = QFont("Arial")
+        font.setPixelSize(max(1, int(size)))
+        font.setBold(bold)
+        return font
+
+    def paintHeader(self, painter: QPainter, text: str, pageNumber: int, pageCount: int) -> None:
+        painter.setPen(QColor(Qt.black))
+        painter.setFont(self.getFont(self.headerSize*0.5, True))
+        rect = QRectF(0, 0, self.pageSize.width(), self.headerSize*0.8)
+        painter.drawText(rect, Qt.AlignLeft|Qt.AlignVCenter, f"{self.name} - {text}")
+        painter.drawText(rect, Qt.AlignRight|Qt.AlignVCenter, f"{pageNumber}/{pageCount}")
+
+    def paintLegend(self, painter: QPainter, first: int, last: int) -> None:
+        painter.setFont(self.getFont(self.legendRowHeight*0.55))
+        rowHeight = self.legendRowHeight
+
+        for row, index in enumerate(range(first, last)):
+            color, count = self.totals[index]
+            y = self.headerSize + row*rowHeight
+            swatch = QRectF(0, y + rowHeight*0.1, rowHeight*1.6, rowHeight*0.8)
+
+            painter.setPen(QColor(Qt.black))
+            painter.setBrush(QColor(*color))
+            painter.drawRect(swatch)
+            painter.setPen(getTextColor(color))
+            painter.drawText(swatch, Qt.AlignCenter, self.symbols[index])
+
+            painter.setPen(QColor(Qt.black))
+            text = "#%02x%02x%02x    %d" % (*color, count)
+            painter.drawText(QRectF(rowHeight*2, y, self.pageSize.width(), rowHeight), Qt.AlignLeft|Qt.AlignVCenter, text)
+
+    def paintChart(self, painter: QPainter, top: int, left: int) -> None:
+        _, block = self.canvas.getRegion((left, top), (self.columnsPerPage, self.rowsPerPage))
+        rows, columns = block.shape[:2]
+        indices = self.legendIndices[np.searchsorted(self.packedColors, packColors(block))].tolist()
+        originX, originY = self.labelSize, self.headerSize + self.labelSize
+        cell = self.cell
+
+        painter.setPen(Qt.NoPen)
+        painter.setFont(self.getFont(cell*0.6))
+        for y in range(rows):
+            for x in range(columns):
+                index = indices[y][x]
+                rect = QRectF(originX + x*cell, originY + y*cell, cell, cell)
+                painter.fillRect(rect, self.colors[index])
+                painter.setPen(self.textColors[index])
+                painter.drawText(rect, Qt.AlignCenter, self.symbols[index])
+
+        #grid, lines on multiples of majorInterval are thicker
+        thinPen = QPen(QColor(Qt.black), self.dotsPerMm*0.1)
+        thickPen = QPen(QColor(Qt.black), self.dotsPerMm*0.4)
+        for x in range(columns+1):
+            painter.setPen(thickPen if (left+x) % self.majorInterval == 0 else thinPen)
+            painter.drawLine(QPointF(originX + x*cell, originY), QPointF(originX + x*cell, originY + rows*cell))
+        for y in range(rows+1):
+            painter.setPen(thickPen if (top+y) % self.majorInterval == 0 else thinPen)
+            painter.drawLine(QPointF(originX, originY + y*cell), QPointF(originX + columns*cell, originY + y*cell))
+
+        #numbers of rows and columns, counted from 1
+        painter.setPen(QColor(Qt.black))
+        painter.setFont(self.getFont(cell*0.45))
+        for x in range(columns):
+            rect = QRectF(originX + x*cell, originY - self.labelSize, cell, self.labelSize)
+            painter.drawText(rect, Qt.AlignCenter, str(left+x+1))
+        for y in range(rows):
+            rect = QRectF(0, originY + y*cell, self.labelSize, cell)
+            painter.drawText(rect, Qt.AlignCenter, str(top+y+1))
+
+    def paintPage(self, painter: QPainter, page: tuple, pageNumber: int, pageCount: int) -> None:
+        kind, first, second = page
+        if kind == "legend":
+            width, height = self.canvas.size
+            self.paintHeader(painter, f"legenda ({width} x {height})", pageNumber, pageCount)
+            self.paintLegend(painter, first, second)
+            return
+
+        rows = min(self.rowsPerPage, self.canvas.height - first)
+        columns = min(self.columnsPerPage, self.canvas.width - second)
+        self.paintHeader(painter, f"rzedy {first+1}-{first+rows}, kolumny {second+1}-{second+columns}", pageNumber, pageCount)
+        self.paintChart(painter, first, second)
+
+    #!Output
+    def writePdf(self, filePath: str, resolution: int = 300, progress = None) -> int:
+        """Writes chart to an A4 pdf, every page is sent to the file before the next one is rendered
+
+        Args:
+            filePath (str): File path
+            resolution (int, optional): Resolution in dpi. Defaults to 300.
+            progress (optional): Called with (page, pageCount) after every page. Defaults to None.
+
+        Returns:
+            int: Number of written pages
+        """
+        writer = QPdfWriter(filePath)
+        writer.setResolution(resolution)
+        writer.setPageSize(QPageSize(QPageSize.A4))
+        writer.setPageMargins(QMarginsF(10, 10, 10, 10), QPageLayout.Millimeter)
+        writer.setTitle(self.name)
+        self.setupLayout(QSize(writer.width(), writer.height()), resolution)
+
+        pages = self.getPages()
+        painter = QPainter(writer)
+        try:
+            for number, page in enumerate(pages):
+                if number != 0: writer.newPage()
+                self.paintPage(painter, page, number+1, len(pages))
+                if progress is not None: progress(number+1, len(pages))
+        finally:
+            painter.end()
+        return len(pages)
+
+    def writeSvg(self, filePath: str, resolution: int = 96, progress = None) -> int:
+        """Writes chart to svg files of A4 size, one per page, named name-1.svg, name-2.svg...
+
+        Returns:
+            int: Number of written pages
+        """
+        pageSize = QSizeF(190, 277)*resolution/25.4
+        self.setupLayout(pageSize.toSize(), resolution)
+        base = os.path.splitext(filePath)[0]
+
+        pages = self.getPages()
+        for number, page in enumerate(pages):
+            generator = QSvgGenerator()
+            generator.setFileName(f"{base}-{number+1}.svg")
+            generator.setResolution(resolution)
+            generator.setSize(pageSize.toSize())
+            generator.setViewBox(QRect(QPoint(0, 0), pageSize.toSize()))
+            generator.setTitle(self.name)
+
+            painter = QPainter(generator)
+            try:
+                self.paintPage(painter, page, number+1, len(pages))
+            finally:
+                painter.end()
+            if progress is not None: progress(number+1, len(pages))
+        return len(pages)
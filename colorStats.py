@@ -0,0 +1,98 @@
+import csv
+import numpy as np
+
+from canvas import Canvas
+
+def packColors(pixels: np.ndarray) -> np.ndarray:
+    """Packs (..., 3) RGB pixels into single 0xRRGGBB integers"""
+    return pixels[..., 0].astype(np.uint32) << 16 | pixels[..., 1].astype(np.uint32) << 8 | pixels[..., 2]
+
+def unpackColor(color: int) -> tuple[int, int, int]:
+    return color >> 16 & 255, color >> 8 & 255, color & 255
+
+def countRows(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Counts colors in every row of pixels in one vectorized pass
+
+    Args:
+        pixels (np.ndarray): (height, width, 3) RGB pixels
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (k,) packed colors and (height, k) counts of each color in each row
+    """
+    height, width = pixels.shape[:2]
+    colors, inverse = np.unique(packColors(pixels), return_inverse=True)
+    rows = np.repeat(np.arange(height), width)
+    counts = np.bincount(rows*len(colors) + inverse.ravel(), minlength=height*len(colors))
+    return colors, counts.reshape(height, len(colors))
+
+class ColorStatistics:
+    """Bead count of every color, per row, kept up to date as tiles of the canvas change
+
+    Tiles about to change are subtracted right away and counted again on refresh(),
+    so updating costs as much as the change, not the whole canvas
+    """
+
+    def __init__(self, canvas: Canvas) -> None:
+        self.canvas = canvas
+        self.rowCounts = {}
+        self.staleTiles = set()
+
+        #whole canvas is counted as background first, then stored tiles replace their part of it
+        self.addColor(canvas.background, slice(0, canvas.height), canvas.width)
+        for tile in list(canvas.tiles):
+            rows, columns = canvas.getTileSlice(tile)
+            self.addColor(canvas.background, rows, -(columns.stop-columns.start))
+            self.addRegion(canvas.getTileView(tile), rows.start, 1)
+        canvas.writeListeners.append(self.tilesChanged)
+
+    def addRegion(self, pixels: np.ndarray, top: int, sign: int) -> None:
+        colors, counts = countRows(pixels)
+        for index, color in enumerate(colors.tolist()):
+            if color not in self.rowCounts:
+                self.rowCounts[color] = np.zeros(self.canvas.height, dtype=np.int64)
+            self.rowCounts[color][top:top+len(counts)] += sign*counts[:, index]
+
+    def addColor(self, color: tuple[int, int, int], rows: slice, count: int) -> None:
+        """Adds count beads of a single color to every row in rows"""
+        color = color[0] << 16 | color[1] << 8 | color[2]
+        if color not in self.rowCounts:
+            self.rowCounts[color] = np.zeros(self.canvas.height, dtype=np.int64)
+        self.rowCounts[color][rows] += count
+
+    def addTile(self, tile: tuple[int, int], sign: int) -> None:
+        rows, columns = self.canvas.getTileSlice(tile)
+        pixels = self.canvas.getTileView(tile)
+        if pixels is None: self.addColor(self.canvas.background, rows, sign*(columns.stop-columns.start))
+        else: self.addRegion(pixels, rows.start, sign)
+
+    def tilesChanged(self, tiles: np.ndarray) -> None:
+        for tile in map(tuple, tiles.tolist()):
+            if tile in self.staleTiles: continue
+            self.staleTiles.add(tile)
+            self.addTile(tile, -1)
+
+    def refresh(self) -> None:
+        """Counts tiles changed since last refresh"""
+        for tile in self.staleTiles:
+            self.addTile(tile, 1)
+        self.staleTiles = set()
+
+        for color in [color for color, counts in self.rowCounts.items() if not counts.any()]:
+            del self.rowCounts[color]
+
+    def getTotals(self) -> list:
+        """Returns list of (color, count) sorted from the most used color"""
+        self.refresh()
+        totals = [(unpackColor(color), int(counts.sum())) for color, counts in self.rowCounts.items()]
+        return sorted(totals, key=lambda total: total[1], reverse=True)
+
+    def exportCsv(self, filePath: str) -> None:
+        """Writes bead count of every color, in total and for each row"""
+        self.refresh()
+        with open(filePath, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Kolor", "R", "G", "B", "Razem"] + [f"Rzad {row+1}" for row in range(self.canvas.height)])
+
+            for color, total in self.getTotals():
+                counts = self.rowCounts[color[0] << 16 | color[1] << 8 | color[2]]
+                writer.writerow(["#%02x%02x%02x" % color, *color, total] + counts.tolist())
@@ -4,14 +4,27 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from math import floor, ceil
-import pickle
-import json
 import os
+import numpy as np
 
 from customWidgets import *
-import tools.line
-
-extensionVersion = "2.0"
+from canvas import Canvas, TILESIZE
+from history import History
+from layers import Layer, LayerStack, BACKGROUND
+from renderScheduler import RenderScheduler
+import projectFile
+from autosave import AutoSaver
+from colorStats import ColorStatistics
+from chartExport import BeadChart
+from recentProjects import RecentProjects
+from settingsService import getSettings
+import startupTimer
+import journal
+import tools.raster
+import tools.fill
+from tools.stroke import Stroke
+from tools.symmetry import Symmetry
+from tools.selection import Region
 
 def getAbsPath(relPath: str) -> str:
     absFile = __file__
@@ -29,9 +42,6 @@ class TrackingScrollArea(QScrollArea):
         self.setParent(parent)
         self.setObjectName(objectName)
 
-        self.horizontalScrollBar().valueChanged.connect(self.scrollEvent)
-        self.verticalScrollBar().valueChanged.connect(self.scrollEvent)
-
         self.setMouseTracking(True)
         self.setWidgetResizable(True)
         self.setAlignment(Qt.AlignCenter)
@@ -44,103 +54,318 @@ class TrackingScrollArea(QScrollArea):
     def wheelEvent(self, event: QWheelEvent) -> None:
         event.ignore()
 
-    def scrollEvent(self) -> None:
-        self.scrollValue = (self.horizontalScrollBar().value(), self.verticalScrollBar().value())
-        self.mainWindow.drawingBoardScrollEvent()
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        #wrapped view needs enough copies of the project to fill the viewport
+        if self.mainWindow.wrapAround: self.mainWindow.drawingBoard.refresh()
 
-class TrackingLabel(QLabel):
+class DrawingBoard(QWidget):
     def __init__(self, mainWindow):
         super().__init__()
         self.mainWindow = mainWindow
-        self.pen = QPen()
         self.zoom = 1
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.scheduler = RenderScheduler(self)
+
+        #transient layer drawn over the canvas by interactive tools, committed on mouse release
+        #points are kept as small images of the canvas tiles they lie on, so mirrored copies far apart cost
+        #only the tiles they touch, pasted region is a single image moved with previewRect
+        self.previewPoints = None
+        self.previewColor = None
+        self.previewData = None
+        self.previewTiles = {}
+        self.previewImage = None
+        self.previewRect = QRect()
+
+        #selected pixels tinted over the canvas, with dashed outline of their bounding box
+        self.selection = None
+        self.selectionRect = QRect()
+
+        #grid tiles for each zoom level, one tile spans a single major grid cell
+        self.gridTiles = {}
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         self.mainWindow.drawingBoardMoveEvent(event)
         super().mouseMoveEvent(event)
 
-    def scalePixel(self, pixel: tuple[int, int]) -> tuple[int, int]:
-        return pixel[0] * self.zoom + self.zoom//2, pixel[1] * self.zoom + self.zoom//2
-
-    def paintPixel(self, pixel: tuple[int, int]) -> None:
-        painter = QPainter(self.pixmap())
-        painter.setPen(self.pen)
-        pixel = self.scalePixel(pixel)
-        painter.drawPoint(*pixel)
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """Draws only the exposed part of the board straight from project data, scaled by zoom"""
+        painter = QPainter(self)
+        #rects of the region one by one, its bounding rect may span the whole board when distant parts change
+        for exposed in event.region().rects():
+            #every copy of a wrapped project is drawn from the same tiles, copies take no extra memory
+            for offset, rect in self.getCopyRects(exposed):
+                painter.setTransform(QTransform.fromTranslate(offset, 0))
+                self.paintCopy(painter, rect)
         painter.end()
-        self.mainWindow.projectData = self.pixmap().scaled(*self.mainWindow.projectSize)
 
-    def paintPixels(self, pixels: list) -> None:
-        if len(pixels) == 0: return
+    def paintCopy(self, painter: QPainter, rect: QRect) -> None:
+        """Paints exposed part of one copy of the project
 
-        painter = QPainter(self.pixmap())
-        painter.setPen(self.pen)
+        Args:
+            painter (QPainter): Painter translated to the copy
+            rect (QRect): Exposed part of the copy, relative to the copy
+        """
+        canvas = self.mainWindow.projectData
+        left, top = max(rect.left()//self.zoom, 0), max(rect.top()//self.zoom, 0)
+        right, bottom = min(rect.right()//self.zoom, canvas.width-1), min(rect.bottom()//self.zoom, canvas.height-1)
+        if right < left or bottom < top: return
+        source = QRect(left, top, right-left+1, bottom-top+1)
+
+        painter.save()
+        painter.scale(self.zoom, self.zoom)
+        #tiles holding only background are not stored, they are filled with its color instead
+        background = QColor(*canvas.background)
+        for tile in map(tuple, canvas.getRectTiles(left, top, right+1, bottom+1).tolist()):
+            rows, columns = canvas.getTileSlice(tile)
+            tileRect = QRect(columns.start, rows.start, columns.stop-columns.start, rows.stop-rows.start)
+            image = canvas.getTileImage(tile)
+            if image is None: painter.fillRect(tileRect, background)
+            else: painter.drawImage(tileRect.topLeft(), image, QRect(QPoint(0, 0), tileRect.size()))
+            if tile in self.previewTiles:
+                painter.drawImage(tileRect.topLeft(), self.previewTiles[tile], QRect(QPoint(0, 0), tileRect.size()))
+        if self.previewImage is not None and self.previewRect.intersects(source):
+            painter.drawImage(self.previewRect.topLeft(), self.previewImage)
+        if self.selection is not None and self.selectionRect.intersects(source):
+            self.paintSelectionTint(painter, self.selectionRect.intersected(source))
+        painter.restore()
+
+        if self.isGridVisible():
+            self.paintGrid(painter, rect)
+        if self.selection is not None:
+            painter.save()
+            painter.setPen(QPen(Qt.black, 1, Qt.DashLine))
+            painter.drawRect(self.toBoardRect(self.selectionRect).adjusted(0, 0, -1, -1))
+            painter.restore()
+
+    def paintSelectionTint(self, painter: QPainter, part: QRect) -> None:
+        """Tints selected pixels of part, only the painted part of the mask is turned into an image
 
-        newPixels = []
-        for pixel in pixels:
-            newPixels.extend(self.mainWindow.symmetrize(pixel))
+        Args:
+            painter (QPainter): Painter scaled by zoom
+            part (QRect): Project rect inside of the selection rect
+        """
+        x, y = self.selection.position
+        mask = self.selection.mask[part.top()-y:part.bottom()-y+1, part.left()-x:part.right()-x+1]
+        tint = np.zeros((part.height(), part.width(), 4), dtype=np.uint8)
+        tint[mask] = (0, 120, 215, 90)
+        painter.drawImage(part.topLeft(), QImage(tint.data, part.width(), part.height(), part.width()*4, QImage.Format_RGBA8888))
+
+    def getCopyCount(self) -> int:
+        """Returns how many copies of the project are placed side by side on the board"""
+        if not self.mainWindow.wrapAround: return 1
+        period = self.mainWindow.projectData.width*self.zoom
+        viewportWidth = self.mainWindow.drawingBoardScroll.viewport().width()
+        #one spare copy on each side, so the view can be moved back by one copy without a visible jump
+        return max(3, ceil(viewportWidth/period)+2)
+
+    def getCopyRects(self, rect: QRect) -> list:
+        """Splits rect on the board into parts lying on single copies of the project
 
-        for index, pixel in enumerate(newPixels):
-            newPixels[index] = QPoint(*self.scalePixel(pixel))
-        painter.drawPoints(*newPixels)
+        Returns:
+            list: (x offset of the copy, part of rect relative to the copy) pairs
+        """
+        if not self.mainWindow.wrapAround: return [(0, rect)]
+
+        canvas = self.mainWindow.projectData
+        period = canvas.width*self.zoom
+        copyRect = QRect(0, 0, period, canvas.height*self.zoom)
+        copies = []
+        for copy in range(max(rect.left(), 0)//period, rect.right()//period+1):
+            part = rect.translated(-copy*period, 0).intersected(copyRect)
+            if not part.isEmpty(): copies.append((copy*period, part))
+        return copies
+
+    def markDirty(self, rect: QRect | None = None) -> None:
+        """Schedules repainting of rect on the project (whole board if not specified) on every copy"""
+        if rect is None or not self.mainWindow.wrapAround:
+            self.scheduler.markDirty(rect)
+            return
+
+        period = self.mainWindow.projectData.width*self.zoom
+        for copy in range(self.getCopyCount()):
+            self.scheduler.markDirty(rect.translated(copy*period, 0))
+
+    def isGridVisible(self) -> bool:
+        return self.mainWindow.showGrid and self.zoom >= self.mainWindow.gridHideRange//100
+
+    def getGridTile(self) -> QPixmap:
+        """Returns cached tile with grid lines of one major cell for current zoom"""
+        if self.zoom in self.gridTiles: return self.gridTiles[self.zoom]
+
+        interval = max(self.mainWindow.gridMajorInterval, 1)
+        size = interval*self.zoom
+        tile = QPixmap(size, size)
+        tile.fill(Qt.transparent)
+
+        minorColor = QColor(*self.mainWindow.gridColor, 100)
+        majorColor = QColor(*self.mainWindow.gridColor)
+
+        painter = QPainter(tile)
+        for n in range(interval):
+            color = majorColor if n == 0 else minorColor
+            painter.fillRect(n*self.zoom, 0, 1, size, color)
+            painter.fillRect(0, n*self.zoom, size, 1, color)
         painter.end()
-        self.mainWindow.projectData = self.pixmap().scaled(*self.mainWindow.projectSize)
 
-    #stolen from https://www.pythonguis.com/faq/implementing-qpainter-flood-fill-pyqt5pyside/
-    def floodFill(self, x, y) -> None:
-        image = self.pixmap().toImage()
-        w, h = image.width(), image.height()
-        x, y = x * self.zoom, y * self.zoom
+        self.gridTiles[self.zoom] = tile
+        return tile
 
-        # Get our target color from origin.
-        target_color = image.pixel(x, y)
+    def clearGridCache(self) -> None:
+        self.gridTiles = {}
+        self.markDirty()
 
-        have_seen = set()
-        queue = [(x, y)]
+    def paintGrid(self, painter: QPainter, rect: QRect) -> None:
+        """Paints grid lines and red center lines over exposed part of the board
 
-        def get_cardinal_points(have_seen, center_pos):
-            points = []
-            cx, cy = center_pos
-            for x, y in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
-                xx, yy = cx + x, cy + y
-                if (xx >= 0 and xx < w and
-                    yy >= 0 and yy < h and
-                    (xx, yy) not in have_seen):
+        Args:
+            painter (QPainter): Painter of the board, without zoom transform
+            rect (QRect): Exposed part of the board
+        """
+        tile = self.getGridTile()
+        painter.drawTiledPixmap(rect, tile, QPoint(rect.x() % tile.width(), rect.y() % tile.height()))
+
+        width, height = self.mainWindow.projectData.size
+        for x in {floor(width/2), ceil(width/2)}:
+            painter.fillRect(x*self.zoom, rect.top(), 1, rect.height(), Qt.red)
+        for y in {floor(height/2), ceil(height/2)}:
+            painter.fillRect(rect.left(), y*self.zoom, rect.width(), 1, Qt.red)
+
+    def setPreview(self, points: np.ndarray, color: tuple[int, int, int]) -> None:
+        """Shows points over the canvas without changing project data
+
+        Args:
+            points (np.ndarray): (n, 2) array of xy coordinates
+            color (tuple[int, int, int]): RGB color of the preview
+        """
+        points = np.asarray(points).reshape(-1, 2)
+        width, height = self.mainWindow.projectData.size
+        points = points[(points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)]
+
+        #old preview is repainted too, clearing it first also frees its images
+        self.clearPreview()
+        if len(points) == 0: return
+
+        tiles, inverse = np.unique(points//TILESIZE, axis=0, return_inverse=True)
+        self.previewData = np.zeros((len(tiles), TILESIZE, TILESIZE, 4), dtype=np.uint8)
+        self.previewData[inverse.ravel(), points[:, 1] % TILESIZE, points[:, 0] % TILESIZE] = (*color, 255)
+        tiles = list(map(tuple, tiles.tolist()))
+        self.previewTiles = {tile: QImage(data.data, TILESIZE, TILESIZE, TILESIZE*4, QImage.Format_RGBA8888)
+                             for tile, data in zip(tiles, self.previewData)}
+        self.previewPoints = points
+        self.previewColor = color
+
+        self.refreshTiles(tiles)
+
+    def setPreviewRegion(self, region: Region) -> None:
+        """Shows pixels of a region over the canvas without changing project data, used by paste,
+        the image is made once and movePreview only moves it"""
+        self.clearPreview()
+        width, height = region.size
+        self.previewRect = QRect(*region.position, width, height)
+        self.previewData = np.zeros((height, width, 4), dtype=np.uint8)
+        self.previewData[..., :3] = region.pixels
+        self.previewData[..., 3] = region.mask*255
+        self.previewImage = QImage(self.previewData.data, width, height, width*4, QImage.Format_RGBA8888)
+        self.markDirty(self.toBoardRect(self.previewRect))
+
+    def movePreview(self, position: tuple[int, int]) -> None:
+        """Moves region shown by setPreviewRegion to another position"""
+        if self.previewImage is None or self.previewRect.topLeft() == QPoint(*position): return
+        self.markDirty(self.toBoardRect(self.previewRect))
+        self.previewRect.moveTopLeft(QPoint(*position))
+        self.markDirty(self.toBoardRect(self.previewRect))
+
+    def setSelection(self, region: Region | None) -> None:
+        """Shows selected region tinted and outlined, None hides it"""
+        oldRect = self.selectionRect
+        self.selection = region
+        self.selectionRect = QRect(*region.position, *region.size) if region is not None else QRect()
+
+        #outline is drawn on the last pixel row and column of the rect
+        self.markDirty(self.toBoardRect(oldRect))
+        self.markDirty(self.toBoardRect(self.selectionRect))
+
+    def clearPreview(self) -> None:
+        oldRect, oldTiles = self.previewRect, list(self.previewTiles)
+        self.previewPoints = None
+        self.previewColor = None
+        self.previewData = None
+        self.previewTiles = {}
+        self.previewImage = None
+        self.previewRect = QRect()
+        self.markDirty(self.toBoardRect(oldRect))
+        self.refreshTiles(oldTiles)
+
+    def commitPreview(self) -> None:
+        """Writes preview into active layer and removes it"""
+        if self.previewPoints is None: return
+        canvas = self.mainWindow.getEditableCanvas()
+        if canvas is not None: canvas.setPixels(self.previewPoints, self.previewColor)
+        self.clearPreview()
+
+    def toBoardRect(self, pixels: np.ndarray | QRect) -> QRect:
+        """Returns rect on the board covering all of specified project pixels or project rect"""
+        if isinstance(pixels, QRect):
+            return QRect(pixels.x()*self.zoom, pixels.y()*self.zoom, pixels.width()*self.zoom, pixels.height()*self.zoom)
+
+        left, top = pixels.min(axis=0)
+        right, bottom = pixels.max(axis=0)
+        return QRect(left*self.zoom, top*self.zoom, (right-left+1)*self.zoom, (bottom-top+1)*self.zoom)
+
+    def refresh(self) -> None:
+        """Resizes the board to current zoom and schedules repainting of the visible part"""
+        canvas = self.mainWindow.projectData
+        self.setFixedSize(canvas.width*self.zoom*self.getCopyCount(), canvas.height*self.zoom)
+        self.markDirty()
+
+    def refreshTiles(self, tiles: list) -> None:
+        """Schedules repainting of specified canvas tiles
+
+        Args:
+            tiles (list): xy coordinates of tiles
+        """
+        size = TILESIZE*self.zoom
+        for x, y in tiles:
+            self.markDirty(QRect(x*size, y*size, size, size))
+
+    def refreshPixels(self, pixels: np.ndarray) -> None:
+        """Schedules repainting of specified project pixels
 
-                    points.append((xx, yy))
-                    have_seen.add((xx, yy))
+        Args:
+            pixels (np.ndarray): (n, 2) array of xy coordinates
+        """
+        if len(pixels) == 0: return
+        self.markDirty(self.toBoardRect(pixels))
+
+    def paintPixels(self, pixels: np.ndarray) -> None:
+        if len(pixels) == 0: return
 
-            return points
+        canvas = self.mainWindow.getEditableCanvas()
+        if canvas is None: return
 
-        # Now perform the search and fill.
-        p = QPainter(self.pixmap())
-        p.setPen(self.pen.color())
+        newPixels = self.mainWindow.symmetry.apply(self.mainWindow.wrapPoints(pixels))
+        painted = canvas.setPixels(newPixels, self.mainWindow.color)
+        self.refreshPixels(painted)
 
-        while queue:
-            x, y = queue.pop()
-            if image.pixel(x, y) == target_color:
-                p.drawPoint(QPoint(x, y))
-                queue[0:0] = get_cardinal_points(have_seen, (x, y))
+    def floodFill(self, x, y) -> None:
+        canvas = self.mainWindow.getEditableCanvas()
+        if canvas is None or not canvas.contains((x, y)): return
 
-        self.update()
+        runs = tools.fill.floodFillRuns(canvas.getRow, canvas.size, (x, y), self.mainWindow.fillTolerance, self.mainWindow.fillDiagonal, self.mainWindow.wrapAround)
+        tiles = canvas.setRuns(runs, self.mainWindow.color)
+        self.refreshTiles(tiles.tolist())
 
     def changeColor(self, color: tuple[int, int, int]) -> None:
         self.mainWindow.color = color
-        self.pen.setColor(QColor(*color))
 
     def getPixelColor(self, pixel: tuple[int, int]) -> tuple[int, int, int]:
-        self.image = QPixmap.toImage(self.pixmap())
-        pixel = self.scalePixel(pixel)
-        color = self.image.pixelColor(*pixel)
-        return color.getRgb()[:-1]
+        return self.mainWindow.projectData.getPixel(self.mainWindow.wrapPixel(pixel))
 
     def setZoom(self, zoom: int) -> None:
         zoom = round(zoom)
         self.zoom = zoom
-        newResolution = (self.mainWindow.projectSize[0]*zoom, self.mainWindow.projectSize[1]*zoom)
-        self.setPixmap(self.pixmap().scaled(*newResolution))
-        self.setFixedSize(*newResolution)
-        self.pen.setWidth(self.zoom)
+        self.refresh()
 
 class ToolChangeButton(QToolButton):
     def __init__(self, window, name: str, connect = None) -> None:
@@ -151,22 +376,126 @@ class ToolChangeButton(QToolButton):
         self.setMaximumSize(48, 48)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
-        self.setIcon(QIcon(getAbsPath(f"icons/{window.settings['theme']}/{name}.png")))
+        #icon is loaded by the window after its first paint
+        self.iconName = name
         self.setIconSize(QSize(32, 32))
 
+    def setTheme(self, theme: str) -> None:
+        self.setIcon(QIcon(getAbsPath(f"icons/{theme}/{self.iconName}.png")))
+
+class ColorStatisticsPanel(QDockWidget):
+    """Dock listing how many beads of each color the project uses"""
+
+    def __init__(self, mainWindow) -> None:
+        super().__init__("Koraliki", mainWindow)
+        self.mainWindow = mainWindow
+
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Kolor", "Ilosc"])
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+
+        exportButton = QPushButton("Eksportuj do CSV", clicked=self.mainWindow.exportColorStatistics)
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.addWidget(self.table)
+        layout.addWidget(exportButton)
+        self.setWidget(widget)
+
+        self.visibilityChanged.connect(lambda visible: visible and self.refresh())
+
+    def refresh(self) -> None:
+        if not self.isVisible(): return
+        totals = self.mainWindow.colorStatistics.getTotals()
+
+        self.table.setRowCount(len(totals))
+        for row, (color, count) in enumerate(totals):
+            colorItem = QTableWidgetItem("#%02x%02x%02x" % color)
+            colorItem.setBackground(QColor(*color))
+            colorItem.setForeground(QColor(Qt.black) if sum(color) > 382 else QColor(Qt.white))
+            self.table.setItem(row, 0, colorItem)
+            self.table.setItem(row, 1, QTableWidgetItem(str(count)))
+
+class LayersPanel(QDockWidget):
+    """Dock listing layers from the top one, checkbox of a layer switches its visibility"""
+
+    def __init__(self, mainWindow) -> None:
+        super().__init__("Warstwy", mainWindow)
+        self.mainWindow = mainWindow
+
+        self.list = QListWidget()
+        self.list.currentRowChanged.connect(self.rowChanged)
+        self.list.itemChanged.connect(self.itemChanged)
+        self.list.itemDoubleClicked.connect(lambda: self.mainWindow.renameLayer())
+
+        buttonsLayout = QGridLayout()
+        buttonsLayout.addWidget(QPushButton("Dodaj", clicked=self.mainWindow.addLayer), 0, 0)
+        buttonsLayout.addWidget(QPushButton("Usun", clicked=self.mainWindow.removeLayer), 0, 1)
+        buttonsLayout.addWidget(QPushButton("W gore", clicked=lambda: self.mainWindow.moveLayer(1)), 1, 0)
+        buttonsLayout.addWidget(QPushButton("W dol", clicked=lambda: self.mainWindow.moveLayer(-1)), 1, 1)
+        buttonsLayout.addWidget(QPushButton("Zablokuj", clicked=self.mainWindow.switchLayerLock), 2, 0)
+        buttonsLayout.addWidget(QPushButton("Kolor pusty", clicked=self.mainWindow.changeLayerTransparentColor), 2, 1)
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.addWidget(self.list)
+        layout.addLayout(buttonsLayout)
+        self.setWidget(widget)
+
+    def getRow(self, index: int) -> int:
+        #list shows the top layer first, works both ways
+        return len(self.mainWindow.layers.layers)-1-index
+
+    def refresh(self) -> None:
+        layers = self.mainWindow.layers
+        self.list.blockSignals(True)
+        self.list.clear()
+        for layer in reversed(layers.layers):
+            item = QListWidgetItem(layer.name + (" (zablokowana)" if layer.locked else ""))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if layer.visible else Qt.Unchecked)
+            if layer.transparentColor is not None:
+                swatch = QPixmap(16, 16)
+                swatch.fill(QColor(*layer.transparentColor))
+                item.setIcon(QIcon(swatch))
+            self.list.addItem(item)
+        self.list.setCurrentRow(self.getRow(layers.active))
+        self.list.blockSignals(False)
+
+    def rowChanged(self, row: int) -> None:
+        if row >= 0: self.mainWindow.changeLayer(self.getRow(row))
+
+    def itemChanged(self, item: QListWidgetItem) -> None:
+        self.mainWindow.switchLayerVisibility(self.getRow(self.list.row(item)), item.checkState() == Qt.Checked)
+
 class Editor(QMainWindow):
     def __init__(self, filepath: str) -> None:
         self.refreshSettings()
+        self.painted = False
         self.zoom = 1
         self.lastColors = [(255,255,255) for _ in range(0, 8)]
         self.color = (0, 0, 0)
         self.tool = "brush"
         self.mouseDown = False
-        self.undoHistory = []
-        self.redoHistory = []
-        self.undoLength = self.settings["clipboardSize"]
+        self.fillTolerance = 0
+        self.fillDiagonal = False
+        self.lineWidth = 1
+        self.lineDiagonalSteps = True
+        self.wrapAround = False
+        self.stroke = Stroke()
+
+        #selected region, copied region and region being moved together with pixels it covers
+        self.selection = None
+        self.clipboard = None
+        self.floating = None
+        self.floatingOrigin = None
+        self.floatingUnderneath = None
+        self.pasting = False
+        self.selectionDrag = None
 
-        self.lastDrawingBoardGeometry = QRect(0, 0, 0, 0)
         self.mouseDownPosition = (0, 0)
         super().__init__()
 
@@ -174,37 +503,38 @@ class Editor(QMainWindow):
         self.gridColor = tuple(self.settings["gridColor"])
         self.gridHideRange = self.settings["gridVisibility"]
         self.showGrid = self.settings["gridEnabled"]
+        self.gridMajorInterval = self.settings["gridMajorInterval"]
 
         self.mainWidget = QWidget()
         self.setCentralWidget(self.mainWidget)
         self.setWindowTitle("Edytor")
 
-        self.hCenterLabel1 = QLabel(self, objectName="centerLabel")
-        self.hCenterLabel2 = QLabel(self, objectName="centerLabel")
-        self.vCenterLabel1 = QLabel(self, objectName="centerLabel")
-        self.vCenterLabel2 = QLabel(self, objectName="centerLabel")
-
-        self.drawingBoard = TrackingLabel(self)
+        self.drawingBoard = DrawingBoard(self)
         self.drawingBoard.setMouseTracking(True)
+        self.drawingBoard.setFocusPolicy(Qt.StrongFocus)
         self.drawingBoardScroll = TrackingScrollArea(self, self.mainWidget, objectName="drawingSpace")
         self.drawingBoardScroll.setWidget(self.drawingBoard)
+        self.drawingBoardScroll.horizontalScrollBar().valueChanged.connect(self.recenterWrappedView)
+        self.drawingBoardScroll.horizontalScrollBar().rangeChanged.connect(self.recenterWrappedView)
 
         self.loadStyleSheet(self.settings['theme'])
         self.filepath = filepath
         self.loadProject(self.filepath)
 
-        sizeMessage = QToolButton(text = f"  {self.projectSize[0]} x {self.projectSize[1]}  ", objectName="smallLabel")
-        sizeMessage.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/size.png")))
-        sizeMessage.setIconSize(QSize(12, 12))
-        sizeMessage.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
-        self.statusBar().addPermanentWidget(sizeMessage)
+        self.sizeMessage = QToolButton(text = f"  {self.projectSize[0]} x {self.projectSize[1]}  ", objectName="smallLabel")
+        self.sizeMessage.setIconSize(QSize(12, 12))
+        self.sizeMessage.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.statusBar().addPermanentWidget(self.sizeMessage)
 
         self.mouseMessage = QToolButton(text = f"  {self.projectSize[0]} x {self.projectSize[1]}  ", objectName="smallLabel")
-        self.mouseMessage.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/move.png")))
         self.mouseMessage.setIconSize(QSize(12, 12))
         self.mouseMessage.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         self.statusBar().addPermanentWidget(self.mouseMessage)
 
+        self.historyIndicator = QLabel(objectName="smallLabel")
+        self.statusBar().addPermanentWidget(self.historyIndicator)
+        self.refreshHistoryIndicator()
+
         self.zoomIndicator = QLabel(text=f"{self.zoom*100}%", objectName="smallLabel")
         self.statusBar().addPermanentWidget(self.zoomIndicator)
 
@@ -216,30 +546,121 @@ class Editor(QMainWindow):
 
         def saveAs():
             fileName, _ = QFileDialog.getSaveFileName(self,"Wybierz lokalizacje zapisu pliku", self.filepath,"Projekty (*.dpct)")
-            self.saveProject(fileName)
+            if fileName == "": return
+            #journal of the old file is dropped only once its changes are safely in the new one
+            if not self.saveProject(fileName): return
+            self.journal.remove()
             self.filepath = fileName
+            self.journal = journal.Journal(self.filepath+".journal")
+            self.journal.reset(journal.BASE_PROJECT)
             self.updateRecentProjects()
         self.projectSettings.addAction(QAction("Zapisz projekt jako", self, triggered=saveAs))
 
         self.projectSettings.addAction(QAction("Wyeksportuj projekt", self, triggered=self.exportProject, shortcut="Ctrl+E"))
+        self.projectSettings.addAction(QAction("Eksportuj schemat do druku", self, triggered=self.exportChart))
+        self.projectSettings.addAction(QAction("Statystyki kolorow", self, triggered=self.switchColorStatistics, shortcut="Ctrl+L"))
+        self.projectSettings.addAction(QAction("Eksportuj liste koralikow", self, triggered=self.exportColorStatistics))
         self.menu.addMenu(self.projectSettings)
 
+        self.fillSettings = QMenu("Wypelnianie")
+
+        def switchFillDiagonal(checked: bool):
+            self.fillDiagonal = checked
+        self.fillSettings.addAction(QAction("Wypelniaj po przekatnych", self, checkable=True, triggered=switchFillDiagonal))
+        self.fillSettings.addAction(QAction("Tolerancja koloru", self, triggered=self.changeFillTolerance))
+        self.menu.addMenu(self.fillSettings)
+
+        self.lineSettings = QMenu("Linia")
+
+        def switchLineDiagonalSteps(checked: bool):
+            self.lineDiagonalSteps = not checked
+        self.lineSettings.addAction(QAction("Laczenie tylko krawedziami", self, checkable=True, triggered=switchLineDiagonalSteps))
+        self.lineSettings.addAction(QAction("Grubosc linii", self, triggered=self.changeLineWidth))
+        self.menu.addMenu(self.lineSettings)
+
+        self.symmetrySettings = QMenu("Symetria")
+        symmetryGroup = QActionGroup(self)
+        self.symmetryActions = {}
+        symmetryNames = {
+            "none": "Brak",
+            "mirrorX": "Odbicie poziome",
+            "mirrorY": "Odbicie pionowe",
+            "mirrorXY": "Odbicie w obu osiach",
+            "rotate2": "Obrot o 180 stopni",
+            "rotate4": "Obrot co 90 stopni",
+            "diagonal": "Odbicie po przekatnej",
+            "diagonals": "Odbicie po obu przekatnych",
+        }
+        for mode, name in symmetryNames.items():
+            action = QAction(name, self, checkable=True, triggered=lambda _, mode=mode: self.changeSymmetryMode(mode))
+            symmetryGroup.addAction(action)
+            self.symmetrySettings.addAction(action)
+            self.symmetryActions[mode] = action
+        self.symmetryActions["none"].setChecked(True)
+        self.symmetrySettings.addSeparator()
+        self.symmetrySettings.addAction(QAction("Powtorzenia w poziomie", self, triggered=self.changeSymmetryRepeat))
+        self.menu.addMenu(self.symmetrySettings)
+
+        self.selectionSettings = QMenu("Zaznaczenie")
+        #keys without modifiers work only while the board has focus, so lists in docks and the scroll area keep them
+        def boardAction(text: str, triggered, shortcut: str) -> QAction:
+            action = QAction(text, self, triggered=triggered, shortcut=shortcut, shortcutContext=Qt.WidgetWithChildrenShortcut)
+            self.drawingBoard.addAction(action)
+            return action
+
+        self.selectionSettings.addAction(QAction("Zaznacz wszystko", self, triggered=self.selectAll, shortcut="Ctrl+A"))
+        self.selectionSettings.addAction(boardAction("Odznacz", self.clearSelection, "Esc"))
+        self.selectionSettings.addSeparator()
+        self.selectionSettings.addAction(QAction("Kopiuj", self, triggered=self.copySelection, shortcut="Ctrl+C"))
+        self.selectionSettings.addAction(QAction("Wytnij", self, triggered=self.cutSelection, shortcut="Ctrl+X"))
+        self.selectionSettings.addAction(QAction("Wklej", self, triggered=self.pasteClipboard, shortcut="Ctrl+V"))
+        self.selectionSettings.addAction(boardAction("Usun zaznaczone", self.deleteSelection, "Del"))
+        self.selectionSettings.addSeparator()
+        self.selectionSettings.addAction(boardAction("Przesun w lewo", lambda: self.nudgeSelection(-1, 0), "Left"))
+        self.selectionSettings.addAction(boardAction("Przesun w prawo", lambda: self.nudgeSelection(1, 0), "Right"))
+        self.selectionSettings.addAction(boardAction("Przesun w gore", lambda: self.nudgeSelection(0, -1), "Up"))
+        self.selectionSettings.addAction(boardAction("Przesun w dol", lambda: self.nudgeSelection(0, 1), "Down"))
+        self.menu.addMenu(self.selectionSettings)
+
+        self.layerSettings = QMenu("Warstwy")
+        self.layerSettings.addAction(QAction("Pokaz warstwy", self, triggered=self.switchLayersPanel, shortcut="Ctrl+K"))
+        self.layerSettings.addAction(QAction("Nowa warstwa", self, triggered=self.addLayer, shortcut="Ctrl+Shift+N"))
+        self.layerSettings.addAction(QAction("Usun warstwe", self, triggered=self.removeLayer))
+        self.layerSettings.addAction(QAction("Zmien nazwe warstwy", self, triggered=self.renameLayer))
+        self.layerSettings.addAction(QAction("Zablokuj lub odblokuj warstwe", self, triggered=self.switchLayerLock))
+        self.layerSettings.addAction(QAction("Kolor pusty warstwy", self, triggered=self.changeLayerTransparentColor))
+        self.menu.addMenu(self.layerSettings)
+
+        self.viewSettings = QMenu("Widok")
+        wrapAction = QAction("Zawijanie bransoletki", self, checkable=True, triggered=self.switchWrapAround, shortcut="Ctrl+B")
+        wrapAction.setEnabled(self.projectType == "bracelet")
+        self.viewSettings.addAction(wrapAction)
+        self.menu.addMenu(self.viewSettings)
+
+        self.autoSaver = AutoSaver(self)
+        self.autoSaver.saved.connect(self.autoSaveFinished)
+        self.autoSaver.failed.connect(self.autoSaveFailed)
+        self.autosavedRevision = self.projectData.revision
+
         self.saveTimer = QTimer()
         self.saveTimer.timeout.connect(self.autoSaveProject)
         self.saveTimer.setInterval(self.settings["autosaveTime"])
-        self.saveTimer.start()
 
         self.mainLayout = QVBoxLayout(self.mainWidget)
 
         self.toolsLayout = QHBoxLayout()
         self.toolsLayout.setAlignment(Qt.AlignLeft)
 
+        #tool function, function for moves without pressed button, does tool take all samples of a frame at once
         self.tools = {
-            "brush":  [self.brush, None],
-            "line":   [self.line, None],
-            "picker": [self.colorPicker, self.colorPickerMove],
-            "bucket": [self.bucket, None],
+            "brush":  [self.brush, None, True],
+            "line":   [self.line, None, False],
+            "picker": [self.colorPicker, self.colorPickerMove, False],
+            "bucket": [self.bucket, None, False],
+            "select": [self.select, self.selectMove, False],
+            "wand":   [self.magicWand, None, False],
         }
+        self.drawingBoard.scheduler.inputHandler = self.processInput
 
         undoButton = ToolChangeButton(self, "undo", self.undo)
         self.toolsLayout.addWidget(undoButton)
@@ -261,6 +682,12 @@ class Editor(QMainWindow):
         bucketButton = ToolChangeButton(self, "bucket")
         self.toolsLayout.addWidget(bucketButton)
 
+        selectButton = ToolChangeButton(self, "select")
+        self.toolsLayout.addWidget(selectButton)
+
+        wandButton = ToolChangeButton(self, "wand")
+        self.toolsLayout.addWidget(wandButton)
+
         self.toolsLayout.addWidget(Divider())
 
         qss = "border: 2px solid lightgray;border-radius: 24px;background-color:rgb%".replace("%", str(tuple(self.color)))
@@ -276,21 +703,11 @@ class Editor(QMainWindow):
 
         self.toolsLayout.addWidget(Divider())
 
-        def switchHSym(): 
-            self.hSymmetry = not self.hSymmetry
-            if self.hSymmetry: hAlignmentButton.setObjectName("activeButton")
-            else: hAlignmentButton.setObjectName("")
-            self.refreshStyleSheet(hAlignmentButton)
-        hAlignmentButton = ToolChangeButton(self, "hSymmetry", switchHSym)
-        self.toolsLayout.addWidget(hAlignmentButton)
-
-        def switchVSym(): 
-            self.vSymmetry = not self.vSymmetry
-            if self.vSymmetry: vAlignmentButton.setObjectName("activeButton")
-            else: vAlignmentButton.setObjectName("")
-            self.refreshStyleSheet(vAlignmentButton)
-        vAlignmentButton = ToolChangeButton(self, "vSymmetry", switchVSym)
-        self.toolsLayout.addWidget(vAlignmentButton)
+        self.hSymmetryButton = ToolChangeButton(self, "hSymmetry", lambda: self.switchMirror(0))
+        self.toolsLayout.addWidget(self.hSymmetryButton)
+
+        self.vSymmetryButton = ToolChangeButton(self, "vSymmetry", lambda: self.switchMirror(1))
+        self.toolsLayout.addWidget(self.vSymmetryButton)
 
         self.toolButtons = {
             "brush": brushButton,
@@ -298,35 +715,51 @@ class Editor(QMainWindow):
             "picker": pickerButton,
             "color": colorButton,
             "bucket": bucketButton,
+            "select": selectButton,
+            "wand": wandButton,
         }
 
-        self.hAlignmentWidget = QWidget(self)
-        self.hAlignmentWidget.setAttribute(Qt.WA_TransparentForMouseEvents)
-        self.hAlignmentWidget.setStyleSheet("background-color: none")
-        self.hAlignmentWidget.hide()
-        self.hGridLines = [floor(self.projectSize[0]/2), ceil(self.projectSize[0]/2)]
-        self.hSymmetry = False
+        self.toolLabel = QLabel(self, objectName="toolLabel")
 
-        self.vAlignmentWidget = QWidget(self)
-        self.vAlignmentWidget.setAttribute(Qt.WA_TransparentForMouseEvents)
-        self.vAlignmentWidget.setStyleSheet("background-color: none")
-        self.vAlignmentWidget.hide()
-        self.vGridLines = [floor(self.projectSize[1]/2), ceil(self.projectSize[1]/2)]
-        self.vSymmetry = False
+        self.colorStatisticsPanel = ColorStatisticsPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.colorStatisticsPanel)
+        self.colorStatisticsPanel.hide()
 
-        self.toolLabel = QLabel(self, objectName="toolLabel")
+        self.layersPanel = LayersPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.layersPanel)
+        self.layersPanel.refresh()
+        self.layersPanel.hide()
+
+        self.settings.changed.connect(self.settingsChanged)
+        self.settings.themeChanged.connect(self.applyTheme)
 
         self.mainLayout.addLayout(self.toolsLayout)
         self.mainLayout.addWidget(self.drawingBoardScroll)
         self.mainLayout.setStretch(0, 1)
         self.mainLayout.setStretch(1, 3)
-        self.generateGrid()
         self.drawPixels()
 
         self.resize(800, 600)
         self.show()
+        self.drawingBoard.setFocus()
         self.zoomEvent(0)
 
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            startupTimer.mark("editor first paint")
+            QTimer.singleShot(0, self.finishSetup)
+
+    def finishSetup(self) -> None:
+        """Setup that is not needed to show the project, done right after the window is first painted"""
+        self.setThemeIcons(self.settings['theme'])
+        self.colorStatistics = ColorStatistics(self.projectData)
+        self.colorStatisticsPanel.refresh()
+        self.updateRecentProjects()
+        self.saveTimer.start()
+        startupTimer.mark("editor setup finished")
+
     #!Other functions
     def errorMessage(self, text: str, informativeText: str) -> None:
         """Displays and error message in another window
@@ -340,23 +773,44 @@ class Editor(QMainWindow):
         message.exec_()
 
     def loadStyleSheet(self, color: str) -> None:
-        """Loads stylesheet from specified qss file
+        """Loads stylesheet of specified theme
 
         Args:
             color (str): file name (no extensions)
         """
-        print(getAbsPath(f"styles/{color}.qss"))
-        with open(getAbsPath(f"styles/{color}.qss")) as file:
-            self.setStyleSheet(file.read())
+        self.setStyleSheet(self.settings.getStyleSheet(color))
 
     def refreshSettings(self) -> None:
-        """Loads settings from settings.json"""
-        with open(getAbsPath("settings.json")) as file:
-            self.settings = json.loads(file.read())
+        """Gets settings shared by all windows"""
+        self.settings = getSettings()
+
+    def applyTheme(self, theme: str) -> None:
+        self.loadStyleSheet(theme)
+        self.setThemeIcons(theme)
+
+    def setThemeIcons(self, theme: str) -> None:
+        for button in self.findChildren(ToolChangeButton):
+            button.setTheme(theme)
+        self.sizeMessage.setIcon(QIcon(getAbsPath(f"icons/{theme}/size.png")))
+        self.mouseMessage.setIcon(QIcon(getAbsPath(f"icons/{theme}/move.png")))
+
+    def settingsChanged(self, changes: dict) -> None:
+        """Applies changed settings to the open project"""
+        if "gridColor" in changes: self.gridColor = tuple(changes["gridColor"])
+        if "gridVisibility" in changes: self.gridHideRange = changes["gridVisibility"]
+        if "gridEnabled" in changes: self.showGrid = changes["gridEnabled"]
+        if "gridMajorInterval" in changes: self.gridMajorInterval = changes["gridMajorInterval"]
+        self.drawingBoard.clearGridCache()
+
+        if "autosaveTime" in changes: self.saveTimer.setInterval(changes["autosaveTime"])
+        if "historyMemory" in changes:
+            self.history.setMemoryBudget(changes["historyMemory"]*1024*1024)
+            self.refreshHistoryIndicator()
 
     def log(self) -> None:
         '''Used for debuggging'''
-        self.getProjectPixels()
+        scheduler = self.drawingBoard.scheduler
+        self.statusBar().showMessage(f"Zdarzenia myszy: {scheduler.processedEvents} przetworzonych, {scheduler.droppedEvents} pominietych")
 
     #!UI generation and management functions
     def refreshStyleSheet(self, widget: QWidget) -> None:
@@ -385,56 +839,6 @@ class Editor(QMainWindow):
             button.clicked.connect(partial(self.changeColor, color=color))
             self.lastColorsLayout.addWidget(button, row, column)
 
-    def generateGrid(self) -> None:
-        self.hGridLayout = QHBoxLayout(self.hAlignmentWidget)
-        self.hGridLayout.setAlignment(Qt.AlignLeft)
-        self.hGridLayout.setContentsMargins(0,0,0,0)
-        self.hGridLayout.setSpacing(0)
-
-        for n in range(0, self.projectSize[0]+1):
-            label = QLabel(self, objectName="grid")
-            label.setStyleSheet(f"background-color: rgb{self.gridColor}")
-            label.setFixedWidth(1)
-            self.hGridLayout.addWidget(label)
-
-            if n in [ceil(self.projectSize[0]/2), floor(self.projectSize[0]/2)]:
-                label.setStyleSheet(f"background-color: red")
-
-        self.vGridLayout = QVBoxLayout(self.vAlignmentWidget)
-        self.vGridLayout.setAlignment(Qt.AlignTop)
-        self.vGridLayout.setContentsMargins(0,0,0,0)
-        self.vGridLayout.setSpacing(0)
-
-        for n in range(0, self.projectSize[1]+1):
-            label = QLabel(self, objectName="grid")
-            label.setStyleSheet(f"background-color: rgb{self.gridColor}")
-            label.setFixedHeight(1)
-            self.vGridLayout.addWidget(label)
-
-            if n in [ceil(self.projectSize[1]/2), floor(self.projectSize[1]/2)]:
-                label.setStyleSheet(f"background-color: red")
-
-    def alignLabel(self) -> None:
-        geometry = self.drawingBoard.geometry()
-
-        if self.lastDrawingBoardGeometry == geometry: return
-
-        self.zoom = floor(self.zoom) #i dont know why it doesnt work..
-
-        hgeometry = (geometry.x()+8, geometry.y()+93, geometry.width()+1, geometry.height())
-        self.hAlignmentWidget.setGeometry(*hgeometry)
-        self.hGridLayout.setSpacing(self.zoom-1)
-        self.hCenterLabel1.setGeometry(QRect(0, geometry.top()+geometry.height()//2+93-self.zoom//2, geometry.left()+9, self.zoom))
-        self.hCenterLabel2.setGeometry(QRect(geometry.right()+9, geometry.top()+geometry.height()//2+93-self.zoom//2, self.width()-geometry.right()+9, self.zoom))
-
-        vgeometry = (geometry.x()+8, geometry.y()+93, geometry.width(), geometry.height()+1)
-        self.vAlignmentWidget.setGeometry(*vgeometry)
-        self.vGridLayout.setSpacing(self.zoom-1)
-        self.vCenterLabel1.setGeometry(QRect(geometry.left()+geometry.width()//2+9-self.zoom//2, 0, self.zoom, geometry.top()+93))
-        self.vCenterLabel2.setGeometry(QRect(geometry.left()+geometry.width()//2+9-self.zoom//2, geometry.bottom()+93, self.zoom, self.height()-geometry.bottom()))
-
-        self.lastDrawingBoardGeometry = geometry
-
     #!Project management functions
     def loadProject(self, filePath: str) -> None:
         """Loads project from file path
@@ -444,21 +848,18 @@ class Editor(QMainWindow):
         """
         self.filePath = filePath
         try:
-            with open(filePath, "rb") as f:
-                projectData = pickle.load(f)
+            projectData = projectFile.loadProject(filePath)
 
-            if projectData["version"] != extensionVersion:
-                self.errorMessage("Moga wystapywac problemy przy wyswietlaniu projektu", "Wersja programu zmienila sie")
-
-            self.projectSize = tuple(int(x) for x in projectData["size"])
+            self.projectSize = projectData["size"]
             self.projectType = projectData["type"]
             self.projectName = projectData["name"]
-            self.drawingBoard.setPixmap(projectData["contents"])
-            self.lastState = self.drawingBoard.pixmap()
-            self.beforeLineState = self.drawingBoard.pixmap()
+            self.layers = LayerStack.fromProject(projectData)
             self.setWindowTitle("Projektant - "+self.projectName)
 
-            self.updateRecentProjects()
+            self.openJournal()
+            self.projectData = self.layers.composite
+            self.history = History([layer.canvas for layer in self.layers.layers], self.settings["historyMemory"]*1024*1024)
+            self.symmetry = Symmetry(self.projectSize)
         except FileNotFoundError:
             self.errorMessage("Nie mozna otworzyc pliku", "Plik nie istnieje")
             return
@@ -468,50 +869,93 @@ class Editor(QMainWindow):
 
         self.statusBar().showMessage(f"Otworzono projekt z {filePath}")
 
-    def saveProject(self, filePath: str) -> None:
+    def saveProject(self, filePath: str) -> bool:
         """Saves project to specified file
 
         Args:
             filePath (str): File path
+
+        Returns:
+            bool: True if the project was saved, the user was already told about a failure
         """
         if not os.access(os.path.dirname(filePath), os.W_OK):
             self.errorMessage("Nie mozna zapisac pliku", "Sprawdz, czy lokalizacja pliku jest poprawna")
-            return
-
-        toWrite = {
-            "version": extensionVersion,
-            "type": self.projectType,
-            "size": self.projectSize,
-            "contents": PickablePixmap(self.drawingBoard.pixmap().scaled(*self.projectSize)),
-            "name": self.projectName
-        }
+            return False
 
         try:
-            with open(filePath, "wb") as f:
-                pickle.dump(toWrite, f)
+            projectFile.saveProject(filePath, self.projectName, self.projectType, self.projectData, layers=self.layers.getFileLayers())
+            if filePath == self.filepath: self.journal.reset(journal.BASE_PROJECT)
         except Exception:
             self.errorMessage("Nie mozna zapisac pliku", "Nieznany problem, sprobuj ponownie")
+            return False
 
         self.statusBar().showMessage(f"Zapisano projekt w {filePath}")
+        return True
+
+    def getAutosavePath(self) -> str:
+        return "".join(self.filepath.split(".")[:-1])+"_autosave.dpct"
+
+    def openJournal(self) -> None:
+        """Opens stroke journal of current project, replaying changes left there by a crash"""
+        journalPath = self.filepath+".journal"
+        recovered = False
+
+        if os.path.exists(journalPath):
+            try:
+                base, records = journal.readJournal(journalPath)
+            except Exception:
+                base, records = journal.BASE_PROJECT, []
+
+            if len(records) != 0 and self.askForRecovery():
+                if base == journal.BASE_AUTOSAVE:
+                    self.layers = LayerStack.fromProject(projectFile.loadProject(self.getAutosavePath()))
+                journal.replay(self.layers, records)
+                self.layers.refreshComposite()
+                recovered = True
+
+        self.journal = journal.Journal(journalPath)
+        if not recovered:
+            self.journal.reset(journal.BASE_PROJECT)
+            return
+
+        #recovered state exists only in memory, make autosave the new base right away
+        projectFile.saveProject(self.getAutosavePath(), self.projectName, self.projectType, self.layers.composite, layers=self.layers.getFileLayers())
+        self.journal.reset(journal.BASE_AUTOSAVE)
+
+    def askForRecovery(self) -> bool:
+        message = QMessageBox(icon=QMessageBox.Question, text="Znaleziono niezapisane zmiany", informativeText="Czy chcesz je przywrocic?")
+        message.setWindowTitle(" ")
+        message.setStandardButtons(QMessageBox.Yes|QMessageBox.No)
+        return message.exec_() == QMessageBox.Yes
 
     def autoSaveProject(self) -> None:
-        filepath = "".join(self.filepath.split(".")[:-1])+"_autosave.dpct"
-        self.saveProject(filepath)
-        self.statusBar().showMessage(f"Automatycznie zapisano plik w {filepath}")
+        """Folds stroke journal into autosave file in background, once the journal outgrows the project"""
+        if self.projectData.revision == self.autosavedRevision: return
+        if self.journal.size < self.projectData.nbytes: return
+
+        self.compactionOffset = self.journal.size
+        self.compactionGeneration = self.journal.generation
+        if self.autoSaver.save(self.getAutosavePath(), self.projectName, self.projectType, self.projectData.copy(), self.layers.getFileLayers(copy=True)):
+            self.autosavedRevision = self.projectData.revision
+
+    def autoSaveFinished(self, filePath: str, duration: float) -> None:
+        #journal could have been replaced by a manual save in the meantime
+        if self.journal.generation == self.compactionGeneration:
+            self.journal.fold(self.compactionOffset, journal.BASE_AUTOSAVE)
+        self.statusBar().showMessage(f"Automatycznie zapisano plik w {filePath} ({round(duration)}ms)")
+
+    def autoSaveFailed(self, filePath: str, error: str) -> None:
+        #try again on next timeout
+        self.autosavedRevision = None
+        self.statusBar().showMessage(f"Nie udalo sie automatycznie zapisac pliku w {filePath}")
 
     def updateRecentProjects(self) -> None:
-        """Updates recent project list with current project
+        """Moves current project to the top of recent project list
         """
-        with open(getAbsPath("recentProjects.json"), "r") as file:
-            recents = json.loads(file.read())
-
-        recents[self.filepath] = {
-            "name": self.projectName,
-            "type": self.projectType
-        }
-
-        with open(getAbsPath("recentProjects.json"), "w") as file:
-            recents = file.write(json.dumps(recents))
+        try:
+            RecentProjects(getAbsPath("recentProjects.json")).add(self.filepath, self.projectName, self.projectType)
+        except OSError:
+            self.statusBar().showMessage("Nie udalo sie zapisac listy ostatnich projektow")
 
     def exportProject(self) -> None:
         """Exports project to json"""
@@ -521,22 +965,275 @@ class Editor(QMainWindow):
             self.errorMessage("Nie mozna wyeksportowac projektu", "Sprawdz, czy lokalizacja pliku jest poprawna")
             return
 
-        pixmap = self.drawingBoard.pixmap().scaled(*self.projectSize)
-        pixmap.save(fileName)
+        self.projectData.toImage().save(fileName)
 
         self.statusBar().showMessage(f"Wyeksportowano projekt do {fileName}")
 
-    def getProjectPixels(self) -> None:
-        pixels = {}
-        image = QPixmap.toImage(self.drawingBoard.pixmap()).scaled(*self.projectSize)
+    def exportChart(self) -> None:
+        """Exports printable bead chart to pdf or svg"""
+        suggestedName = "".join(self.filepath.split(".")[:-1]) + ".pdf"
+        fileName, fileFilter = QFileDialog.getSaveFileName(self,"Wybierz lokalizacje zapisu pliku", suggestedName,"PDF (*.pdf);;SVG (*.svg)")
+        if fileName == "": return
+        if not os.access(os.path.dirname(fileName), os.W_OK):
+            self.errorMessage("Nie mozna wyeksportowac schematu", "Sprawdz, czy lokalizacja pliku jest poprawna")
+            return
+
+        chart = BeadChart(self.projectData, self.projectName, self.colorStatistics.getTotals(), majorInterval=self.gridMajorInterval)
+
+        progressDialog = QProgressDialog("Eksportowanie schematu", None, 0, 0, self)
+        progressDialog.setWindowModality(Qt.WindowModal)
+        def progress(page: int, pageCount: int):
+            progressDialog.setMaximum(pageCount)
+            progressDialog.setValue(page)
+
+        try:
+            if fileName.endswith(".svg") or fileFilter.startswith("SVG"): pageCount = chart.writeSvg(fileName, progress=progress)
+            else: pageCount = chart.writePdf(fileName, progress=progress)
+        except Exception:
+            self.errorMessage("Nie mozna wyeksportowac schematu", "Nieznany problem, sprobuj ponownie")
+            return
+        finally:
+            progressDialog.close()
+
+        self.statusBar().showMessage(f"Wyeksportowano schemat ({pageCount} stron) do {fileName}")
+
+    def switchColorStatistics(self) -> None:
+        self.colorStatisticsPanel.setVisible(not self.colorStatisticsPanel.isVisible())
+
+    def exportColorStatistics(self) -> None:
+        """Exports bead count of every color, in total and per row, to csv"""
+        suggestedName = "".join(self.filepath.split(".")[:-1]) + ".csv"
+        fileName, _ = QFileDialog.getSaveFileName(self,"Wybierz lokalizacje zapisu pliku", suggestedName,"Arkusz (*.csv)")
+        if fileName == "": return
 
-        for x in range(self.projectSize[0]):
-            for y in range(self.projectSize[1]):
-                color = image.pixelColor(x, y).getRgb()[:-1]
-                try: pixels[color] += 1
-                except KeyError: pixels[color] = 1
+        try:
+            self.colorStatistics.exportCsv(fileName)
+        except OSError:
+            self.errorMessage("Nie mozna wyeksportowac listy koralikow", "Sprawdz, czy lokalizacja pliku jest poprawna")
+            return
+
+        self.statusBar().showMessage(f"Wyeksportowano liste koralikow do {fileName}")
+
+    #!Layer functions
+    def switchLayersPanel(self) -> None:
+        self.layersPanel.setVisible(not self.layersPanel.isVisible())
+
+    def getEditableCanvas(self) -> Canvas | None:
+        """Returns canvas of the active layer, None if it can not be painted on"""
+        layer = self.layers.activeLayer
+        if layer.locked:
+            self.statusBar().showMessage(f"Warstwa {layer.name} jest zablokowana")
+            return None
+        if not layer.visible:
+            self.statusBar().showMessage(f"Warstwa {layer.name} jest ukryta")
+            return None
+        return layer.canvas
+
+    def layersChanged(self) -> None:
+        """Refreshes everything that depends on the composite after layers were added, removed, reordered or changed,
+        the change itself is journaled by the caller"""
+        self.drawingBoard.refresh()
+        self.colorStatisticsPanel.refresh()
+        self.layersPanel.refresh()
+
+    def changeLayer(self, index: int) -> None:
+        self.layers.active = index
+        self.statusBar().showMessage(f"Aktywna warstwa: {self.layers.activeLayer.name}")
+
+    def addLayer(self) -> None:
+        """Adds empty layer above the active one, its transparent color is the background color"""
+        layer = Layer(Canvas(*self.projectSize, BACKGROUND), f"Warstwa {len(self.layers.layers)+1}", transparentColor=BACKGROUND)
+        self.layers.insert(self.layers.active+1, layer)
+        self.layers.active += 1
+        self.history.track(layer.canvas)
+        self.journal.appendLayer(layer, self.layers.active, inserted=True)
+        self.layersChanged()
+
+    def removeLayer(self) -> None:
+        if len(self.layers.layers) == 1:
+            self.errorMessage("Nie mozna usunac warstwy", "Projekt musi miec co najmniej jedna warstwe")
+            return
+
+        message = QMessageBox(icon=QMessageBox.Question, text=f"Czy chcesz usunac warstwe {self.layers.activeLayer.name}?", informativeText="Tej operacji nie mozna cofnac")
+        message.setWindowTitle(" ")
+        message.setStandardButtons(QMessageBox.Yes|QMessageBox.No)
+        if message.exec_() != QMessageBox.Yes: return
+
+        self.journal.appendRemoveLayer(self.layers.active)
+        layer = self.layers.remove(self.layers.active)
+        self.history.forget(layer.canvas)
+        self.refreshHistoryIndicator()
+        self.layersChanged()
+
+    def moveLayer(self, offset: int) -> None:
+        """Moves active layer up (positive offset) or down the stack"""
+        index = self.layers.active + offset
+        if not 0 <= index < len(self.layers.layers): return
+
+        self.layers.move(self.layers.active, index)
+        self.journal.appendMoveLayer(self.layers.active, index)
+        self.layers.active = index
+        self.layersChanged()
+
+    def switchLayerVisibility(self, index: int, visible: bool) -> None:
+        self.layers.layers[index].visible = visible
+        self.journal.appendLayer(self.layers.layers[index], index)
+        self.layers.refreshComposite()
+        self.layersChanged()
+
+    def switchLayerLock(self) -> None:
+        layer = self.layers.activeLayer
+        layer.locked = not layer.locked
+        self.journal.appendLayer(layer, self.layers.active)
+        self.layersPanel.refresh()
+        self.statusBar().showMessage(f"Warstwa {layer.name} " + ("zablokowana" if layer.locked else "odblokowana"))
+
+    def renameLayer(self) -> None:
+        layer = self.layers.activeLayer
+        name, accepted = QInputDialog.getText(self, "Nazwa warstwy", "Nazwa", text=layer.name)
+        if not accepted or name == "": return
+
+        layer.name = name
+        self.journal.appendLayer(layer, self.layers.active)
+        self.layersPanel.refresh()
+
+    def changeLayerTransparentColor(self) -> None:
+        """Asks user for the color that is treated as no bead on the active layer"""
+        layer = self.layers.activeLayer
+        color = QColorDialog.getColor(QColor(*(layer.transparentColor or BACKGROUND)), self, "Kolor pusty warstwy")
+        if not color.isValid(): return
+
+        layer.transparentColor = color.getRgb()[:-1]
+        self.journal.appendLayer(layer, self.layers.active)
+        self.layers.refreshComposite()
+        self.layersChanged()
+
+    #!Selection functions
+    def setSelection(self, region: Region | None) -> None:
+        self.selection = region
+        self.drawingBoard.setSelection(region)
+
+    def selectAll(self) -> None:
+        width, height = self.projectSize
+        self.setSelection(Region((0, 0), np.ones((height, width), dtype=bool)))
+
+    def clearSelection(self) -> None:
+        self.cancelPaste()
+        self.setSelection(None)
+
+    def getEmptyColor(self) -> tuple[int, int, int]:
+        """Color left behind by cut and move, which is the no bead color of the active layer"""
+        return self.layers.activeLayer.transparentColor or BACKGROUND
+
+    def getSelectedPixels(self) -> Region | None:
+        """Returns selection of the active layer together with a copy of its pixels"""
+        if self.selection is None:
+            self.statusBar().showMessage("Nic nie jest zaznaczone")
+            return None
+
+        _, pixels = self.layers.activeLayer.canvas.getRegion(self.selection.position, self.selection.size)
+        return Region(self.selection.position, self.selection.mask, pixels)
+
+    def copySelection(self) -> None:
+        region = self.getSelectedPixels()
+        if region is None: return
+        self.clipboard = region
+        self.statusBar().showMessage(f"Skopiowano {region.size[0]} x {region.size[1]}")
+
+    def cutSelection(self) -> None:
+        region = self.getSelectedPixels()
+        if region is None: return
+        self.clipboard = region
+        self.deleteSelection()
+
+    def deleteSelection(self) -> None:
+        """Replaces selected pixels of the active layer with its no bead color, as a single operation"""
+        if self.selection is None or self.mouseDown: return
+        canvas = self.getEditableCanvas()
+        if canvas is None: return
+
+        self.history.begin()
+        self.fillSelection(canvas)
+        changes = self.history.commit()
+        if changes is not None: self.historyChanged(changes)
+        self.refreshHistoryIndicator()
+
+    def fillSelection(self, canvas: Canvas) -> None:
+        width, height = self.selection.size
+        empty = np.broadcast_to(np.array(self.getEmptyColor(), dtype=np.uint8), (height, width, 3))
+        canvas.setRegion(self.selection.position, empty, self.selection.mask)
+        self.drawingBoard.markDirty(self.drawingBoard.toBoardRect(QRect(*self.selection.position, width, height)))
+
+    def pasteClipboard(self) -> None:
+        """Shows clipboard under the mouse, it is placed by clicking with selection tool"""
+        if self.clipboard is None:
+            self.statusBar().showMessage("Schowek jest pusty")
+            return
+
+        self.changeTool("select")
+        self.pasting = True
+        #preview is made once and follows the mouse from the pixel it is over now
+        position = self.drawingBoard.mapFromGlobal(QCursor.pos())
+        pixel = self.wrapPixel((position.x()//self.zoom, position.y()//self.zoom))
+        self.drawingBoard.setPreviewRegion(self.clipboard.moved(self.getPastePosition(pixel)))
+        self.statusBar().showMessage("Kliknij, aby wkleic (Esc aby anulowac)")
+
+    def cancelPaste(self) -> None:
+        if not self.pasting: return
+        self.pasting = False
+        self.drawingBoard.clearPreview()
+
+    def getPastePosition(self, pixel: tuple[int, int]) -> tuple[int, int]:
+        #clipboard is centered on the mouse
+        width, height = self.clipboard.size
+        return pixel[0] - width//2, pixel[1] - height//2
+
+    def liftSelection(self) -> bool:
+        """Cuts selected pixels of the active layer into a floating region, which placeFloating moves anywhere
 
-        # print(pixels)
+        Returns:
+            bool: False if the active layer can not be changed
+        """
+        canvas = self.getEditableCanvas()
+        if canvas is None: return False
+
+        self.floating = self.getSelectedPixels()
+        self.floatingOrigin = self.floating.position
+        self.floatingUnderneath = None
+        self.fillSelection(canvas)
+        return True
+
+    def placeFloating(self, position: tuple[int, int]) -> None:
+        """Writes floating region at position, pixels it covered at previous position are restored first"""
+        canvas = self.layers.activeLayer.canvas
+        if self.floatingUnderneath is not None:
+            underPosition, underPixels = self.floatingUnderneath
+            canvas.setRegion(underPosition, underPixels)
+            self.drawingBoard.markDirty(self.drawingBoard.toBoardRect(QRect(*underPosition, underPixels.shape[1], underPixels.shape[0])))
+
+        region = self.floating.moved(position)
+        self.floatingUnderneath = canvas.getRegion(position, region.size)
+        canvas.setRegion(position, region.pixels, region.mask)
+        self.drawingBoard.markDirty(self.drawingBoard.toBoardRect(QRect(*position, *region.size)))
+        self.setSelection(region.cropped(self.projectSize))
+
+    def dropFloating(self) -> None:
+        self.floating = None
+        self.floatingOrigin = None
+        self.floatingUnderneath = None
+
+    def nudgeSelection(self, dx: int, dy: int) -> None:
+        """Moves selected pixels by one bead, every nudge is a single operation"""
+        if self.selection is None or self.mouseDown: return
+
+        self.history.begin()
+        if self.liftSelection():
+            x, y = self.floatingOrigin
+            self.placeFloating((x+dx, y+dy))
+            self.dropFloating()
+        changes = self.history.commit()
+        if changes is not None: self.historyChanged(changes)
+        self.refreshHistoryIndicator()
 
     #!Drawing board event functions
     def getPixelXYFromXY(self, coordinates: QPoint) -> tuple[int, int]:
@@ -557,10 +1254,9 @@ class Editor(QMainWindow):
         return pixel
 
     def drawPixels(self) -> None:
-        """Draws all pixels onto QLabel
+        """Redraws whole visible part of the board in next frame
         """
-        self.drawingBoard.setZoom(self.zoom)
-        self.drawingBoard.update()
+        self.drawingBoard.scheduler.markDirty()
 
     def checkXYWithinImage(self, pixel: tuple[int, int]) -> bool:
         """Checks if pixel is within the image
@@ -571,35 +1267,46 @@ class Editor(QMainWindow):
         Returns:
             bool: Is the point in the image?
         """
-        x = 0 <= pixel[0] < self.projectSize[0]
+        #wrapped project continues without end to both sides
+        x = self.wrapAround or 0 <= pixel[0] < self.projectSize[0]
         y = 0 <= pixel[1] < self.projectSize[1]
         return x and y 
 
     def undo(self) -> None:
-        if len(self.undoHistory) != 0:
-            self.redoHistory.append(QPixmap(self.drawingBoard.pixmap()))
-            self.drawingBoard.setPixmap(QPixmap(self.undoHistory[-1]))
-            self.undoHistory = self.undoHistory[:-1]
+        changes = self.history.undo()
+        if changes is not None:
+            self.historyChanged(changes)
             self.statusBar().showMessage("Cofnieto (Ctrl+Y aby ponowic)")
         else:
             self.statusBar().showMessage("Nie mozna cofnac - historia pusta")
 
-        self.drawPixels()
-
     def redo(self) -> None:
-        if len(self.redoHistory) != 0:
-            self.undoHistory.append(QPixmap(self.drawingBoard.pixmap()))
-            self.drawingBoard.setPixmap(QPixmap(self.redoHistory[-1]))
-            self.redoHistory = self.redoHistory[:-1]
+        changes = self.history.redo()
+        if changes is not None:
+            self.historyChanged(changes)
             self.statusBar().showMessage("Ponowiono (Ctrl+Z aby cofnac)")
-            self.drawPixels()
         else:
             self.statusBar().showMessage("Nie mozna ponowic - historia pusta")
 
-        if len(self.undoHistory) > self.undoLength:
-            self.undoHistory = self.undoHistory[1:]
+    def historyChanged(self, changes: list) -> None:
+        """Repaints and journals tiles changed by an operation, its undo or redo
 
-        self.drawPixels()
+        Args:
+            changes (list): (layer canvas, tile xy) pairs returned by history
+        """
+        layerTiles = {}
+        for canvas, tile in changes:
+            layerTiles.setdefault(canvas, []).append(tile)
+
+        for canvas, tiles in layerTiles.items():
+            self.drawingBoard.refreshTiles(tiles)
+            layer = self.layers.indexOf(canvas)
+            if layer is not None: self.journal.append(canvas, tiles, layer)
+        self.colorStatisticsPanel.refresh()
+
+    def refreshHistoryIndicator(self) -> None:
+        """Shows how much memory undo/redo history takes"""
+        self.historyIndicator.setText(f"  Historia: {round(self.history.memoryUsage/1024/1024, 2)}MB  ")
 
     #!Tool functions
     def changeColor(self, color: tuple[int,int,int] = None) -> None:
@@ -621,47 +1328,101 @@ class Editor(QMainWindow):
         qss = "border: 2px solid lightgray;border-radius: 24px;background-color:rgb%".replace("%", str(tuple(self.color)))
         self.toolButtons["color"].setStyleSheet(qss)
 
+    def changeFillTolerance(self) -> None:
+        """Asks user for max difference of color channels that bucket still treats as the same color"""
+        tolerance, accepted = QInputDialog.getInt(self, "Tolerancja koloru", "Tolerancja (0-255)", self.fillTolerance, 0, 255)
+        if not accepted: return
+
+        self.fillTolerance = tolerance
+        self.statusBar().showMessage(f"Tolerancja wypelniania: {tolerance}")
+
+    def changeLineWidth(self) -> None:
+        """Asks user for width of lines drawn by line tool"""
+        width, accepted = QInputDialog.getInt(self, "Grubosc linii", "Grubosc (w koralikach)", self.lineWidth, 1, 50)
+        if not accepted: return
+
+        self.lineWidth = width
+        self.statusBar().showMessage(f"Grubosc linii: {width}")
+
     def changeTool(self, tool: str) -> None:
         """Changes tool."""
         self.toolButtons[self.tool].setObjectName("")
         self.refreshStyleSheet(self.toolButtons[self.tool])
+        if tool != "select": self.cancelPaste()
         self.lastTool = self.tool
         self.tool = tool
         self.toolButtons[self.tool].setObjectName("activeButton")
         self.refreshStyleSheet(self.toolButtons[self.tool])
 
-    def paintPixel(self, pixel: tuple[int, int]) -> None:
-        if not self.checkXYWithinImage(pixel): return
-        for pixel in self.symmetrize(pixel):
-            self.drawingBoard.paintPixel(pixel)
-        self.drawPixels()
-
-    def paintPixels(self, pixels: list) -> None:
+    def paintPixels(self, pixels: np.ndarray) -> None:
         self.drawingBoard.paintPixels(pixels)
-        self.drawPixels()
 
-    def symmetrize(self, pixel: tuple[int, int]) -> list:
-        pixelList = [pixel]
-        if self.vSymmetry:
-            pixelList.append((pixel[0], (self.projectSize[1] - 1 - pixel[1])))
+    def switchWrapAround(self, checked: bool) -> None:
+        """Shows bracelet as an endless band, tools then paint across the seam of its ends"""
+        self.wrapAround = checked
+        self.drawingBoard.refresh()
+        self.statusBar().showMessage("Zawijanie bransoletki wlaczone" if checked else "Zawijanie bransoletki wylaczone")
+
+    def recenterWrappedView(self) -> None:
+        """Keeps wrapped view scrolled over the second copy of the project, so it never reaches the end of the board"""
+        if not self.wrapAround: return
+        scrollBar = self.drawingBoardScroll.horizontalScrollBar()
+        period = self.projectSize[0]*self.drawingBoard.zoom
+        #board was not resized to all of its copies yet
+        if scrollBar.maximum() < 2*period: return
+
+        value = period + (scrollBar.value() - period) % period
+        if value != scrollBar.value(): scrollBar.setValue(value)
+
+    def wrapPixel(self, pixel: tuple[int, int]) -> tuple[int, int]:
+        """Moves pixel from any copy of a wrapped project onto the project"""
+        if not self.wrapAround: return pixel
+        return pixel[0] % self.projectSize[0], pixel[1]
+
+    def wrapPoints(self, points: np.ndarray) -> np.ndarray:
+        """Same as wrapPixel, but for whole (n, 2) array of points at once"""
+        if not self.wrapAround: return points
+        points = np.array(points).reshape(-1, 2)
+        points[:, 0] %= self.projectSize[0]
+        return points
+
+    def changeSymmetryMode(self, mode: str) -> None:
+        """Changes symmetry mode and marks it in menu and on mirror buttons"""
+        self.symmetry.setMode(mode)
+        self.symmetryActions[mode].setChecked(True)
+
+        xMirrored = mode in ("mirrorX", "mirrorXY")
+        yMirrored = mode in ("mirrorY", "mirrorXY")
+        for button, active in ((self.hSymmetryButton, xMirrored), (self.vSymmetryButton, yMirrored)):
+            button.setObjectName("activeButton" if active else "")
+            self.refreshStyleSheet(button)
+
+    def switchMirror(self, axis: int) -> None:
+        """Toggles mirroring along one axis, keeping the other one, used by toolbar buttons
 
-        if self.hSymmetry:
-            pixelList.append(((self.projectSize[0] - 1 - pixel[0]), pixel[1]))
+        Args:
+            axis (int): 0 for horizontal and 1 for vertical mirror
+        """
+        mirrored = [self.symmetry.mode in ("mirrorX", "mirrorXY"), self.symmetry.mode in ("mirrorY", "mirrorXY")]
+        mirrored[axis] = not mirrored[axis]
+        modes = {(False, False): "none", (True, False): "mirrorX", (False, True): "mirrorY", (True, True): "mirrorXY"}
+        self.changeSymmetryMode(modes[tuple(mirrored)])
 
-        if self.vSymmetry and self.hSymmetry:
-            pixelList.append(((self.projectSize[0] - 1 - pixel[0]), (self.projectSize[1] - 1 - pixel[1])))
+    def changeSymmetryRepeat(self) -> None:
+        """Asks user how many times everything painted is repeated across the width of project"""
+        repeat, accepted = QInputDialog.getInt(self, "Powtorzenia", "Liczba powtorzen w poziomie", self.symmetry.repeat, 1, 50)
+        if not accepted: return
 
-        return pixelList
+        self.symmetry.setRepeat(repeat)
+        self.statusBar().showMessage(f"Powtorzenia w poziomie: {repeat}")
 
-    def brush(self, pixel: tuple[int, int]) -> None:
-        """Function used by brush
+    def brush(self, pixels: list) -> None:
+        """Function used by brush, connects samples with lines and paints them in a single write
 
         Args:
-            pixel (tuple[int, int]): Takes pixel that will become colored
+            pixels (list): Mouse samples collected since last frame
         """
-        if not self.checkXYWithinImage(pixel): return
-        self.paintPixel(pixel)
-        self.drawPixels()
+        self.paintPixels(self.stroke.addSamples(pixels))
 
     def line(self, end: tuple[int, int]) -> None:
         """Draws a line from point to point
@@ -675,12 +1436,61 @@ class Editor(QMainWindow):
         if not self.checkXYWithinImage(start): return
         if not self.checkXYWithinImage(end): return
 
-        points = tools.line.getPointListFromCoordinates(start, end)
+        points = tools.raster.getThickLinePoints(start, end, self.lineWidth, self.lineDiagonalSteps)
 
         if self.mouseDown:
-            self.drawingBoard.setPixmap(QPixmap(self.beforeLineState))
-            self.paintPixels(points)
-            self.drawPixels()
+            self.drawingBoard.setPreview(self.symmetry.apply(self.wrapPoints(points)), self.color)
+
+    def select(self, pixel: tuple[int, int]) -> None:
+        """Function used by selection tool, places clipboard when pasting, drags selection when started
+        inside of it and selects a rectangle otherwise
+
+        Args:
+            pixel (tuple[int, int]): Pixel under the mouse
+        """
+        startPixel = self.getPixelXYFromXY(self.mouseDownPosition)
+        start = self.wrapPixel(startPixel)
+        #relative to the copy of a wrapped project the drag started on, so it does not jump across the seam
+        end = pixel[0] - startPixel[0] + start[0], pixel[1]
+
+        if self.selectionDrag is None:
+            if self.pasting and self.getEditableCanvas() is not None:
+                self.cancelPaste()
+                self.floating = self.clipboard
+                self.floatingOrigin = self.getPastePosition(start)
+                self.floatingUnderneath = None
+                self.selectionDrag = "move"
+            elif self.selection is not None and self.selection.contains(start):
+                self.selectionDrag = "move" if self.liftSelection() else "none"
+            else:
+                self.selectionDrag = "select"
+
+        if self.selectionDrag == "move":
+            x, y = self.floatingOrigin
+            self.placeFloating((x + end[0]-start[0], y + end[1]-start[1]))
+        elif self.selectionDrag == "select":
+            self.setSelection(Region.fromRectangle(start, end, self.projectSize))
+
+    def selectMove(self, event: QMouseEvent) -> None:
+        if not self.pasting: return
+        position = event.windowPos().x(), event.windowPos().y() - 23
+        pixel = self.wrapPixel(self.getPixelXYFromXY(position))
+        self.drawingBoard.movePreview(self.getPastePosition(pixel))
+
+    def magicWand(self, pixel: tuple[int, int]) -> None:
+        """Function used by magic wand, selects pixels of the active layer connected to the clicked one and having its color
+
+        Args:
+            pixel (tuple[int, int]): Clicked pixel
+        """
+        if self.selectionDrag is not None: return
+        self.selectionDrag = "wand"
+
+        pixel = self.wrapPixel(pixel)
+        if not self.checkXYWithinImage(pixel): return
+        canvas = self.layers.activeLayer.canvas
+        runs = tools.fill.floodFillRuns(canvas.getRow, canvas.size, pixel, self.fillTolerance, self.fillDiagonal, self.wrapAround)
+        self.setSelection(Region.fromRuns(runs))
 
     def bucket(self, pixel: tuple[int, int]) -> None:
         """Bucket fills by converting data to image, filling it and converting back to data
@@ -688,7 +1498,7 @@ class Editor(QMainWindow):
         Args:
             pixel (tuple[int, int]): What pixel to color
         """
-        self.drawingBoard.floodFill(*pixel)
+        self.drawingBoard.floodFill(*self.wrapPixel(pixel))
 
     def colorPicker(self, pixel: tuple[int, int]) -> None:
         """Function used by color picker tool
@@ -725,17 +1535,22 @@ class Editor(QMainWindow):
         super().mousePressEvent(event)
         self.mouseDown = True
         self.mouseDownPosition = event.pos().x(), event.pos().y()-23
-        self.undoHistory.append(QPixmap(self.drawingBoard.pixmap()))
-        self.beforeLineState = QPixmap(self.drawingBoard.pixmap())
+        self.history.begin()
+        self.stroke.reset()
+        self.selectionDrag = None
         self.mouseMoveEvent(event)
+        self.drawingBoard.scheduler.flush()
         self.toolLabel.hide()
 
-        if len(self.undoHistory) > self.undoLength:
-            self.undoHistory = self.undoHistory[1:]
-
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
         super().mouseReleaseEvent(event)
+        self.drawingBoard.scheduler.flush()
         self.mouseDown = False
+        self.drawingBoard.commitPreview()
+        self.dropFloating()
+        changes = self.history.commit()
+        if changes is not None: self.historyChanged(changes)
+        self.refreshHistoryIndicator()
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         super().mouseMoveEvent(event)
@@ -743,35 +1558,39 @@ class Editor(QMainWindow):
         pixel = self.getPixelXYFromXY(pos)
 
         self.mouseMessage.setText(str(pixel))
+        self.drawingBoard.scheduler.queueInput(pixel)
 
-        self.tools[self.tool][0](pixel)
-        self.drawPixels()
+    def processInput(self, pixels: list) -> int:
+        """Runs current tool on mouse samples collected since last frame
 
-        if not self.checkXYWithinImage(pixel): return
-        self.redoHistory = []
+        Args:
+            pixels (list): Pixels under the mouse, oldest first
+
+        Returns:
+            int: How many samples were used, the rest is dropped
+        """
+        tool, _, wholePath = self.tools[self.tool]
+        if wholePath:
+            tool(pixels)
+            return len(pixels)
+
+        tool(pixels[-1])
+        return 1
 
     def drawingBoardMoveEvent(self, event: QMouseEvent) -> None:
         if self.tools[self.tool][1] is not None:
             self.tools[self.tool][1](event)
-        self.alignLabel()
 
-        pixel = self.getPixelXYFromXY((event.pos().x(), event.pos().y() - 23))
+        pixel = self.wrapPixel(self.getPixelXYFromXY((event.pos().x(), event.pos().y() - 23)))
         pixel = [str(x) for x in pixel]
 
         self.mouseMessage.setText("  "+", ".join(pixel))
 
-    def drawingBoardScrollEvent(self) -> None:
-        self.alignLabel()
-
-    def resizeEvent(self, event: QResizeEvent) -> None:
-        super().resizeEvent(event)
-        self.alignLabel()
-
     def keyPressEvent(self, event: QKeyEvent) -> None:
         super().keyPressEvent(event)
         if event.modifiers() & Qt.ControlModifier and event.key() == Qt.Key_Z and (not self.mouseDown): self.undo()
         if event.modifiers() & Qt.ControlModifier and event.key() == Qt.Key_Y and (not self.mouseDown): self.redo()
-        if event.modifiers() & Qt.ControlModifier and event.key() == Qt.Key_L and (not self.mouseDown):
+        if event.modifiers() == Qt.ControlModifier|Qt.ShiftModifier and event.key() == Qt.Key_L and (not self.mouseDown):
             self.log()
 
     def closeEvent(self, event: QCloseEvent) -> None:
@@ -785,10 +1604,14 @@ class Editor(QMainWindow):
         saveDialogue.deleteLater()
 
         if userChoice == QMessageBox.Save:
-            self.saveProject(self.filepath)
+            #failed save keeps the journal, so the changes can still be recovered on next open
+            if self.saveProject(self.filepath): self.journal.remove()
+            else: self.journal.close()
         elif userChoice == QMessageBox.Cancel:
             event.ignore()
             return
+        else:
+            self.journal.remove()
 
         super().closeEvent(event)
 
@@ -809,13 +1632,6 @@ class Editor(QMainWindow):
         if self.zoom > 64:
             self.zoom /= 2
 
-        if self.zoom < self.gridHideRange//100 or not self.settings["gridEnabled"]:
-            self.hAlignmentWidget.hide()
-            self.vAlignmentWidget.hide()
-        else:
-            self.hAlignmentWidget.show()
-            self.vAlignmentWidget.show()
-
         self.zoomIndicator.setText(str(round(self.zoom*100))+"%")
-        self.drawPixels()
-        self.alignLabel()
\ No newline at end of file
+        self.drawingBoard.setZoom(self.zoom)
+        self.drawPixels()
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Exports .dpct projects to images without opening the editor
+
+Usage: python exporter.py projects/ other.dpct -o previews --scale 1 4 --grid
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+import projectFile
+from settingsService import getSettings
+
+def ensureGuiApplication() -> None:
+    """Legacy v2 projects are pickled QPixmaps, which can only be decoded with a running QGuiApplication"""
+    from PyQt5.QtGui import QGuiApplication
+    if QGuiApplication.instance() is not None: return
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    global guiApplication
+    guiApplication = QGuiApplication([])
+
+def renderImage(pixels: np.ndarray, scale: int, gridColor: tuple[int, int, int] | None = None, majorInterval: int = 10) -> np.ndarray:
+    """Scales project pixels up, optionally drawing lines between beads
+
+    Args:
+        pixels (np.ndarray): (height, width, 3) project pixels
+        scale (int): Size of one bead in image pixels
+        gridColor (tuple[int, int, int] | None, optional): Color of grid lines, None for no grid. Defaults to None.
+        majorInterval (int, optional): Every majorInterval-th line is drawn twice as thick. Defaults to 10.
+
+    Returns:
+        np.ndarray: (height*scale, width*scale, 3) RGB image
+    """
+    image = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+    if gridColor is None or scale < 2: return image
+
+    height, width = pixels.shape[:2]
+    for axis, count in ((1, width), (0, height)):
+        lines = np.arange(1, count)*scale
+        majorLines = lines[np.arange(1, count) % majorInterval == 0] - 1
+        lines = np.concatenate((lines, majorLines))
+        if axis == 1: image[:, lines] = gridColor
+        else: image[lines] = gridColor
+    return image
+
+def saveImage(image: np.ndarray, filePath: str, quality: int = -1) -> None:
+    from PyQt5.QtGui import QImage
+
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    qImage = QImage(image.data, width, height, width*3, QImage.Format_RGB888)
+    if not qImage.save(filePath, quality=quality):
+        raise OSError(f"Cannot write {filePath}")
+
+def getOutputNames(projects: list) -> list:
+    """Returns output name of every project, projects from different directories sharing a file name
+    get -2, -3... suffix instead of overwriting images of each other"""
+    names = []
+    taken = set()
+    for project in projects:
+        baseName = name = os.path.splitext(os.path.basename(project))[0]
+        number = 1
+        #case is ignored, as Windows and macOS file systems do
+        while name.lower() in taken:
+            number += 1
+            name = f"{baseName}-{number}"
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+def getOutputPath(name: str, outputDirectory: str, scale: int, imageFormat: str, manyScales: bool) -> str:
+    if manyScales: name += f"@{scale}x"
+    return os.path.join(outputDirectory, f"{name}.{imageFormat}")
+
+def exportFile(filePath: str, name: str, options: dict) -> tuple[str, list, float]:
+    """Exports one project at every requested scale under given output name, runs in a worker process
+
+    Returns:
+        tuple[str, list, float]: Project path, written image paths and duration in ms
+    """
+    start = time.perf_counter()
+    if projectFile.isLegacyFile(filePath): ensureGuiApplication()
+    pixels = projectFile.loadProject(filePath)["contents"].toArray()
+
+    written = []
+    scales = options["scales"]
+    for scale in scales:
+        outputPath = getOutputPath(name, options["outputDirectory"], scale, options["format"], len(scales) > 1)
+        image = renderImage(pixels, scale, options["gridColor"], options["majorInterval"])
+        saveImage(image, outputPath, options["quality"])
+        written.append(outputPath)
+
+    return filePath, written, (time.perf_counter() - start)*1000
+
+def findProjects(paths: list) -> list:
+    """Expands directories into .dpct files they contain, project given more than once is listed once"""
+    projects = []
+    for path in paths:
+        if os.path.isdir(path):
+            projects += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".dpct"))
+        else:
+            projects.append(path)
+
+    found = set()
+    uniqueProjects = []
+    for project in projects:
+        if os.path.abspath(project) in found: continue
+        found.add(os.path.abspath(project))
+        uniqueProjects.append(project)
+    return uniqueProjects
+
+def parseColor(text: str) -> tuple[int, int, int]:
+    try:
+        color = tuple(int(x) for x in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("color has to be given as R,G,B")
+    if len(color) != 3 or not all(0 <= x <= 255 for x in color):
+        raise argparse.ArgumentTypeError("color has to be given as R,G,B")
+    return color
+
+def main(arguments: list | None = None) -> int:
+    settings = getSettings()
+
+    parser = argparse.ArgumentParser(description="Exports .dpct projects to PNG or JPG images")
+    parser.add_argument("paths", nargs="+", help="project files or directories with projects")
+    parser.add_argument("-o", "--output", default=".", help="output directory (default: current directory)")
+    parser.add_argument("-s", "--scale", type=int, nargs="+", default=[1], help="image pixels per bead, more than one value exports every scale")
+    parser.add_argument("-f", "--format", choices=("png", "jpg"), default="png")
+    parser.add_argument("-q", "--quality", type=int, default=-1, help="jpg quality 0-100")
+    parser.add_argument("-g", "--grid", action="store_true", help="draw lines between beads, needs scale of at least 2")
+    parser.add_argument("--grid-color", type=parseColor, default=tuple(settings["gridColor"]), help="grid color as R,G,B")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args(arguments)
+
+    if any(scale < 1 for scale in args.scale): parser.error("scale has to be at least 1")
+    os.makedirs(args.output, exist_ok=True)
+
+    options = {
+        "outputDirectory": args.output,
+        "scales": args.scale,
+        "format": args.format,
+        "quality": args.quality,
+        "gridColor": args.grid_color if args.grid else None,
+        "majorInterval": settings["gridMajorInterval"],
+    }
+
+    projects = findProjects(args.paths)
+    failures = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(exportFile, project, name, options): project for project, name in zip(projects, getOutputNames(projects))}
+        for future in as_completed(futures):
+            try:
+                filePath, written, duration = future.result()
+                print(f"OK    {filePath} -> {', '.join(written)} ({round(duration)}ms)", flush=True)
+            except Exception as error:
+                failures += 1
+                print(f"ERROR {futures[future]}: {error}", file=sys.stderr, flush=True)
+
+    duration = time.perf_counter() - start
+    print(f"Exported {len(projects)-failures}/{len(projects)} projects in {round(duration, 2)}s", flush=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
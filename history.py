@@ -0,0 +1,126 @@
+from collections import deque
+from functools import partial
+import numpy as np
+
+from canvas import Canvas
+
+class History:
+    """Undo/redo history storing only the tiles changed by each operation
+
+    Every operation is a dict of (canvas, tile xy) -> (before, after). Before contents of a tile are copied
+    the first time the tile is written to while recording, so recording costs only as much as the change
+    """
+
+    def __init__(self, canvases: list, memoryBudget: int) -> None:
+        self.memoryBudget = memoryBudget
+        self.undoStack = deque()
+        self.redoStack = []
+        self.memoryUsage = 0
+        self.pending = None
+        self.listeners = {}
+
+        for canvas in canvases:
+            self.track(canvas)
+
+    @property
+    def recording(self) -> bool:
+        return self.pending is not None
+
+    def track(self, canvas: Canvas) -> None:
+        """Starts recording writes to canvas"""
+        listener = partial(self.tilesChanged, canvas)
+        self.listeners[canvas] = listener
+        canvas.writeListeners.append(listener)
+
+    def forget(self, canvas: Canvas) -> None:
+        """Stops recording writes to canvas and drops its tiles from all entries"""
+        canvas.writeListeners.remove(self.listeners.pop(canvas))
+        if self.recording:
+            self.pending = {key: before for key, before in self.pending.items() if key[0] is not canvas}
+
+        def removeCanvas(entries) -> list:
+            kept = []
+            for entry in entries:
+                self.memoryUsage -= self.getEntrySize(entry)
+                entry = {key: tiles for key, tiles in entry.items() if key[0] is not canvas}
+                if len(entry) == 0: continue
+                self.memoryUsage += self.getEntrySize(entry)
+                kept.append(entry)
+            return kept
+
+        self.undoStack = deque(removeCanvas(self.undoStack))
+        self.redoStack = removeCanvas(self.redoStack)
+
+    def tilesChanged(self, canvas: Canvas, tiles: np.ndarray) -> None:
+        if not self.recording: return
+        for tile in map(tuple, tiles.tolist()):
+            if (canvas, tile) not in self.pending:
+                self.pending[canvas, tile] = canvas.getTile(tile)
+
+    def begin(self) -> None:
+        """Starts recording an operation, all writes until commit() will be undone together"""
+        self.pending = {}
+
+    def commit(self) -> list | None:
+        """Finishes recording and stores changed tiles as a single history entry
+
+        Returns:
+            list | None: Changed (canvas, tile) pairs, None if nothing changed
+        """
+        if not self.recording: return None
+        pending, self.pending = self.pending, None
+
+        entry = {}
+        for (canvas, tile), before in pending.items():
+            after = canvas.getTile(tile)
+            if not np.array_equal(before, after):
+                entry[canvas, tile] = (before, after)
+        if len(entry) == 0: return None
+
+        for redoEntry in self.redoStack:
+            self.memoryUsage -= self.getEntrySize(redoEntry)
+        self.redoStack = []
+
+        self.undoStack.append(entry)
+        self.memoryUsage += self.getEntrySize(entry)
+        self.trim()
+        return list(entry)
+
+    def undo(self) -> list | None:
+        """Restores state from before last operation
+
+        Returns:
+            list | None: Restored (canvas, tile) pairs, None if there was nothing to undo
+        """
+        if len(self.undoStack) == 0: return None
+        entry = self.undoStack.pop()
+        for (canvas, tile), (before, _) in entry.items():
+            canvas.setTile(tile, before)
+        self.redoStack.append(entry)
+        return list(entry)
+
+    def redo(self) -> list | None:
+        """Restores state from before last undo
+
+        Returns:
+            list | None: Restored (canvas, tile) pairs, None if there was nothing to redo
+        """
+        if len(self.redoStack) == 0: return None
+        entry = self.redoStack.pop()
+        for (canvas, tile), (_, after) in entry.items():
+            canvas.setTile(tile, after)
+        self.undoStack.append(entry)
+        return list(entry)
+
+    def trim(self) -> None:
+        #always keep at least the newest entry, even if it alone is over budget
+        while self.memoryUsage > self.memoryBudget and len(self.undoStack) > 1:
+            self.memoryUsage -= self.getEntrySize(self.undoStack.popleft())
+
+    def setMemoryBudget(self, memoryBudget: int) -> None:
+        self.memoryBudget = memoryBudget
+        self.trim()
+
+    @staticmethod
+    def getEntrySize(entry: dict) -> int:
+        return sum(before.nbytes + after.nbytes for before, after in entry.values())
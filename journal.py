@@ -0,0 +1,200 @@
+import struct
+import zlib
+import os
+import numpy as np
+
+from canvas import Canvas
+from layers import Layer, LayerStack
+from projectFile import LAYER_VISIBLE, LAYER_LOCKED, LAYER_TRANSPARENT
+
+MAGIC = b"DJNL"
+VERSION = 1
+#magic, version, base file
+HEADER = struct.Struct("<4sHB1x")
+#record kind, layer, tile count, payload length, crc32 of payload
+RECORD = struct.Struct("<B3xIIII")
+#x, y, width, height, compressed length
+TILE = struct.Struct("<IIIII")
+#flags, transparent color, background of the canvas, name length
+LAYERPROPERTIES = struct.Struct("<B3s3sI")
+#new index of a moved layer
+LAYERMOVE = struct.Struct("<I")
+
+#changes of the layer stack are records too, so they never need the whole project written again
+RECORD_TILES = 0
+RECORD_LAYER = 1
+RECORD_INSERTLAYER = 2
+RECORD_REMOVELAYER = 3
+RECORD_MOVELAYER = 4
+
+#which file the journal records should be replayed on
+BASE_PROJECT = 0
+BASE_AUTOSAVE = 1
+
+class Journal:
+    """Append-only log of committed operations, kept next to a project file
+
+    Every record holds current contents of all tiles of one layer changed by one operation, or a single
+    change of the layer stack. A record is written with a single write and checked with crc32 on replay,
+    so a crash can only lose the last one
+    """
+
+    def __init__(self, filePath: str) -> None:
+        self.filePath = filePath
+        self.file = None
+        #changes every time the journal is replaced, so stale offsets can be detected
+        self.generation = 0
+
+    @property
+    def size(self) -> int:
+        return self.file.tell() if self.file is not None else 0
+
+    def reset(self, base: int, tail: bytes = b"") -> None:
+        """Atomically replaces journal with an empty one (or one holding only specified records)"""
+        self.close()
+        temporaryPath = self.filePath + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, base) + tail)
+        os.replace(temporaryPath, self.filePath)
+        self.file = open(self.filePath, "ab")
+        self.generation += 1
+
+    def fold(self, offset: int, base: int) -> None:
+        """Drops records before offset, they were written into base file in the meantime"""
+        self.file.flush()
+        with open(self.filePath, "rb") as file:
+            file.seek(offset)
+            tail = file.read()
+        self.reset(base, tail)
+
+    def append(self, canvas: Canvas, tiles: list, layer: int = 0) -> None:
+        """Appends current contents of tiles as a single record
+
+        Args:
+            canvas (Canvas): Canvas of the layer
+            tiles (list): xy coordinates of changed tiles
+            layer (int, optional): Index of the layer, counted from the bottom one. Defaults to 0.
+        """
+        if self.file is None or len(tiles) == 0: return
+
+        payload = []
+        for tile in tiles:
+            rows, columns = canvas.getTileSlice(tile)
+            pixels = canvas.getTile(tile)
+            compressed = zlib.compress(pixels.tobytes(), 1)
+            payload.append(TILE.pack(columns.start, rows.start, pixels.shape[1], pixels.shape[0], len(compressed)) + compressed)
+        self.writeRecord(RECORD_TILES, layer, b"".join(payload), len(tiles))
+
+    def appendLayer(self, layer: Layer, index: int, inserted: bool = False) -> None:
+        """Appends options of a layer, or the whole layer if it was just inserted and is still empty
+
+        Args:
+            layer (Layer): Changed or inserted layer
+            index (int): Index of the layer, counted from the bottom one
+            inserted (bool, optional): Layer was inserted at index. Defaults to False.
+        """
+        flags = LAYER_VISIBLE*layer.visible | LAYER_LOCKED*layer.locked
+        transparentColor = layer.transparentColor
+        if transparentColor is not None: flags |= LAYER_TRANSPARENT
+        else: transparentColor = (0, 0, 0)
+
+        nameBytes = layer.name.encode("utf-8")
+        payload = LAYERPROPERTIES.pack(flags, bytes(transparentColor), bytes(layer.canvas.background), len(nameBytes)) + nameBytes
+        self.writeRecord(RECORD_INSERTLAYER if inserted else RECORD_LAYER, index, payload)
+
+    def appendRemoveLayer(self, index: int) -> None:
+        self.writeRecord(RECORD_REMOVELAYER, index, b"")
+
+    def appendMoveLayer(self, index: int, newIndex: int) -> None:
+        self.writeRecord(RECORD_MOVELAYER, index, LAYERMOVE.pack(newIndex))
+
+    def writeRecord(self, kind: int, layer: int, payload: bytes, tileCount: int = 0) -> None:
+        if self.file is None: return
+        self.file.write(RECORD.pack(kind, layer, tileCount, len(payload), zlib.crc32(payload)) + payload)
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.filePath): os.remove(self.filePath)
+
+def readJournal(filePath: str) -> tuple[int, list]:
+    """Reads all complete records of a journal
+
+    Returns:
+        tuple[int, list]: Base file and list of (kind, layer, data) records, data being list of (x, y, pixels)
+        for tile records, dict of layer options for layer and inserted layer records, new index for moved layer
+        records and None for removed layer records
+    """
+    with open(filePath, "rb") as file:
+        contents = file.read()
+
+    if len(contents) < HEADER.size: return BASE_PROJECT, []
+    magic, version, base = HEADER.unpack_from(contents)
+    if magic != MAGIC or version != VERSION: return BASE_PROJECT, []
+
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(contents):
+        kind, layer, tileCount, payloadLength, crc = RECORD.unpack_from(contents, offset)
+        payload = contents[offset+RECORD.size:offset+RECORD.size+payloadLength]
+        #torn write at the end of the file
+        if len(payload) != payloadLength or zlib.crc32(payload) != crc: break
+
+        records.append((kind, layer, decodeRecord(kind, payload, tileCount)))
+        offset += RECORD.size + payloadLength
+
+    return base, records
+
+def decodeRecord(kind: int, payload: bytes, tileCount: int):
+    if kind in (RECORD_LAYER, RECORD_INSERTLAYER):
+        flags, transparentColor, background, nameLength = LAYERPROPERTIES.unpack_from(payload)
+        return {
+            "name": payload[LAYERPROPERTIES.size:LAYERPROPERTIES.size+nameLength].decode("utf-8"),
+            "visible": bool(flags & LAYER_VISIBLE),
+            "locked": bool(flags & LAYER_LOCKED),
+            "transparentColor": tuple(transparentColor) if flags & LAYER_TRANSPARENT else None,
+            "background": tuple(background),
+        }
+    if kind == RECORD_MOVELAYER: return LAYERMOVE.unpack(payload)[0]
+    if kind == RECORD_REMOVELAYER: return None
+
+    record = []
+    tileOffset = 0
+    for _ in range(tileCount):
+        x, y, width, height, compressedLength = TILE.unpack_from(payload, tileOffset)
+        tileOffset += TILE.size
+        pixels = np.frombuffer(zlib.decompress(payload[tileOffset:tileOffset+compressedLength]), dtype=np.uint8)
+        record.append((x, y, pixels.reshape(height, width, 3)))
+        tileOffset += compressedLength
+    return record
+
+def replay(stack: LayerStack, records: list) -> None:
+    """Applies journal records to layers of the stack, in order
+
+    Args:
+        stack (LayerStack): Layers of the base file
+        records (list): Records returned by readJournal, records of missing layers are skipped
+    """
+    for kind, index, data in records:
+        if kind == RECORD_INSERTLAYER:
+            canvas = Canvas(*stack.composite.size, data["background"])
+            stack.insert(min(index, len(stack.layers)), Layer(canvas, data["name"], data["visible"], data["locked"], data["transparentColor"]), refresh=False)
+            continue
+        if index >= len(stack.layers): continue
+
+        layer = stack.layers[index]
+        if kind == RECORD_TILES:
+            for x, y, pixels in data:
+                layer.canvas.setRegion((x, y), pixels)
+        elif kind == RECORD_LAYER:
+            layer.name, layer.visible, layer.locked, layer.transparentColor = data["name"], data["visible"], data["locked"], data["transparentColor"]
+        #the last layer is never removed by the editor, a journal removing it is broken
+        elif kind == RECORD_REMOVELAYER and len(stack.layers) > 1:
+            stack.remove(index)
+        elif kind == RECORD_MOVELAYER and data < len(stack.layers):
+            stack.move(index, data)
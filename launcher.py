@@ -1,15 +1,22 @@
 # pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+#imported first, so that import time is measured too
+import startupTimer
 from functools import partial
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from editor import *
-import json
 import sys
 import os
 
-from newproject import NewProject
-from settings import Settings
+#editor, settings window, new project window and thumbnails pull in numpy and
+#a lot of widgets, they are imported when first needed instead
+from recentProjects import RecentProjects, ExistenceChecker
+from settingsService import getSettings
+
+startupTimer.mark("import")
+
+#same as thumbnails.THUMBNAILSIZE, placeholders are drawn before thumbnails module is loaded
+THUMBNAILSIZE = 48
 
 def getAbsPath(relPath: str) -> str:
     absFile = __file__
@@ -28,10 +35,14 @@ class Launcher(QWidget):
         self.setWindowIcon(QIcon(getAbsPath("icons/designer.png")))
         self.setWindowTitle("Projektant")
 
-        self.settingsWindow = Settings()
+        self.settingsWindow = None
+        self.painted = False
 
         self.refreshSettings()
         self.loadStyleSheet(self.settings['theme'])
+        self.settings.themeChanged.connect(self.applyTheme)
+        #buttons with theme dependent icons and their icon names
+        self.themedButtons = []
 
         self.titleLayout = QVBoxLayout(self)
         self.titleLayout.setAlignment(Qt.AlignTop)
@@ -45,24 +56,24 @@ class Launcher(QWidget):
 
         self.newProjectButton = QToolButton(objectName="projectManagerButton")
         self.newProjectButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        self.newProjectButton.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/plus.png")))
+        self.themedButtons.append((self.newProjectButton, "plus"))
         self.newProjectButton.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         self.newProjectButton.setText("  Stworz nowy projekt")
         self.newProjectButton.clicked.connect(self.newProject)
 
         self.openProjectButton = QToolButton(objectName="projectManagerButton")
         self.openProjectButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        self.openProjectButton.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/document.png")))
+        self.themedButtons.append((self.openProjectButton, "document"))
         self.openProjectButton.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         self.openProjectButton.setText("  Otworz istniejacy projekt")
         self.openProjectButton.clicked.connect(self.openProject)
 
         self.settingsButton = QToolButton(objectName="projectManagerButton")
         self.settingsButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        self.settingsButton.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/settings.png")))
+        self.themedButtons.append((self.settingsButton, "settings"))
         self.settingsButton.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         self.settingsButton.setText("  Ustawienia")
-        self.settingsButton.clicked.connect(self.settingsWindow.show)
+        self.settingsButton.clicked.connect(self.showSettings)
 
         self.options.addWidget(QLabel(text="Rozpocznij", objectName="recentsTitle"))
         self.options.addWidget(self.newProjectButton)
@@ -71,14 +82,14 @@ class Launcher(QWidget):
         self.options.addItem(QSpacerItem(2, 2, QSizePolicy.Expanding, QSizePolicy.Expanding))
 
         githubButton = QToolButton(text="  Github | LorDawid")
-        githubButton.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/github.png")))
+        self.themedButtons.append((githubButton, "github"))
         githubButton.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         githubButton.setStyleSheet("border: none; font-size: 13px;")
         githubButton.clicked.connect(lambda: QDesktopServices.openUrl(QUrl("https://www.github.com/LorDawid/designer")))
         self.options.addWidget(githubButton)
 
         freepikButton = QToolButton(text="  Icons from Freepik")
-        freepikButton.setIcon(QIcon(getAbsPath(f"icons/{self.settings['theme']}/freepik.png")))
+        self.themedButtons.append((freepikButton, "freepik"))
         freepikButton.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
         freepikButton.setStyleSheet("border: none; font-size: 13px;")
         freepikButton.clicked.connect(lambda: QDesktopServices.openUrl(QUrl("https://www.freepik.com/")))
@@ -102,51 +113,100 @@ class Launcher(QWidget):
         self.titleLayout.addWidget(self.title)
         self.titleLayout.addLayout(self.mainLayout)
         self.titleLayout.setStretch(1, 1)
+        self.setThemeIcons(self.settings['theme'])
 
     def loadStyleSheet(self, color: str) -> None:
-        with open(getAbsPath(f"styles/{color}.qss")) as file:
-            self.setStyleSheet(file.read())
+        self.setStyleSheet(getSettings().getStyleSheet(color))
+
+    def setThemeIcons(self, theme: str) -> None:
+        for button, icon in self.themedButtons:
+            button.setIcon(QIcon(getAbsPath(f"icons/{theme}/{icon}.png")))
+
+    def applyTheme(self, theme: str) -> None:
+        self.loadStyleSheet(theme)
+        self.setThemeIcons(theme)
 
     def loadRecentProjects(self) -> None:
-        with open(getAbsPath("recentProjects.json")) as file:
-            recents = json.loads(file.read())
+        """Shows recent projects right away from stored metadata, missing files are marked once background checks finish"""
+        self.recents = RecentProjects(getAbsPath("recentProjects.json"))
+        self.recentRows = {}
+        placeholder = QPixmap(THUMBNAILSIZE, THUMBNAILSIZE)
+        placeholder.fill(QColor(220, 220, 220))
 
-        self.recents = []
-        for location, file in recents.items():
-            if not (os.path.exists(location) and os.path.isfile(location)): location = "Plik zostal usuniety lub przeniesiony"
+        for location, file in self.recents.getEntries():
             layout = QHBoxLayout()
             layout.setSpacing(0)
 
+            thumbnail = QLabel(alignment=Qt.AlignCenter)
+            thumbnail.setPixmap(placeholder)
+            thumbnail.setContentsMargins(0, 0, 5, 0)
+
             button = QToolButton(text=">",objectName="projectButton")
             button.setMaximumWidth(50)
             button.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
             button.clicked.connect(partial(self.openEditor, projectLocation=location))
 
-            location = (location[:40] + '...') if len(location) > 40 else location
-            file["name"] = (file["name"][:35] + '...') if len(file["name"]) > 35 else file["name"]
-            text = f"""
-            {file['name']}<br>
-            <font size=5px>{self.PROJECTTYPES[file['type']]}</font>
-            <font color='lightgray' size=5px>{location}</font>"""
-
-            label = QLabel(text=text, objectName="projectLabel")
+            label = QLabel(text=self.getRecentProjectText(file, location), objectName="projectLabel")
             label.setTextFormat(Qt.RichText)
+            layout.addWidget(thumbnail)
             layout.addWidget(label)
             layout.addWidget(button)
             self.recentsLayout.addLayout(layout)
-            self.recents.append(file)
+            self.recentRows[location] = file, label, button, thumbnail
+
+        self.existenceChecker = ExistenceChecker(self)
+        self.existenceChecker.checked.connect(self.recentProjectChecked)
+        self.existenceChecker.check(list(self.recentRows))
+
+    def loadThumbnails(self) -> None:
+        from thumbnails import ThumbnailCache
+        self.thumbnails = ThumbnailCache(self)
+        self.thumbnails.ready.connect(self.thumbnailReady)
+        self.thumbnails.request(list(self.recentRows))
+
+    def getRecentProjectText(self, file: dict, location: str) -> str:
+        location = (location[:40] + '...') if len(location) > 40 else location
+        name = (file["name"][:35] + '...') if len(file["name"]) > 35 else file["name"]
+        return f"""
+            {name}<br>
+            <font size=5px>{self.PROJECTTYPES.get(file['type'], file['type'])}</font>
+            <font color='lightgray' size=5px>{location}</font>"""
+
+    def recentProjectChecked(self, location: str, exists: bool) -> None:
+        if exists or location not in self.recentRows: return
+        file, label, button, _ = self.recentRows[location]
+        label.setText(self.getRecentProjectText(file, "Plik zostal usuniety lub przeniesiony"))
+        button.setEnabled(False)
+
+    def thumbnailReady(self, location: str, image: QImage) -> None:
+        if location not in self.recentRows: return
+        self.recentRows[location][3].setPixmap(QPixmap.fromImage(image))
 
     def refreshSettings(self) -> None:
-        with open(getAbsPath("settings.json")) as file:
-            self.settings = json.loads(file.read())
+        self.settings = getSettings()
 
     def openProject(self) -> None:
         fileLocation, _ = QFileDialog.getOpenFileName(self,"Otworz projekt", "","Projekty (*.dpct)")
         self.openEditor(fileLocation)
 
     def newProject(self) -> None:
+        from newproject import NewProject
         self.newProjectWindow = NewProject(self)
 
+    def showSettings(self) -> None:
+        if self.settingsWindow is None:
+            from settings import Settings
+            self.settingsWindow = Settings()
+        self.settingsWindow.show()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            startupTimer.mark("launcher first paint")
+            #placeholders are shown first, thumbnails are decoded once the window is up
+            QTimer.singleShot(0, self.loadThumbnails)
+
     def errorMessage(self, text: str, informativeText: str) -> None:
         message = QMessageBox()
         message.setIcon(QMessageBox.Critical)
@@ -159,6 +219,7 @@ class Launcher(QWidget):
         if not os.path.exists(projectLocation): 
             self.errorMessage("Nie mozna otworzyc pliku", "Sprawdz czy adres pliku jest poprawny")
             return
+        from editor import Editor
         self.hide()
         self.editor = Editor(projectLocation)
 
@@ -170,6 +231,7 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
 
     if len(sys.argv) == 2 and os.path.exists(sys.argv[1]) and os.path.isfile(sys.argv[1]):
+        from editor import Editor
         appWindow = Editor(sys.argv[1])
     else:
         appWindow = Launcher()
@@ -0,0 +1,139 @@
+import numpy as np
+
+from canvas import Canvas
+
+#color of the composite where no layer has a bead
+BACKGROUND = (255, 255, 255)
+
+class Layer:
+    """Single layer of the project, pixels of transparentColor are empty and show layers below
+
+    A layer without transparentColor covers everything below it
+    """
+
+    def __init__(self, canvas: Canvas, name: str, visible: bool = True, locked: bool = False, transparentColor: tuple[int, int, int] | None = None) -> None:
+        self.canvas = canvas
+        self.name = name
+        self.visible = visible
+        self.locked = locked
+        self.transparentColor = transparentColor
+
+class LayerStack:
+    """Ordered layers of the project, the first one is at the bottom
+
+    Layers are flattened into a cached composite canvas, which is what the board, export and
+    color statistics read. Tiles of the composite are blended again right after a layer writes them,
+    so keeping it up to date costs as much as the change, not the whole stack
+    """
+
+    def __init__(self, layers: list) -> None:
+        width, height = layers[0].canvas.size
+        self.composite = Canvas(width, height, BACKGROUND)
+        self.layers = []
+        for layer in layers:
+            self.insert(len(self.layers), layer, refresh=False)
+        self.active = len(self.layers)-1
+        self.refreshComposite()
+
+    @classmethod
+    def fromProject(cls, projectData: dict) -> "LayerStack":
+        """Creates stack from project loaded by projectFile.loadProject, projects without layers get a single one"""
+        if projectData.get("layers") is None:
+            return cls([Layer(projectData["contents"], "Warstwa 1")])
+
+        layers = []
+        for layer in projectData["layers"]:
+            layers.append(Layer(layer["canvas"], layer["name"], layer["visible"], layer["locked"], layer["transparentColor"]))
+        return cls(layers)
+
+    def getFileLayers(self, copy: bool = False) -> list:
+        """Returns layers in the form projectFile.saveProject takes
+
+        Args:
+            copy (bool, optional): Copy canvases, so they can be saved on another thread. Defaults to False.
+        """
+        return [{
+            "name": layer.name,
+            "visible": layer.visible,
+            "locked": layer.locked,
+            "transparentColor": layer.transparentColor,
+            "canvas": layer.canvas.copy() if copy else layer.canvas,
+        } for layer in self.layers]
+
+    @property
+    def activeLayer(self) -> Layer:
+        return self.layers[self.active]
+
+    def indexOf(self, canvas: Canvas) -> int | None:
+        for index, layer in enumerate(self.layers):
+            if layer.canvas is canvas: return index
+        return None
+
+    def insert(self, index: int, layer: Layer, refresh: bool = True) -> None:
+        layer.canvas.changeListeners.append(self.tilesChanged)
+        self.layers.insert(index, layer)
+        if refresh: self.refreshComposite()
+
+    def remove(self, index: int) -> Layer:
+        layer = self.layers.pop(index)
+        layer.canvas.changeListeners.remove(self.tilesChanged)
+        self.active = min(self.active, len(self.layers)-1)
+        self.refreshComposite()
+        return layer
+
+    def move(self, index: int, newIndex: int) -> None:
+        self.layers.insert(newIndex, self.layers.pop(index))
+        self.refreshComposite()
+
+    def tilesChanged(self, tiles: np.ndarray) -> None:
+        for tile in map(tuple, tiles.tolist()):
+            self.composite.setTile(tile, self.blend(tile))
+
+    def getEmptyColor(self) -> tuple[int, int, int]:
+        """Color of the composite where no layer has a stored tile"""
+        color = BACKGROUND
+        for layer in self.layers:
+            if layer.visible and layer.canvas.background != layer.transparentColor: color = layer.canvas.background
+        return color
+
+    def blend(self, tile: tuple[int, int]) -> np.ndarray | None:
+        """Flattens visible layers in a tile, from the bottom one up
+
+        Returns:
+            np.ndarray | None: Blended pixels, None if the tile has the empty color
+        """
+        result = None
+        color = BACKGROUND
+        for layer in self.layers:
+            if not layer.visible: continue
+            pixels = layer.canvas.getTileView(tile)
+            if pixels is None:
+                #tile that is not stored has a single color, which either covers everything below or is transparent
+                if layer.canvas.background != layer.transparentColor: result, color = None, layer.canvas.background
+                continue
+
+            if result is None:
+                result = np.empty_like(pixels)
+                result[:] = color
+            if layer.transparentColor is None:
+                result[:] = pixels
+            else:
+                mask = (pixels != layer.transparentColor).any(axis=2)
+                result[mask] = pixels[mask]
+        return result
+
+    def refreshComposite(self) -> None:
+        """Blends composite again, needed when layers are added, removed, reordered or change options
+
+        Only tiles stored by some layer or by the composite are blended, unless the empty color changed
+        """
+        emptyColor = self.getEmptyColor()
+        if emptyColor != self.composite.background:
+            self.composite.fill(emptyColor)
+            tiles = self.composite.getRectTiles(0, 0, *self.composite.size)
+        else:
+            tiles = set(self.composite.tiles)
+            for layer in self.layers:
+                tiles.update(layer.canvas.tiles)
+            tiles = np.array(sorted(tiles), dtype=np.intp).reshape(-1, 2)
+        self.tilesChanged(tiles)
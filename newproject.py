@@ -2,14 +2,15 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-import pickle
-import json
 import os
+import numpy as np
 
 from customWidgets import *
 from resolutionCalc import Calculator
-
-extensionVersion = "2.0"
+from canvas import Canvas, imageToArray
+import projectFile
+from settingsService import getSettings
+import tools.quantize
 
 def getAbsPath(relPath: str) -> str:
     absFile = __file__
@@ -21,13 +22,19 @@ class NewProject(QWidget):
     PROJECTTYPES = {
         "Bransoletka": "bracelet"
     }
+    PALETTEMODES = ["Mediana (median cut)", "K-srednie (k-means)", "Katalog koralikow"]
+    #smallest and largest allowed width and height of a project
+    SIZERANGE = (5, 5000)
 
     def __init__(self, launcherWindow):
         super().__init__()
+        #a new window is made for every new project, so closed ones are deleted instead of piling up hidden
+        self.setAttribute(Qt.WA_DeleteOnClose)
         self.resize(400, 300)
         self.show()
         self.refreshSettings()
         self.loadStyleSheet(self.settings['theme'])
+        self.settings.themeChanged.connect(self.loadStyleSheet)
         self.launcherWindow = launcherWindow
 
         self.setWindowIcon(QIcon("icons/designer.png"))
@@ -51,7 +58,7 @@ class NewProject(QWidget):
 
         self.calculator = Calculator(self)
         sizeRange = QIntValidator()
-        sizeRange.setRange(5, 500)
+        sizeRange.setRange(*self.SIZERANGE)
         self.sizeLayout = QHBoxLayout()
         self.xSize = QLineEdit(text="0")
         self.xSize.textChanged.connect(self.sizeChanged)
@@ -76,6 +83,45 @@ class NewProject(QWidget):
         self.projectType.addItems(["Bransoletka"])
         self.projectType.setFixedHeight(40)
 
+        #photo import, project is created from quantized image instead of being blank
+        self.sourcePixels = None
+        self.downsampled = None
+
+        self.importButton = QToolButton(text="Wczytaj obraz", clicked=self.chooseImage)
+        self.importButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        self.importButton.setFixedHeight(40)
+
+        self.importSettings = QWidget()
+        self.importLayout = QHBoxLayout(self.importSettings)
+        self.importLayout.setContentsMargins(0, 0, 0, 0)
+        self.importOptions = QVBoxLayout()
+        self.importOptions.setAlignment(Qt.AlignTop)
+
+        self.paletteMode = QComboBox()
+        self.paletteMode.addItems(self.PALETTEMODES)
+        self.paletteMode.currentIndexChanged.connect(self.schedulePreview)
+        self.colorCount = QSpinBox(minimum=2, maximum=64, value=8)
+        self.colorCount.valueChanged.connect(self.schedulePreview)
+        self.dithering = QCheckBox("Dithering (Floyd-Steinberg)")
+        self.dithering.toggled.connect(self.schedulePreview)
+        removeImageButton = QToolButton(text="Usun obraz", clicked=self.removeImage)
+
+        self.importOptions.addWidget(QLabel(text="Paleta"))
+        self.importOptions.addWidget(self.paletteMode)
+        self.importOptions.addWidget(QLabel(text="Ilosc kolorow"))
+        self.importOptions.addWidget(self.colorCount)
+        self.importOptions.addWidget(self.dithering)
+        self.importOptions.addWidget(removeImageButton)
+
+        self.importPreview = QLabel(alignment=Qt.AlignCenter)
+        self.importPreview.setFixedSize(200, 200)
+        self.importLayout.addLayout(self.importOptions)
+        self.importLayout.addWidget(self.importPreview)
+        self.importSettings.hide()
+
+        #parameters can change many times per second while typing or scrolling, preview only the last one
+        self.previewTimer = QTimer(singleShot=True, interval=50, timeout=self.updatePreview)
+
         self.finalLayout = QHBoxLayout()
         self.saveButton = QToolButton(text="Zapisz i otworz", objectName="coloredButton", clicked=self.saveAndOpen)
         self.saveButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
@@ -93,6 +139,9 @@ class NewProject(QWidget):
         self.mainLayout.addWidget(self.estSize)
         self.mainLayout.addWidget(QLabel(text="Typ projektu"))
         self.mainLayout.addWidget(self.projectType)
+        self.mainLayout.addWidget(QLabel(text="Obraz (opcjonalnie)"))
+        self.mainLayout.addWidget(self.importButton)
+        self.mainLayout.addWidget(self.importSettings)
         self.mainLayout.addLayout(self.finalLayout)
 
     def toSafeFileName(self, name: str) -> str:
@@ -112,6 +161,11 @@ class NewProject(QWidget):
     def cancel(self) -> None:
         self.close()
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        #settings service lives as long as the app, so it would keep restyling the closed window
+        self.settings.themeChanged.disconnect(self.loadStyleSheet)
+        super().closeEvent(event)
+
     def errorMessage(self, text: str, informativeText: str) -> None:
         message = QMessageBox()
         message.setIcon(QMessageBox.Critical)
@@ -132,33 +186,102 @@ class NewProject(QWidget):
             self.errorMessage("Wybrany rozmiar nie jest liczbami", "Sprawdz, czy rozmiar zostal poprawnie wpisany")
             return
 
-        contents = PickablePixmap(*size)
-        contents.fill(QColor(*self.settings["defaultColor"]))
+        #validator lets through values typed only partially, like 1 on the way to 10
+        minSize, maxSize = self.SIZERANGE
+        if not all(minSize <= x <= maxSize for x in size):
+            self.errorMessage("Wybrany rozmiar jest poza zakresem", f"Szerokosc i wysokosc musza miescic sie miedzy {minSize} a {maxSize}")
+            return
 
-        toWrite = {
-            "version": extensionVersion,
-            "type": self.PROJECTTYPES[self.projectType.currentText()],
-            "size": [self.xSize.text(), self.ySize.text()],
-            "contents": contents,
-            "name": self.projectName.text()
-        }
+        if self.sourcePixels is not None:
+            contents = Canvas.fromArray(self.getImportedPixels(size))
+        else:
+            #empty project stores no tiles, whatever its size
+            contents = Canvas(*size, self.settings["defaultColor"])
 
         try:
-            with open(filePath, "wb") as f:
-                pickle.dump(toWrite, f)
+            projectFile.saveProject(filePath, self.projectName.text(), self.PROJECTTYPES[self.projectType.currentText()], contents)
         except Exception:
             self.errorMessage("Nie mozna zapisac pliku", "Nieznany problem, sprobuj ponownie")
 
         self.close()
         self.launcherWindow.openEditor(filePath)
 
+    def chooseImage(self) -> None:
+        fileName, _ = QFileDialog.getOpenFileName(self, "Wybierz obraz", "", "Obrazy (*.png *.jpg *.jpeg *.bmp *.gif)")
+        if fileName == "": return
+
+        image = QImage(fileName)
+        if image.isNull():
+            self.errorMessage("Nie mozna wczytac obrazu", "Sprawdz, czy plik jest poprawnym obrazem")
+            return
+
+        self.sourcePixels = imageToArray(image)
+        self.downsampled = None
+
+        #keep aspect ratio of the image if size was not chosen yet, setText skips the validator so both are clamped
+        minSize, maxSize = self.SIZERANGE
+        try:
+            width = int(self.xSize.text())
+        except ValueError:
+            width = 0
+        if not minSize <= width <= maxSize:
+            width = max(minSize, min(image.width(), 100))
+            self.xSize.setText(str(width))
+        height = round(width*image.height()/image.width())
+        self.ySize.setText(str(max(minSize, min(height, maxSize))))
+
+        self.importButton.setText(os.path.basename(fileName))
+        self.importSettings.show()
+        self.schedulePreview()
+
+    def removeImage(self) -> None:
+        self.sourcePixels = None
+        self.downsampled = None
+        self.importPreview.clear()
+        self.importButton.setText("Wczytaj obraz")
+        self.importSettings.hide()
+
+    def schedulePreview(self) -> None:
+        if self.sourcePixels is not None: self.previewTimer.start()
+
+    def getImportedPixels(self, size: tuple[int, int]) -> np.ndarray:
+        """Downsamples and quantizes loaded image to project size, downsampled image is cached
+
+        Args:
+            size (tuple[int, int]): Project size
+
+        Returns:
+            np.ndarray: (height, width, 3) project pixels
+        """
+        if self.downsampled is None or self.downsampled.shape[:2] != (size[1], size[0]):
+            self.downsampled = tools.quantize.downsample(self.sourcePixels, size[0], size[1])
+
+        colorCount = self.colorCount.value()
+        mode = self.paletteMode.currentIndex()
+        if mode == 0: palette = tools.quantize.medianCut(self.downsampled, colorCount)
+        elif mode == 1: palette = tools.quantize.kMeans(self.downsampled, colorCount)
+        else: palette = tools.quantize.limitPalette(self.downsampled, tools.quantize.getCataloguePalette(), colorCount)
+
+        if self.dithering.isChecked(): return tools.quantize.floydSteinberg(self.downsampled, palette)
+        return tools.quantize.mapToPalette(self.downsampled, palette)
+
+    def updatePreview(self) -> None:
+        try:
+            size = int(self.xSize.text()), int(self.ySize.text())
+        except ValueError:
+            return
+        if size[0] < 1 or size[1] < 1: return
+
+        preview = Canvas.fromArray(self.getImportedPixels(size))
+        image = preview.toImage()
+        #one bead is a few screen pixels, smooth scaling would blur them together
+        self.importPreview.setPixmap(QPixmap.fromImage(image).scaled(self.importPreview.size(), Qt.KeepAspectRatio, Qt.FastTransformation))
+
     def loadStyleSheet(self, color: str) -> None:
-        with open(getAbsPath(f"styles/{color}.qss")) as file:
-            self.setStyleSheet(file.read())
+        self.setStyleSheet(getSettings().getStyleSheet(color))
 
     def refreshSettings(self) -> None:
-        with open(getAbsPath("settings.json")) as file:
-            self.settings = json.loads(file.read())
+        self.settings = getSettings()
 
     def projectNameChanged(self) -> None:
         name = self.projectName.text()
@@ -166,12 +289,16 @@ class NewProject(QWidget):
 
     def sizeChanged(self) -> None:
         try:
-            x = int(self.xSize.text())
-            y = int(self.ySize.text())
-        except Exception:
+            size = int(self.xSize.text()), int(self.ySize.text())
+        except ValueError:
             return
+        if size[0] < 1 or size[1] < 1: return
+        self.schedulePreview()
 
-        estimatedSize = (3*(x*y)+231)/1000
+        #blank project stores no tiles, so encoding it is cheap and gives its exact size
+        contents = Canvas(*size, self.settings["defaultColor"])
+        projectType = self.PROJECTTYPES[self.projectType.currentText()]
+        estimatedSize = len(projectFile.encodeProject(self.projectName.text(), projectType, contents))/1000
         if estimatedSize > 1000:
             estimatedSize /= 1000
             estimatedSize = round(estimatedSize, 2)
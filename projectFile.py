@@ -0,0 +1,361 @@
+import pickle
+import os
+import struct
+import zlib
+import numpy as np
+
+from canvas import Canvas, TILESIZE
+
+extensionVersion = "3.0"
+
+MAGIC = b"DPCT"
+#magic, major version, minor version, compression, index size in bytes, width, height,
+#palette size, name length, type length, pixel block offset, pixel block length
+HEADER = struct.Struct("<4sHHBB2xIIIIIQQ")
+PIXELALIGNMENT = 64
+
+#layers follow pixel block of the composite, files without layers end right after it
+#magic, layer count
+LAYERSHEADER = struct.Struct("<4sI")
+LAYERSMAGIC = b"LAYR"
+#flags, transparent color, name length, pixel block length
+LAYER = struct.Struct("<B3sIQ")
+LAYER_VISIBLE = 1
+LAYER_LOCKED = 2
+LAYER_TRANSPARENT = 4
+
+#every pixel block is split into tiles and tiles holding only background are not stored, table of the
+#stored tiles comes first and their pixel blocks follow it one after another
+#tile size, background palette index, stored tile count
+TILES = struct.Struct("<III")
+#tile x, tile y, tile pixel block length
+TILE = struct.Struct("<IIQ")
+
+COMPRESSION_RAW = 0
+COMPRESSION_ZLIB = 1
+
+class ProjectFileError(Exception):
+    pass
+
+def toPalette(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Splits RGB pixels into palette of unique colors and palette indices
+
+    Args:
+        pixels (np.ndarray): (height, width, 3) RGB pixels
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (n, 3) palette and (height, width) indices
+    """
+    packed = pixels[..., 0].astype(np.uint32) << 16 | pixels[..., 1].astype(np.uint32) << 8 | pixels[..., 2]
+    #searchsorted is much faster than return_inverse of np.unique
+    colors = np.unique(packed)
+    indices = np.searchsorted(colors, packed)
+    palette = np.stack((colors >> 16, colors >> 8 & 255, colors & 255), axis=1).astype(np.uint8)
+    return palette, indices
+
+def getIndexType(paletteSize: int) -> np.dtype:
+    if paletteSize <= 1 << 8: return np.dtype(np.uint8)
+    if paletteSize <= 1 << 16: return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+def encodePixelBlock(indices: np.ndarray, compression: int) -> bytes:
+    pixelBlock = indices.tobytes()
+    if compression == COMPRESSION_ZLIB:
+        pixelBlock = zlib.compress(pixelBlock)
+    return pixelBlock
+
+def decodePixelBlock(pixelBlock: bytes, header: dict, shape: tuple[int, int]) -> np.ndarray:
+    """Decodes palette indices of given (height, width) shape"""
+    if header["compression"] == COMPRESSION_ZLIB:
+        pixelBlock = zlib.decompress(pixelBlock)
+    elif header["compression"] != COMPRESSION_RAW:
+        raise ProjectFileError(f"Unknown compression {header['compression']}")
+
+    indices = np.frombuffer(pixelBlock, dtype=header["indexType"])
+    if len(indices) != shape[0]*shape[1]: raise ProjectFileError("Pixel block has wrong size")
+    return indices.reshape(shape)
+
+def encodeTiles(canvas: Canvas, background: int, indices: np.ndarray, compression: int) -> bytes:
+    """Encodes stored tiles of canvas, indices hold palette indices of all of them one after another"""
+    tileLength = TILESIZE*TILESIZE
+    blocks = [encodePixelBlock(indices[number*tileLength:(number+1)*tileLength], compression) for number in range(len(canvas.tiles))]
+    table = TILES.pack(TILESIZE, background, len(canvas.tiles))
+    table += b"".join(TILE.pack(tileX, tileY, len(block)) for (tileX, tileY), block in zip(canvas.tiles, blocks))
+    #tile pixel blocks start aligned, so raw tiles of the composite can be memory mapped as a single array
+    padding = bytes(-len(table) % PIXELALIGNMENT)
+    return table + padding + b"".join(blocks)
+
+def readTileIndices(file, filePath: str, header: dict, mmap: bool = True) -> tuple[int, dict]:
+    """Reads palette indices of stored tiles of the pixel block the file is at, raw tiles are memory mapped instead of read
+
+    Args:
+        file: File opened for reading, at start of the pixel block
+        filePath (str): Path of the file, for memory mapping
+        header (dict): Header returned by readHeader
+        mmap (bool, optional): Memory map raw tiles. Defaults to True.
+
+    Returns:
+        tuple[int, dict]: Background palette index and (tile size, tile size) palette indices of every stored tile
+    """
+    blockOffset = file.tell()
+    tilesHeader = file.read(TILES.size)
+    if len(tilesHeader) != TILES.size: raise ProjectFileError("Pixel block is too short")
+    tileSize, background, tileCount = TILES.unpack(tilesHeader)
+    table = file.read(TILE.size*tileCount)
+    if len(table) != TILE.size*tileCount: raise ProjectFileError("Pixel block is too short")
+    entries = [TILE.unpack_from(table, number*TILE.size) for number in range(tileCount)]
+    tiles = [(tileX, tileY) for tileX, tileY, _ in entries]
+    dataOffset = blockOffset + TILES.size + len(table)
+    dataOffset += -(TILES.size + len(table)) % PIXELALIGNMENT
+
+    if header["compression"] == COMPRESSION_RAW:
+        tileLength = tileSize*tileSize*header["indexType"].itemsize
+        if any(length != tileLength for _, _, length in entries): raise ProjectFileError("Pixel block has wrong size")
+        shape = (tileCount, tileSize, tileSize)
+        if tileCount == 0: return background, {}
+        if mmap:
+            try:
+                #plain view of the mapping, slicing memmap itself is several times slower with thousands of tiles
+                indices = np.memmap(filePath, dtype=header["indexType"], mode="r", offset=dataOffset, shape=shape).view(np.ndarray)
+            except ValueError:
+                raise ProjectFileError("Pixel block is too short")
+        else:
+            file.seek(dataOffset)
+            pixelBlock = file.read(tileCount*tileLength)
+            if len(pixelBlock) != tileCount*tileLength: raise ProjectFileError("Pixel block is too short")
+            indices = np.frombuffer(pixelBlock, dtype=header["indexType"]).reshape(shape)
+        return background, dict(zip(tiles, indices))
+
+    file.seek(dataOffset)
+    return background, {tile: decodePixelBlock(file.read(length), header, (tileSize, tileSize)) for tile, (_, _, length) in zip(tiles, entries)}
+
+def decodeCanvas(header: dict, background: int, tiles: dict) -> Canvas:
+    """Makes canvas out of palette indices returned by readTileIndices"""
+    palette = header["palette"]
+    if background >= len(palette): raise ProjectFileError("Background is not in the palette")
+    canvas = Canvas(*header["size"], palette[background])
+    for (tileX, tileY), indices in tiles.items():
+        canvas.setRegion((tileX*indices.shape[1], tileY*indices.shape[0]), palette[indices])
+    return canvas
+
+def encodeLayers(layers: list, blocks: list) -> bytes:
+    """Encodes layer block out of already encoded pixel blocks of every layer"""
+    contents = [LAYERSHEADER.pack(LAYERSMAGIC, len(layers))]
+    for layer, pixelBlock in zip(layers, blocks):
+        flags = LAYER_VISIBLE*layer["visible"] | LAYER_LOCKED*layer["locked"]
+        transparentColor = layer["transparentColor"]
+        if transparentColor is not None: flags |= LAYER_TRANSPARENT
+        else: transparentColor = (0, 0, 0)
+
+        nameBytes = layer["name"].encode("utf-8")
+        contents += [LAYER.pack(flags, bytes(transparentColor), len(nameBytes), len(pixelBlock)), nameBytes, pixelBlock]
+    return b"".join(contents)
+
+def encodeProject(name: str, projectType: str, canvas: Canvas, compression: int = COMPRESSION_ZLIB, layers: list | None = None) -> bytes:
+    """Encodes project into .dpct v3 bytes, only stored tiles of canvases are written
+
+    Args:
+        name (str): Project name
+        projectType (str): Project type, for example "bracelet"
+        canvas (Canvas): Composite of the project
+        compression (int, optional): COMPRESSION_RAW or COMPRESSION_ZLIB. Defaults to COMPRESSION_ZLIB.
+        layers (list | None, optional): Layers from the bottom one, as returned by loadLayers. Defaults to None.
+
+    Returns:
+        bytes: Whole file contents
+    """
+    canvases = [canvas] + [layer["canvas"] for layer in layers or []]
+    #composite and all layers share a single palette, backgrounds of the canvases come first
+    pixels = [np.array([canvas.background for canvas in canvases], dtype=np.uint8)]
+    pixels += [tile.reshape(-1, 3) for canvas in canvases for tile in canvas.tiles.values()]
+    palette, indices = toPalette(np.concatenate(pixels))
+    indexType = getIndexType(len(palette))
+    indices = indices.astype(indexType)
+
+    blocks = []
+    offset = len(canvases)
+    for number, canvas in enumerate(canvases):
+        length = len(canvas.tiles)*TILESIZE*TILESIZE
+        blocks.append(encodeTiles(canvas, int(indices[number]), indices[offset:offset+length], compression))
+        offset += length
+    pixelBlock = blocks[0]
+    layerBlock = encodeLayers(layers, blocks[1:]) if layers else b""
+
+    nameBytes = name.encode("utf-8")
+    typeBytes = projectType.encode("utf-8")
+    metadata = nameBytes + typeBytes + palette.tobytes()
+
+    pixelOffset = -(-(HEADER.size + len(metadata)) // PIXELALIGNMENT) * PIXELALIGNMENT
+    padding = bytes(pixelOffset - HEADER.size - len(metadata))
+
+    width, height = canvases[0].size
+    header = HEADER.pack(MAGIC, 3, 0, compression, indexType.itemsize, width, height, len(palette),
+                         len(nameBytes), len(typeBytes), pixelOffset, len(pixelBlock))
+    return header + metadata + padding + pixelBlock + layerBlock
+
+def readHeader(file) -> dict:
+    """Reads header, name, type and palette from an opened v3 file
+
+    Returns:
+        dict: Project metadata, "pixelOffset" and "pixelLength" point at pixel block, "layerOffset" at layer block
+    """
+    headerBytes = file.read(HEADER.size)
+    if len(headerBytes) != HEADER.size: raise ProjectFileError("File is too short")
+
+    (magic, major, minor, compression, indexSize, width, height, paletteSize,
+     nameLength, typeLength, pixelOffset, pixelLength) = HEADER.unpack(headerBytes)
+    if magic != MAGIC: raise ProjectFileError("Not a .dpct v3 file")
+    if major != 3: raise ProjectFileError(f"Unsupported version {major}.{minor}")
+
+    name = file.read(nameLength).decode("utf-8")
+    projectType = file.read(typeLength).decode("utf-8")
+    palette = np.frombuffer(file.read(paletteSize*3), dtype=np.uint8).reshape(-1, 3)
+
+    return {
+        "version": f"{major}.{minor}",
+        "type": projectType,
+        "size": (width, height),
+        "name": name,
+        "palette": palette,
+        "compression": compression,
+        "indexType": np.dtype(f"<u{indexSize}"),
+        "pixelOffset": pixelOffset,
+        "pixelLength": pixelLength,
+        "layerOffset": pixelOffset + pixelLength,
+    }
+
+def isLegacyFile(filePath: str) -> bool:
+    with open(filePath, "rb") as file:
+        return file.read(len(MAGIC)) != MAGIC
+
+def loadPixelIndices(filePath: str, mmap: bool = True) -> tuple[dict, int, dict]:
+    """Loads palette indices of the composite of a v3 file, raw files are memory mapped instead of read
+
+    Returns:
+        tuple[dict, int, dict]: Header, background palette index and palette indices of every stored tile
+    """
+    with open(filePath, "rb") as file:
+        header = readHeader(file)
+        file.seek(header["pixelOffset"])
+        background, tiles = readTileIndices(file, filePath, header, mmap)
+    return header, background, tiles
+
+def loadContents(filePath: str) -> tuple[dict, Canvas]:
+    """Loads composite of a v3 file without its layers
+
+    Returns:
+        tuple[dict, Canvas]: Header and composite of the project
+    """
+    header, background, tiles = loadPixelIndices(filePath)
+    return header, decodeCanvas(header, background, tiles)
+
+def loadLayers(filePath: str) -> list | None:
+    """Loads layers of a v3 file
+
+    Returns:
+        list | None: Layers from the bottom one as dicts with "name", "visible", "locked", "transparentColor"
+        and "canvas", None if the file holds only the composite
+    """
+    with open(filePath, "rb") as file:
+        header = readHeader(file)
+        file.seek(header["layerOffset"])
+        layersHeader = file.read(LAYERSHEADER.size)
+        if len(layersHeader) == 0: return None
+        magic, layerCount = LAYERSHEADER.unpack(layersHeader)
+        if magic != LAYERSMAGIC: raise ProjectFileError("Layer block is damaged")
+
+        layers = []
+        for _ in range(layerCount):
+            layerBytes = file.read(LAYER.size)
+            if len(layerBytes) != LAYER.size: raise ProjectFileError("Layer block is too short")
+            flags, transparentColor, nameLength, pixelLength = LAYER.unpack(layerBytes)
+            name = file.read(nameLength).decode("utf-8")
+            pixelOffset = file.tell()
+            canvas = decodeCanvas(header, *readTileIndices(file, filePath, header))
+            file.seek(pixelOffset + pixelLength)
+
+            layers.append({
+                "name": name,
+                "visible": bool(flags & LAYER_VISIBLE),
+                "locked": bool(flags & LAYER_LOCKED),
+                "transparentColor": tuple(transparentColor) if flags & LAYER_TRANSPARENT else None,
+                "canvas": canvas,
+            })
+    return layers
+
+#classes a v2 project may hold, pickle would create anything a file names otherwise
+LEGACYCLASSES = {("customWidgets", "PickablePixmap"), ("PyQt5.QtCore", "QByteArray")}
+SIPUNPICKLERS = {("sip", "_unpickle_type"), ("PyQt5.sip", "_unpickle_type")}
+
+class LegacyUnpickler(pickle.Unpickler):
+    """Unpickler of v2 projects, refuses every class outside of LEGACYCLASSES"""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) in LEGACYCLASSES: return super().find_class(module, name)
+        if (module, name) in SIPUNPICKLERS:
+            #some sip versions pickle Qt classes through a helper taking the class name as an argument
+            unpickleType = super().find_class(module, name)
+            def unpickleLegacyType(typeModule: str, typeName: str, args: tuple):
+                if (typeModule, typeName) not in LEGACYCLASSES:
+                    raise ProjectFileError(f"{typeModule}.{typeName} is not allowed in a project file")
+                return unpickleType(typeModule, typeName, args)
+            return unpickleLegacyType
+        raise ProjectFileError(f"{module}.{name} is not allowed in a project file")
+
+def loadLegacyProject(filePath: str) -> dict:
+    """Loads pickled v2 project, needs running QApplication to decode the pixmap"""
+    with open(filePath, "rb") as file:
+        projectData = LegacyUnpickler(file).load()
+
+    contents = Canvas.fromImage(projectData["contents"].toImage())
+    return {
+        "version": projectData["version"],
+        "type": projectData["type"],
+        "size": tuple(int(x) for x in projectData["size"]),
+        "name": projectData["name"],
+        "contents": contents,
+        "layers": None,
+    }
+
+def loadProject(filePath: str) -> dict:
+    """Loads project from file, v2 pickles are migrated transparently
+
+    Args:
+        filePath (str): File path
+
+    Returns:
+        dict: "version", "type", "size", "name", "contents" as Canvas of the composite
+        and "layers" as returned by loadLayers
+    """
+    if isLegacyFile(filePath): return loadLegacyProject(filePath)
+
+    header, contents = loadContents(filePath)
+    return {
+        "version": header["version"],
+        "type": header["type"],
+        "size": header["size"],
+        "name": header["name"],
+        "contents": contents,
+        "layers": loadLayers(filePath),
+    }
+
+def saveProject(filePath: str, name: str, projectType: str, canvas: Canvas, compression: int = COMPRESSION_ZLIB, layers: list | None = None) -> None:
+    """Saves project to file in v3 format
+
+    Args:
+        filePath (str): File path
+        name (str): Project name
+        projectType (str): Project type, for example "bracelet"
+        canvas (Canvas): Composite of the project
+        compression (int, optional): COMPRESSION_RAW or COMPRESSION_ZLIB. Defaults to COMPRESSION_ZLIB.
+        layers (list | None, optional): Layers from the bottom one, as returned by loadLayers. Defaults to None.
+    """
+    contents = encodeProject(name, projectType, canvas, compression, layers)
+
+    #write next to the target and swap, so a crash never leaves a half written project
+    temporaryPath = filePath + ".tmp"
+    with open(temporaryPath, "wb") as file:
+        file.write(contents)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporaryPath, filePath)
@@ -0,0 +1,77 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+import json
+import os
+import time
+
+MAXENTRIES = 20
+
+class RecentProjects:
+    """Most recently used projects, stored in recentProjects.json as {path: {"name", "type", "lastOpened"}}"""
+
+    def __init__(self, filePath: str, maxEntries: int = MAXENTRIES) -> None:
+        self.filePath = filePath
+        self.maxEntries = maxEntries
+        self.entries = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.filePath) as file:
+                self.entries = json.loads(file.read())
+        except (OSError, ValueError):
+            self.entries = {}
+
+        #entries written before lastOpened existed keep their order at the end of the list
+        for order, entry in enumerate(self.entries.values()):
+            entry.setdefault("lastOpened", -order)
+        self.trim()
+
+    def save(self) -> None:
+        temporaryPath = self.filePath + ".tmp"
+        with open(temporaryPath, "w") as file:
+            file.write(json.dumps(self.entries))
+        os.replace(temporaryPath, self.filePath)
+
+    def trim(self) -> None:
+        for path, _ in self.getEntries()[self.maxEntries:]:
+            del self.entries[path]
+
+    def getEntries(self) -> list:
+        """Returns list of (path, entry) pairs, the most recently opened first"""
+        return sorted(self.entries.items(), key=lambda item: item[1]["lastOpened"], reverse=True)
+
+    def add(self, path: str, name: str, projectType: str) -> None:
+        """Moves project to the top of the list and saves it"""
+        self.entries[path] = {
+            "name": name,
+            "type": projectType,
+            "lastOpened": time.time(),
+        }
+        self.trim()
+        self.save()
+
+class ExistenceCheckTask(QRunnable):
+    def __init__(self, checker: "ExistenceChecker", path: str) -> None:
+        super().__init__()
+        self.checker = checker
+        self.path = path
+
+    def run(self) -> None:
+        self.checker.checked.emit(self.path, os.path.isfile(self.path))
+
+class ExistenceChecker(QObject):
+    """Checks if files exist on worker threads, a slow network share never blocks the UI"""
+
+    #file path, does the file exist
+    checked = pyqtSignal(str, bool)
+
+    def __init__(self, parent: QObject = None) -> None:
+        super().__init__(parent)
+        #own pool, so that hanging checks do not starve autosave in the global pool
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
+
+    def check(self, paths: list) -> None:
+        for path in paths:
+            self.pool.start(ExistenceCheckTask(self, path))
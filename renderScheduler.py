@@ -0,0 +1,57 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+class RenderScheduler(QObject):
+    """Collects dirty rects and mouse input of a widget and handles both at most once per display frame"""
+
+    def __init__(self, widget: QWidget) -> None:
+        super().__init__(widget)
+        self.widget = widget
+        self.dirtyRegion = QRegion()
+        self.pendingInput = []
+        self.inputHandler = None
+
+        self.processedEvents = 0
+        self.droppedEvents = 0
+
+        screen = QGuiApplication.primaryScreen()
+        refreshRate = screen.refreshRate() if screen is not None else 60
+        self.frameTimer = QTimer(self, singleShot=True, interval=max(1, round(1000/refreshRate)))
+        self.frameTimer.timeout.connect(self.frame)
+
+    def markDirty(self, rect: QRect | None = None) -> None:
+        """Schedules repainting of rect (whole widget if not specified) in next frame"""
+        if rect is None: rect = self.widget.rect()
+        self.dirtyRegion += rect
+        self.schedule()
+
+    def queueInput(self, sample) -> None:
+        """Queues mouse sample for next frame, sample same as the previous one is dropped"""
+        if len(self.pendingInput) != 0 and self.pendingInput[-1] == sample:
+            self.droppedEvents += 1
+            return
+
+        self.pendingInput.append(sample)
+        self.schedule()
+
+    def schedule(self) -> None:
+        if not self.frameTimer.isActive():
+            self.frameTimer.start()
+
+    def flush(self) -> None:
+        """Handles everything that is queued right now, without waiting for next frame"""
+        self.frameTimer.stop()
+        self.frame()
+
+    def frame(self) -> None:
+        if len(self.pendingInput) != 0 and self.inputHandler is not None:
+            samples, self.pendingInput = self.pendingInput, []
+            processed = self.inputHandler(samples)
+            self.processedEvents += processed
+            self.droppedEvents += len(samples) - processed
+
+        if not self.dirtyRegion.isEmpty():
+            self.widget.update(self.dirtyRegion)
+            self.dirtyRegion = QRegion()
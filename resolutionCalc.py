@@ -2,11 +2,10 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-import json
-import sys
 import os
 
 from settings import SettingWidget
+from settingsService import getSettings
 
 def getAbsPath(relPath: str) -> str:
     absFile = __file__
@@ -16,10 +15,10 @@ def getAbsPath(relPath: str) -> str:
 
 class Calculator(QWidget):
     def __init__(self, newProjectWindow):
-        super().__init__()
+        #separate window, but a child of the new project window, so it shares its style sheet and is deleted with it
+        super().__init__(newProjectWindow, Qt.Window)
         self.resize(400, 100)
         self.refreshSettings()
-        self.loadStyleSheet(self.settings["theme"])
         self.setWindowTitle("Projektant | Obliczanie rozdzielczosci")
         self.mainLayout = QVBoxLayout(self)
         self.newProjectWindow = newProjectWindow
@@ -51,13 +50,8 @@ class Calculator(QWidget):
         message.setWindowTitle("Blad")
         message.exec_()
 
-    def loadStyleSheet(self, color: str) -> None:
-        with open(getAbsPath(f"styles/{color}.qss")) as file:
-            self.setStyleSheet(file.read())
-
     def refreshSettings(self) -> None:
-        with open(getAbsPath("settings.json"), "r") as file:
-            self.settings = json.loads(file.read())
+        self.settings = getSettings()
 
     def calculate(self) -> None:
         try:
@@ -2,11 +2,10 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-import json
-import sys
 import os
 
 from customWidgets import *
+from settingsService import getSettings
 
 def getAbsPath(relPath: str) -> str:
     absFile = __file__
@@ -53,7 +52,8 @@ class Settings(QWidget):
         #?-
         self.theme = SettingWidget(parent, text="Motyw", clickableWidget=QComboBox(), widgetWidth=100)
         self.theme.clickableWidget.addItems(self.getThemes())
-        self.clipboardSize = SettingWidget(parent, text="Pojemnosc schowka", clickableWidget=QSpinBox(), widgetWidth=100)
+        self.historyMemory = SettingWidget(parent, text="Pamiec historii (MB)", clickableWidget=QSpinBox(), widgetWidth=100)
+        self.historyMemory.clickableWidget.setRange(1, 4096)
         self.autosaveTime = SettingWidget(parent, text="Czestotliwosc autozapisu (s)", clickableWidget=QSpinBox(), widgetWidth=100)
         self.settingsLayout.addWidget(Divider(True))
 
@@ -64,6 +64,8 @@ class Settings(QWidget):
         self.gridVisibility = SettingWidget(parent, text="Widocznosc (od ilu %)", clickableWidget=QSpinBox(), widgetWidth=100)
         self.gridVisibility.clickableWidget.setRange(20, 6400)
         self.gridVisibility.clickableWidget.setSingleStep(100)
+        self.gridMajorInterval = SettingWidget(parent, text="Gruba linia co (koralikow)", clickableWidget=QSpinBox(), widgetWidth=100)
+        self.gridMajorInterval.clickableWidget.setRange(1, 100)
         self.settingsLayout.addWidget(Divider(True))
         #?-
         self.settingsLayout.addWidget(CenteredLabel(text="Tworzenie projektow"))
@@ -82,10 +84,10 @@ class Settings(QWidget):
         self.settingsLayout.addLayout(self.optionLayout)
 
         self.refreshSettings()
+        getSettings().themeChanged.connect(self.loadStyleSheet)
 
     def loadStyleSheet(self, color: str) -> None:
-        with open(getAbsPath(f"styles/{color}.qss")) as file:
-            self.setStyleSheet(file.read())
+        self.setStyleSheet(getSettings().getStyleSheet(color))
 
     def errorMessage(self, text: str, informativeText: str) -> None:
         """Displays and error message in another window
@@ -99,16 +101,16 @@ class Settings(QWidget):
         message.exec_()
 
     def refreshSettings(self) -> None:
-        with open(getAbsPath("settings.json")) as file:
-            settings = json.loads(file.read())
+        settings = getSettings()
 
         self.loadStyleSheet(settings["theme"])
         self.theme.clickableWidget.setCurrentIndex(self.theme.clickableWidget.findText(settings["theme"]))
-        self.clipboardSize.clickableWidget.setValue(settings["clipboardSize"])
+        self.historyMemory.clickableWidget.setValue(settings["historyMemory"])
         self.autosaveTime.clickableWidget.setValue(settings["autosaveTime"]//1000)
         self.gridEnabled.clickableWidget.setChecked(settings["gridEnabled"])
         self.gridColor.clickableWidget.setColor(settings["gridColor"])
         self.gridVisibility.clickableWidget.setValue(settings["gridVisibility"])
+        self.gridMajorInterval.clickableWidget.setValue(settings["gridMajorInterval"])
         self.defaultColor.clickableWidget.setColor(settings["defaultColor"])
         self.defaultLocation.clickableWidget.setText(settings["defaultSaveLocation"])
 
@@ -137,20 +139,20 @@ class Settings(QWidget):
                 "gridEnabled": self.gridEnabled.clickableWidget.isChecked(),
                 "gridColor": self.gridColor.clickableWidget.color,
                 "gridVisibility": int(self.gridVisibility.clickableWidget.text()),
+                "gridMajorInterval": int(self.gridMajorInterval.clickableWidget.text()),
                 "defaultColor": self.defaultColor.clickableWidget.color,
                 "defaultSaveLocation": filePath,
                 "autosaveTime": int(self.autosaveTime.clickableWidget.text())*1000,
-                "clipboardSize" : int(self.clipboardSize.clickableWidget.text())
+                "historyMemory" : int(self.historyMemory.clickableWidget.text())
             }
 
-            with open(getAbsPath("settings.json"), "w") as file:
-                file.write(json.dumps(settings))
-
-            python = sys.executable
-            os.execl(python, python, *sys.argv)
-
-        except Exception as e:
+            #open windows apply changes themselves, no restart needed
+            getSettings().update(settings)
+        except Exception:
             self.errorMessage("Nie mozna zapisac ustawien", "Sprawdz, czy wszystko zostalo poprawnie wypelnione")
+            return
+
+        self.close()
 
     def showEvent(self, event: QShowEvent) -> None:
         super().showEvent(event)
@@ -0,0 +1,106 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+import json
+import os
+
+def getAbsPath(relPath: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), relPath)
+
+def isColor(value) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 3 and all(isinstance(x, int) and 0 <= x <= 255 for x in value)
+
+def isInRange(minimum: int, maximum: int):
+    return lambda value: isinstance(value, int) and not isinstance(value, bool) and minimum <= value <= maximum
+
+#default value and validator of every setting
+SCHEMA = {
+    "theme": ("light", lambda value: isinstance(value, str) and os.path.isfile(getAbsPath(f"styles/{value}.qss"))),
+    "gridEnabled": (True, lambda value: isinstance(value, bool)),
+    "gridColor": ([50, 50, 50], isColor),
+    "gridVisibility": (400, isInRange(20, 6400)),
+    "gridMajorInterval": (10, isInRange(1, 100)),
+    "defaultColor": ([255, 255, 255], isColor),
+    "defaultSaveLocation": ("", lambda value: isinstance(value, str)),
+    "autosaveTime": (60000, isInRange(1000, 24*60*60*1000)),
+    "historyMemory": (64, isInRange(1, 4096)),
+}
+
+class SettingsService(QObject):
+    """Settings shared by all windows of the process, settings.json is read once
+
+    Windows read values with settings["key"] and follow changes through signals instead of restarting
+    """
+
+    #changed keys and their new values
+    changed = pyqtSignal(dict)
+    #new theme name
+    themeChanged = pyqtSignal(str)
+
+    def __init__(self, filePath: str) -> None:
+        super().__init__()
+        self.filePath = filePath
+        self.values = {}
+        self.styleSheets = {}
+        self.load()
+
+    def __getitem__(self, key: str):
+        return self.values[key]
+
+    def validate(self, values: dict) -> dict:
+        """Returns values with every invalid or missing setting replaced by its default"""
+        validated = {}
+        for key, (default, isValid) in SCHEMA.items():
+            value = values.get(key, default)
+            validated[key] = value if isValid(value) else default
+        return validated
+
+    def load(self) -> None:
+        try:
+            with open(self.filePath) as file:
+                values = json.loads(file.read())
+        except (OSError, ValueError):
+            values = {}
+        self.values = self.validate(values)
+
+    def getStyleSheet(self, theme: str = None) -> str:
+        """Returns contents of the qss file of a theme, every file is read once"""
+        theme = theme or self.values["theme"]
+        if theme not in self.styleSheets:
+            with open(getAbsPath(f"styles/{theme}.qss")) as file:
+                self.styleSheets[theme] = file.read()
+        return self.styleSheets[theme]
+
+    def update(self, values: dict) -> None:
+        """Validates, saves and applies new values
+
+        Args:
+            values (dict): Settings to change, other settings are kept
+
+        Raises:
+            ValueError: If any of the values is invalid
+        """
+        #colors come from widgets as tuples, json stores them as lists
+        values = {key: list(value) if isinstance(value, tuple) else value for key, value in values.items()}
+        for key, value in values.items():
+            if key not in SCHEMA or not SCHEMA[key][1](value): raise ValueError(f"Invalid value of {key}: {value!r}")
+
+        changes = {key: value for key, value in values.items() if self.values[key] != value}
+        newValues = {**self.values, **values}
+
+        temporaryPath = self.filePath + ".tmp"
+        with open(temporaryPath, "w") as file:
+            file.write(json.dumps(newValues, indent=4))
+        os.replace(temporaryPath, self.filePath)
+
+        self.values = newValues
+        if len(changes) == 0: return
+        self.changed.emit(changes)
+        if "theme" in changes: self.themeChanged.emit(changes["theme"])
+
+service = None
+
+def getSettings() -> SettingsService:
+    """Returns the settings service of this process, created on first use"""
+    global service
+    if service is None: service = SettingsService(getAbsPath("settings.json"))
+    return service
@@ -0,0 +1,19 @@
+"""Measures startup phases from the moment this module is imported
+
+Set DESIGNER_STARTUP_TIMES=1 to print every phase to stderr
+"""
+import os
+import sys
+import time
+
+START = time.perf_counter()
+phases = {}
+
+def mark(phase: str) -> float:
+    """Records time of a phase in ms since start, only the first mark of each phase counts"""
+    if phase in phases: return phases[phase]
+
+    phases[phase] = (time.perf_counter() - START)*1000
+    if os.environ.get("DESIGNER_STARTUP_TIMES"):
+        print(f"[startup] {phase}: {round(phases[phase], 1)}ms", file=sys.stderr)
+    return phases[phase]
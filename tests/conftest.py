@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+#modules of the app live in the repository root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def application():
+    """QApplication shared by all tests, only one can exist in a process and widgets need the full one"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,89 @@
+import numpy as np
+
+from canvas import Canvas, TILESIZE
+from history import History
+
+WHITE = (255, 255, 255)
+
+def makePixels(width: int, height: int) -> np.ndarray:
+    """Pixels with a different color in every column and row, so any misplaced pixel is noticed"""
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[..., 0] = np.arange(width)[None, :] % 251
+    pixels[..., 1] = np.arange(height)[:, None] % 251
+    pixels[..., 2] = 7
+    return pixels
+
+def test_array_round_trip_stores_only_drawn_tiles():
+    #edge tiles of a size that is not a multiple of the tile size are smaller
+    width, height = 2*TILESIZE+5, TILESIZE+9
+    data = np.full((height, width, 3), 255, dtype=np.uint8)
+    data[TILESIZE+3:TILESIZE+6, 2*TILESIZE+1:2*TILESIZE+4] = makePixels(3, 3)
+
+    canvas = Canvas.fromArray(data)
+    assert canvas.background == WHITE and list(canvas.tiles) == [(2, 1)]
+    assert (canvas.toArray() == data).all()
+    assert canvas.getTile((2, 1)).shape == (9, 5, 3)
+    assert (canvas.copy().toArray() == data).all()
+
+def test_region_round_trip_across_tile_borders():
+    canvas = Canvas(3*TILESIZE, 2*TILESIZE, WHITE)
+    pixels = makePixels(TILESIZE+10, 20)
+    position = (TILESIZE-5, TILESIZE-10)
+    canvas.setRegion(position, pixels)
+    assert sorted(canvas.tiles) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
+    regionPosition, regionPixels = canvas.getRegion(position, (TILESIZE+10, 20))
+    assert regionPosition == position and (regionPixels == pixels).all()
+
+    #only the part inside of the canvas is written and read back
+    canvas.setRegion((-3, -4), pixels[:10, :10])
+    regionPosition, regionPixels = canvas.getRegion((-3, -4), (10, 10))
+    assert regionPosition == (0, 0) and (regionPixels == pixels[4:10, 3:10]).all()
+    assert canvas.getRegion((3*TILESIZE, 0), (5, 5)) is None
+
+def test_masked_region_and_background_tiles_are_dropped():
+    canvas = Canvas(2*TILESIZE, TILESIZE, WHITE)
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[1, 2] = True
+    canvas.setRegion((TILESIZE-2, 0), np.zeros((4, 4, 3), dtype=np.uint8), mask)
+    assert list(canvas.tiles) == [(1, 0)] and canvas.getPixel((TILESIZE, 1)) == (0, 0, 0)
+
+    canvas.setRegion((TILESIZE, 1), np.full((1, 1, 3), 255, dtype=np.uint8))
+    assert canvas.tiles == {}
+
+def test_undo_and_redo_restore_tiles_across_borders():
+    canvas = Canvas(3*TILESIZE, 2*TILESIZE, WHITE)
+    canvas.setPixels(np.array([[1, 1]]), (0, 0, 255))
+    history = History([canvas], 1 << 24)
+    before = canvas.toArray()
+
+    history.begin()
+    canvas.setRegion((TILESIZE//2, TILESIZE//2), makePixels(2*TILESIZE, TILESIZE))
+    canvas.setPixels(np.array([[0, 0], [3*TILESIZE-1, 2*TILESIZE-1]]), (255, 0, 0))
+    changes = history.commit()
+    after = canvas.toArray()
+    assert sorted(tile for _, tile in changes) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
+
+    history.undo()
+    assert (canvas.toArray() == before).all()
+    #tiles that were background before are freed again, not stored as white
+    assert list(canvas.tiles) == [(0, 0)]
+    history.redo()
+    assert (canvas.toArray() == after).all()
+
+def test_operations_are_undone_one_by_one():
+    canvas = Canvas(TILESIZE+1, TILESIZE+1, WHITE)
+    history = History([canvas], 1 << 24)
+    states = [canvas.toArray()]
+    for index, pixel in enumerate([(TILESIZE, 0), (0, TILESIZE), (TILESIZE, TILESIZE)]):
+        history.begin()
+        canvas.setPixels(np.array([pixel]), (index, 0, 0))
+        history.commit()
+        states.append(canvas.toArray())
+
+    for state in reversed(states[:-1]):
+        history.undo()
+        assert (canvas.toArray() == state).all()
+    assert history.undo() is None
+    for state in states[1:]:
+        history.redo()
+        assert (canvas.toArray() == state).all()
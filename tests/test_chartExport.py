@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+from canvas import Canvas
+from chartExport import BeadChart, getSymbol
+from colorStats import ColorStatistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#growth of peak memory of the process while writing a chart, in KB, ~6MB is measured for any length
+MEMORYCEILING = 32*1024
+
+#runs in a fresh interpreter, so peak memory of other tests does not count
+SCRIPT = """
+import resource
+import sys
+import numpy as np
+from PyQt5.QtGui import QGuiApplication
+from canvas import Canvas
+from chartExport import BeadChart
+from colorStats import ColorStatistics
+
+application = QGuiApplication([])
+width, height = 8, 2000
+canvas = Canvas(width, height, (255, 255, 255))
+canvas.setRegion((0, 0), np.random.default_rng(1).integers(0, 4, (height, width, 1)).repeat(3, axis=2).astype(np.uint8)*60)
+chart = BeadChart(canvas, "Projekt", ColorStatistics(canvas).getTotals())
+
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+chart.writePdf(sys.argv[1], resolution=72)
+print("growth:%d" % (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before))
+"""
+
+def makeChart(canvas: Canvas) -> BeadChart:
+    return BeadChart(canvas, "Projekt", ColorStatistics(canvas).getTotals())
+
+def test_symbols_are_distinct_past_two_characters():
+    symbols = [getSymbol(index) for index in range(60*60)]
+    assert len(set(symbols)) == len(symbols)
+    assert symbols[:2] == ["A", "B"] and len(symbols[-1]) == 3
+
+def test_chart_with_thousands_of_colors(application, tmp_path):
+    #every bead has its own color, more than pairs of symbols can tell apart
+    width, height = 70, 50
+    values = np.arange(width*height, dtype=np.uint32).reshape(height, width)*997
+    pixels = np.stack((values >> 16 & 255, values >> 8 & 255, values & 255), axis=2).astype(np.uint8)
+    chart = makeChart(Canvas.fromArray(pixels))
+    assert len(chart.totals) == width*height
+
+    filePath = str(tmp_path/"chart.pdf")
+    pageCount = chart.writePdf(filePath, resolution=72)
+    assert pageCount == len(chart.getPages()) and os.path.getsize(filePath) > 0
+
+def test_long_chart_stays_within_memory_ceiling(tmp_path):
+    pytest.importorskip("resource")
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", SCRIPT, str(tmp_path/"chart.pdf")], cwd=ROOT, env=environment, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+    growth = int(result.stdout.split("growth:")[1])
+    assert growth < MEMORYCEILING
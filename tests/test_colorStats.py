@@ -0,0 +1,58 @@
+import numpy as np
+
+from canvas import Canvas
+from colorStats import ColorStatistics
+from history import History
+from layers import Layer, LayerStack, BACKGROUND
+
+def countColors(canvas: Canvas) -> dict:
+    """Bead count of every color counted from scratch, what incremental statistics have to match"""
+    colors, counts = np.unique(canvas.toArray().reshape(-1, 3), axis=0, return_counts=True)
+    return {tuple(color): count for color, count in zip(colors.tolist(), counts.tolist())}
+
+def test_counts_follow_set_and_undo():
+    canvas = Canvas(150, 90, (0, 0, 0))
+    history = History([canvas], 1 << 24)
+    statistics = ColorStatistics(canvas)
+    assert dict(statistics.getTotals()) == {(0, 0, 0): 150*90}
+
+    history.begin()
+    #crosses tile borders, so a few tiles change at once
+    canvas.setPixels(np.array([[x, 60] for x in range(20, 140)]), (255, 0, 0))
+    canvas.setRuns([(70, 0, 10)], (0, 255, 0))
+    history.commit()
+    assert dict(statistics.getTotals()) == countColors(canvas)
+    assert dict(statistics.getTotals())[(255, 0, 0)] == 120
+
+    history.undo()
+    assert dict(statistics.getTotals()) == {(0, 0, 0): 150*90}
+    history.redo()
+    assert dict(statistics.getTotals()) == countColors(canvas)
+
+def test_counts_follow_layer_changes():
+    stack = LayerStack([Layer(Canvas(100, 70, (0, 0, 255)), "Warstwa 1")])
+    statistics = ColorStatistics(stack.composite)
+
+    layer = Layer(Canvas(100, 70, BACKGROUND), "Warstwa 2", transparentColor=BACKGROUND)
+    stack.insert(1, layer)
+    layer.canvas.setPixels(np.array([[x, y] for x in range(60, 80) for y in range(5)]), (255, 0, 0))
+    assert dict(statistics.getTotals()) == {(0, 0, 255): 100*70-100, (255, 0, 0): 100}
+
+    stack.layers[0].visible = False
+    stack.refreshComposite()
+    assert dict(statistics.getTotals()) == countColors(stack.composite) == {BACKGROUND: 100*70-100, (255, 0, 0): 100}
+
+    stack.remove(1)
+    stack.layers[0].visible = True
+    stack.refreshComposite()
+    assert dict(statistics.getTotals()) == {(0, 0, 255): 100*70}
+
+def test_csv_has_count_of_every_row(tmp_path):
+    canvas = Canvas(10, 3, BACKGROUND)
+    statistics = ColorStatistics(canvas)
+    canvas.setPixels(np.array([[0, 1], [1, 1], [2, 2]]), (255, 0, 0))
+
+    statistics.exportCsv(str(tmp_path/"colors.csv"))
+    rows = (tmp_path/"colors.csv").read_text().splitlines()
+    assert rows[0] == "Kolor,R,G,B,Razem,Rzad 1,Rzad 2,Rzad 3"
+    assert rows[1:] == ["#ffffff,255,255,255,27,10,8,9", "#ff0000,255,0,0,3,0,2,1"]
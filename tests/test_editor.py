@@ -0,0 +1,141 @@
+import os
+import numpy as np
+import pytest
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QPointF, Qt
+from PyQt5.QtGui import QMouseEvent
+from PyQt5.QtTest import QTest
+
+import editor
+import projectFile
+from canvas import Canvas
+from layers import BACKGROUND
+from tools.selection import Region
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WIDTH, HEIGHT = 10, 6
+
+@pytest.fixture
+def window(application, tmp_path, monkeypatch):
+    """Editor of a blank bracelet saved in a temporary directory"""
+    #style sheets and icons are looked up relative to the working directory
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(editor.Editor, "updateRecentProjects", lambda self: None)
+    filePath = str(tmp_path/"project.dpct")
+    projectFile.saveProject(filePath, "Projekt", "bracelet", Canvas(WIDTH, HEIGHT, BACKGROUND))
+    window = editor.Editor(filePath)
+    window.color = (255, 0, 0)
+    yield window
+    window.journal.remove()
+    #deleted right away, there is no event loop to run deleteLater and shortcuts of a hidden window could still fire
+    window.hide()
+    sip.delete(window)
+
+def getPainted(window: editor.Editor) -> set:
+    """xy coordinates of all pixels of the active layer that are not background"""
+    pixels = window.layers.activeLayer.canvas.toArray()
+    ys, xs = np.nonzero((pixels != BACKGROUND).any(axis=2))
+    return set(zip(xs.tolist(), ys.tolist()))
+
+def click(window: editor.Editor, pixel: tuple[int, int]) -> None:
+    """Presses and releases the mouse over a pixel of the board, the way the window receives it"""
+    origin = window.drawingBoard.geometry().topLeft() + window.drawingBoardScroll.geometry().topLeft()
+    #window subtracts height of the menu bar from positions of its mouse events
+    position = QPointF(origin.x() + pixel[0]*window.zoom, origin.y() + pixel[1]*window.zoom + 23)
+    window.mousePressEvent(QMouseEvent(QEvent.MouseButtonPress, position, Qt.LeftButton, Qt.LeftButton, Qt.NoModifier))
+    window.mouseReleaseEvent(QMouseEvent(QEvent.MouseButtonRelease, position, Qt.LeftButton, Qt.NoButton, Qt.NoModifier))
+
+def test_brush_stroke_is_cut_at_the_edge_without_wrap(window):
+    window.brush([(8, 2), (12, 2)])
+    assert getPainted(window) == {(8, 2), (9, 2)}
+
+def test_brush_stroke_continues_across_the_seam_with_wrap(window):
+    window.switchWrapAround(True)
+    window.brush([(8, 2), (12, 2)])
+    assert getPainted(window) == {(8, 2), (9, 2), (0, 2), (1, 2), (2, 2)}
+
+    #strokes on the copy of the project left of the seam land on the project too
+    window.stroke.reset()
+    window.brush([(-3, 4)])
+    assert (7, 4) in getPainted(window)
+
+def test_bucket_on_wrapped_copy_fills_across_the_seam(window):
+    window.layers.activeLayer.canvas.setPixels(np.array([(x, y) for x in (3, 6) for y in range(HEIGHT)]), (0, 0, 0))
+    window.switchWrapAround(True)
+    window.color = (0, 0, 255)
+    window.bucket((WIDTH+8, 1))
+
+    pixels = window.layers.activeLayer.canvas.toArray()
+    filled = {(x, y) for y, x in zip(*np.nonzero((pixels == (0, 0, 255)).all(axis=2)))}
+    assert filled == {(x, y) for x in (7, 8, 9, 0, 1, 2) for y in range(HEIGHT)}
+
+def drawCorner(window: editor.Editor) -> set:
+    """Paints an L shape of three pixels in the top left of the project"""
+    corner = {(1, 1), (2, 1), (1, 2)}
+    window.layers.activeLayer.canvas.setPixels(np.array(sorted(corner)), (255, 0, 0))
+    return corner
+
+def test_copy_and_paste_places_copy_centered_on_click(window):
+    corner = drawCorner(window)
+    window.setSelection(Region.fromRectangle((1, 1), (2, 2), window.projectSize))
+    window.copySelection()
+    assert getPainted(window) == corner
+
+    window.pasteClipboard()
+    assert window.pasting and window.tool == "select"
+    click(window, (6, 3))
+    pasted = {(x+4, y+1) for x, y in corner}
+    assert getPainted(window) == corner | pasted
+    assert not window.pasting and window.selection.position == (5, 2)
+
+    #paste is a single operation
+    window.undo()
+    assert getPainted(window) == corner
+
+def test_nudge_moves_selected_pixels_and_selection(window):
+    corner = drawCorner(window)
+    window.setSelection(Region.fromRectangle((1, 1), (2, 2), window.projectSize))
+    window.nudgeSelection(1, 0)
+    window.nudgeSelection(0, 1)
+    assert getPainted(window) == {(x+1, y+1) for x, y in corner}
+    assert window.selection.position == (2, 2)
+
+    window.undo()
+    assert getPainted(window) == {(x+1, y) for x, y in corner}
+    window.undo()
+    assert getPainted(window) == corner
+
+def test_delete_clears_only_selected_pixels(window):
+    corner = drawCorner(window)
+    mask = np.zeros((window.projectSize[1], window.projectSize[0]), dtype=bool)
+    mask[1, 1:3] = True
+    window.setSelection(Region.fromMask(mask))
+    window.deleteSelection()
+    assert getPainted(window) == {(1, 2)}
+
+    window.undo()
+    assert getPainted(window) == corner
+
+def test_delete_leaves_locked_layer_unchanged(window):
+    corner = drawCorner(window)
+    window.selectAll()
+    window.layers.activeLayer.locked = True
+    window.deleteSelection()
+    assert getPainted(window) == corner
+
+def test_selection_keys_are_left_to_focused_lists(window):
+    drawCorner(window)
+    window.selectAll()
+    window.activateWindow()
+    assert QTest.qWaitForWindowActive(window)
+    window.switchLayersPanel()
+    window.layersPanel.list.setFocus()
+    QTest.keyClick(window.layersPanel.list, Qt.Key_Right)
+    QTest.keyClick(window.layersPanel.list, Qt.Key_Delete)
+    assert window.selection.position == (0, 0) and len(getPainted(window)) == 3
+
+    window.drawingBoard.setFocus()
+    QTest.keyClick(window.drawingBoard, Qt.Key_Right)
+    assert window.selection.position == (1, 0)
+    QTest.keyClick(window.drawingBoard, Qt.Key_Delete)
+    assert getPainted(window) == set()
@@ -0,0 +1,16 @@
+import os
+
+from exporter import findProjects, getOutputNames
+
+def test_same_named_projects_get_distinct_output_names():
+    projects = [os.path.join("a", "design.dpct"), os.path.join("b", "Design.dpct"), os.path.join("c", "design-2.dpct"), os.path.join("d", "other.dpct")]
+    names = getOutputNames(projects)
+
+    assert names[0] == "design" and names[3] == "other"
+    assert len({name.lower() for name in names}) == len(projects)
+
+def test_project_given_twice_is_exported_once(tmp_path):
+    project = tmp_path/"design.dpct"
+    project.write_bytes(b"")
+
+    assert findProjects([str(tmp_path), str(project)]) == [str(project)]
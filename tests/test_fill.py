@@ -0,0 +1,30 @@
+import numpy as np
+
+from canvas import Canvas
+from tools.fill import floodFillRuns
+
+def getFilled(canvas: Canvas, start: tuple[int, int], **options) -> set:
+    runs = floodFillRuns(canvas.getRow, canvas.size, start, **options)
+    return {(x, y) for y, first, last in runs for x in range(first, last+1)}
+
+def makeWalls(width: int, height: int, columns: list) -> Canvas:
+    canvas = Canvas(width, height, (255, 255, 255))
+    canvas.setPixels(np.array([(x, y) for x in columns for y in range(height)]), (0, 0, 0))
+    return canvas
+
+def test_fill_stops_at_project_edges_without_wrap():
+    canvas = makeWalls(10, 4, [3, 6])
+    assert getFilled(canvas, (7, 1)) == {(x, y) for x in (7, 8, 9) for y in range(4)}
+
+def test_fill_continues_across_the_seam_with_wrap():
+    canvas = makeWalls(10, 4, [3, 6])
+    assert getFilled(canvas, (7, 1), wrap=True) == {(x, y) for x in (7, 8, 9, 0, 1, 2) for y in range(4)}
+    #region between the walls does not touch the seam, so it stays the same
+    assert getFilled(canvas, (4, 0), wrap=True) == {(x, y) for x in (4, 5) for y in range(4)}
+
+def test_diagonal_fill_wraps_to_the_next_row():
+    #only a diagonal step across the seam connects the two pixels
+    canvas = Canvas(6, 3, (0, 0, 0))
+    canvas.setPixels(np.array([(5, 0), (0, 1)]), (255, 255, 255))
+    assert getFilled(canvas, (5, 0), wrap=True) == {(5, 0)}
+    assert getFilled(canvas, (5, 0), wrap=True, diagonal=True) == {(5, 0), (0, 1)}
@@ -0,0 +1,38 @@
+import numpy as np
+
+import journal
+from canvas import Canvas
+from layers import Layer, LayerStack, BACKGROUND
+
+def getState(stack: LayerStack) -> list:
+    return [(layer.name, layer.visible, layer.locked, layer.transparentColor, layer.canvas.toArray().tolist()) for layer in stack.layers]
+
+def test_replay_restores_layer_stack_changes(tmp_path):
+    stack = LayerStack([Layer(Canvas(70, 40, (0, 0, 0)), "Warstwa 1")])
+    base = getState(stack)
+    log = journal.Journal(str(tmp_path/"project.dpct.journal"))
+    log.reset(journal.BASE_PROJECT)
+
+    layer = Layer(Canvas(70, 40, BACKGROUND), "Warstwa 2", transparentColor=BACKGROUND)
+    stack.insert(1, layer)
+    log.appendLayer(layer, 1, inserted=True)
+    layer.canvas.setPixels(np.array([[3, 3], [65, 30]]), (255, 0, 0))
+    log.append(layer.canvas, [(0, 0), (1, 0)], 1)
+
+    stack.layers[0].visible = False
+    log.appendLayer(stack.layers[0], 0)
+    layer.name, layer.locked = "Wzor", True
+    log.appendLayer(layer, 1)
+    stack.move(1, 0)
+    log.appendMoveLayer(1, 0)
+    stack.remove(1)
+    log.appendRemoveLayer(1)
+    log.close()
+
+    recovered = LayerStack([Layer(Canvas(70, 40, (0, 0, 0)), "Warstwa 1")])
+    assert getState(recovered) == base
+    _, records = journal.readJournal(log.filePath)
+    journal.replay(recovered, records)
+    recovered.refreshComposite()
+    assert getState(recovered) == getState(stack)
+    assert (recovered.composite.toArray() == stack.composite.toArray()).all()
@@ -0,0 +1,23 @@
+import os
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+
+from newproject import NewProject
+from settingsService import getSettings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_closed_window_stops_following_theme(application, monkeypatch):
+    #style sheets are looked up relative to the working directory
+    monkeypatch.chdir(ROOT)
+    settings = getSettings()
+    connections = settings.receivers(settings.themeChanged)
+    window = NewProject(None)
+    calculator = window.calculator
+    assert settings.receivers(settings.themeChanged) == connections+1
+
+    window.close()
+    assert settings.receivers(settings.themeChanged) == connections
+    #calculator is a child window, so it goes away together with the closed window
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert sip.isdeleted(calculator)
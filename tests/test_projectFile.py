@@ -0,0 +1,70 @@
+import os
+import pickle
+import numpy as np
+import pytest
+
+import projectFile
+from canvas import Canvas
+
+class SystemCall:
+    def __reduce__(self):
+        return os.system, ("echo unpickled",)
+
+class SipProcess:
+    def __reduce__(self):
+        from PyQt5 import sip
+        return sip._unpickle_type, ("PyQt5.QtCore", "QProcess", ())
+
+def test_legacy_project_refuses_other_classes(tmp_path):
+    filePath = tmp_path/"evil.dpct"
+    filePath.write_bytes(pickle.dumps({"version": "2.0", "contents": SystemCall()}))
+
+    with pytest.raises(projectFile.ProjectFileError):
+        projectFile.loadProject(str(filePath))
+
+def test_legacy_project_refuses_other_qt_classes_through_sip(tmp_path):
+    pytest.importorskip("PyQt5.sip")
+    filePath = tmp_path/"evil.dpct"
+    filePath.write_bytes(pickle.dumps({"version": "2.0", "contents": SipProcess()}))
+
+    with pytest.raises(projectFile.ProjectFileError):
+        projectFile.loadLegacyProject(str(filePath))
+
+def makeCanvas(color: tuple[int, int, int]) -> Canvas:
+    canvas = Canvas(150, 70, (255, 255, 255))
+    canvas.setRegion((60, 20), np.full((10, 80, 3), color, dtype=np.uint8))
+    canvas.setPixels(np.array([[0, 0], [149, 69]]), (1, 2, 3))
+    return canvas
+
+@pytest.mark.parametrize("compression", [projectFile.COMPRESSION_RAW, projectFile.COMPRESSION_ZLIB])
+def test_project_round_trip(tmp_path, compression):
+    composite, layer = makeCanvas((200, 0, 0)), makeCanvas((0, 0, 200))
+    layers = [{"name": "Warstwa 1", "visible": True, "locked": True, "transparentColor": (255, 255, 255), "canvas": layer}]
+    filePath = str(tmp_path/"project.dpct")
+    projectFile.saveProject(filePath, "Projekt", "bracelet", composite, compression, layers)
+
+    project = projectFile.loadProject(filePath)
+    assert (project["name"], project["size"]) == ("Projekt", (150, 70))
+    assert (project["contents"].toArray() == composite.toArray()).all()
+    assert sorted(project["contents"].tiles) == sorted(composite.tiles)
+    loadedLayer = project["layers"][0]
+    assert (loadedLayer["locked"], loadedLayer["transparentColor"]) == (True, (255, 255, 255))
+    assert (loadedLayer["canvas"].toArray() == layer.toArray()).all()
+
+def isMapped(array: np.ndarray) -> bool:
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap): return True
+        array = array.base
+    return False
+
+def test_raw_tiles_are_memory_mapped(tmp_path):
+    canvas = makeCanvas((200, 0, 0))
+    filePath = str(tmp_path/"project.dpct")
+    projectFile.saveProject(filePath, "Projekt", "bracelet", canvas, projectFile.COMPRESSION_RAW)
+
+    _, mappedBackground, mapped = projectFile.loadPixelIndices(filePath, mmap=True)
+    _, readBackground, read = projectFile.loadPixelIndices(filePath, mmap=False)
+    assert all(isMapped(indices) for indices in mapped.values())
+    assert not any(isMapped(indices) for indices in read.values())
+    assert mappedBackground == readBackground and mapped.keys() == read.keys()
+    assert all((mapped[tile] == read[tile]).all() for tile in read)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import tools.quantize
+
+def makePhoto(width: int, height: int) -> np.ndarray:
+    """Noisy gradients, with far more colors than any palette"""
+    random = np.random.default_rng(1)
+    ys, xs = np.mgrid[0:height, 0:width]
+    pixels = np.stack((xs*255/width, ys*255/height, (xs+ys)*127/(width+height)), axis=2)
+    return np.clip(pixels + random.normal(0, 20, pixels.shape), 0, 255).astype(np.uint8)
+
+def getColors(pixels: np.ndarray) -> set:
+    return set(map(tuple, pixels.reshape(-1, 3).tolist()))
+
+@pytest.mark.parametrize("colorCount", [1, 2, 7, 16])
+def test_palettes_have_at_most_color_count_colors(colorCount):
+    pixels = makePhoto(60, 40)
+    for palette in (tools.quantize.medianCut(pixels, colorCount), tools.quantize.kMeans(pixels, colorCount)):
+        assert palette.dtype == np.uint8 and 0 < len(palette) <= colorCount
+        assert len(getColors(palette)) == len(palette)
+
+def test_palette_of_image_with_few_colors_is_not_padded():
+    pixels = np.zeros((10, 10, 3), dtype=np.uint8)
+    pixels[:, 5:] = (200, 30, 30)
+    assert getColors(tools.quantize.medianCut(pixels, 8)) == {(0, 0, 0), (200, 30, 30)}
+    assert len(tools.quantize.kMeans(pixels, 8)) <= 8
+
+@pytest.mark.parametrize("size", [(1, 1), (9, 1), (1, 9), (41, 23)])
+def test_mapped_and_dithered_images_use_only_palette_colors(size):
+    pixels = makePhoto(*size)
+    palette = tools.quantize.kMeans(pixels, 5)
+    for result in (tools.quantize.mapToPalette(pixels, palette), tools.quantize.floydSteinberg(pixels, palette)):
+        assert result.shape == pixels.shape and result.dtype == np.uint8
+        assert getColors(result) <= getColors(palette)
+
+def test_dithering_keeps_average_color():
+    #flat gray between black and white is dithered to a mix of both in the right ratio
+    pixels = np.full((30, 40, 3), 64, dtype=np.uint8)
+    palette = np.array([(0, 0, 0), (255, 255, 255)], dtype=np.uint8)
+    result = tools.quantize.floydSteinberg(pixels, palette)
+    assert abs(result.mean() - 64) < 2
+    assert (tools.quantize.mapToPalette(pixels, palette) == 0).all()
+
+def test_dithering_image_made_of_palette_colors_changes_nothing():
+    palette = tools.quantize.getCataloguePalette()
+    pixels = palette[np.random.default_rng(2).integers(0, len(palette), (25, 33))]
+    assert (tools.quantize.floydSteinberg(pixels, palette) == pixels).all()
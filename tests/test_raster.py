@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from tools.raster import getLinePoints
+
+def referenceLine(p1: tuple[int, int], p2: tuple[int, int]) -> list:
+    """Plain error-term Bresenham, ties of the minor axis step away from p1"""
+    x, y = p1
+    dx, dy = abs(p2[0]-x), abs(p2[1]-y)
+    sx, sy = (1 if p2[0] >= x else -1), (1 if p2[1] >= y else -1)
+    swapped = dy > dx
+    if swapped: dx, dy = dy, dx
+
+    points = [(x, y)]
+    error = 2*dy - dx
+    for _ in range(dx):
+        if error >= 0:
+            if swapped: x += sx
+            else: y += sy
+            error -= 2*dx
+        error += 2*dy
+        if swapped: y += sy
+        else: x += sx
+        points.append((x, y))
+    return points
+
+#every end point around the start, which covers all 8 octants and the axes between them
+ENDPOINTS = [(x, y) for x in range(-9, 10) for y in range(-9, 10)]
+
+@pytest.mark.parametrize("start", [(0, 0), (3, -5)])
+def test_matches_reference(start):
+    for offset in ENDPOINTS:
+        end = (start[0]+offset[0], start[1]+offset[1])
+        assert getLinePoints(start, end).tolist() == [list(point) for point in referenceLine(start, end)], end
+
+@pytest.mark.parametrize("diagonalSteps", [True, False])
+def test_end_points_included_without_duplicates(diagonalSteps):
+    for end in ENDPOINTS:
+        points = getLinePoints((0, 0), end, diagonalSteps)
+        assert tuple(points[0]) == (0, 0)
+        assert tuple(points[-1]) == end
+        assert len(np.unique(points, axis=0)) == len(points), end
+
+def test_edge_connected_has_no_diagonal_steps():
+    for end in ENDPOINTS:
+        points = getLinePoints((0, 0), end, diagonalSteps=False)
+        steps = np.abs(np.diff(points, axis=0)).sum(axis=1)
+        assert (steps == 1).all(), end
@@ -0,0 +1,53 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#generous compared to ~150ms measured on a desktop, only catches real regressions like an eager editor import
+BUDGET = 1500
+#modules that have to stay unloaded until the user opens a project, settings or a thumbnail is decoded
+LAZYMODULES = ["editor", "settings", "numpy"]
+
+#runs in a fresh interpreter, so modules imported by other tests do not count
+SCRIPT = """
+import sys
+import startupTimer
+
+mark = startupTimer.mark
+def recordModules(phase):
+    if phase == "launcher first paint":
+        print("loaded:" + ",".join(name for name in %r if name in sys.modules))
+    return mark(phase)
+startupTimer.mark = recordModules
+
+from PyQt5.QtWidgets import QApplication
+import launcher
+app = QApplication(sys.argv)
+window = launcher.Launcher()
+window.show()
+while "launcher first paint" not in startupTimer.phases:
+    app.processEvents()
+""" % (LAZYMODULES,)
+
+@pytest.fixture(scope="module")
+def launcherRun() -> tuple[dict, list]:
+    """Phase times and lazy modules loaded at the first paint of the launcher"""
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen", DESIGNER_STARTUP_TIMES="1")
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, env=environment, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+    phases = {phase: float(ms) for phase, ms in re.findall(r"\[startup\] (.+): ([\d.]+)ms", result.stderr)}
+    loaded = re.search(r"loaded:(.*)", result.stdout).group(1)
+    return phases, [name for name in loaded.split(",") if name]
+
+def test_launcher_first_paint_within_budget(launcherRun):
+    phases, _ = launcherRun
+    assert "import" in phases and "launcher first paint" in phases
+    assert phases["launcher first paint"] < BUDGET, phases
+
+def test_heavy_modules_are_not_imported_before_first_paint(launcherRun):
+    _, loaded = launcherRun
+    assert loaded == []
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from tools.symmetry import Symmetry
+
+def getPoints(symmetry: Symmetry, points: list) -> set:
+    return set(map(tuple, symmetry.apply(np.array(points)).tolist()))
+
+@pytest.mark.parametrize("width", [5, 6])
+def test_mirror_flips_around_the_middle(width):
+    symmetry = Symmetry((width, 4), "mirrorX")
+    assert getPoints(symmetry, [(1, 2)]) == {(1, 2), (width-2, 2)}
+
+    symmetry.setMode("mirrorXY")
+    assert getPoints(symmetry, [(1, 0)]) == {(1, 0), (width-2, 0), (1, 3), (width-2, 3)}
+
+@pytest.mark.parametrize("size", [4, 5])
+def test_rotation_of_square_project_maps_every_pixel(size):
+    symmetry = Symmetry((size, size), "rotate4")
+    assert getPoints(symmetry, [(0, 1)]) == {(0, 1), (size-2, 0), (size-1, size-2), (1, size-1)}
+
+    #every pixel is a copy of exactly four pixels, the middle one of an odd project is its own copy
+    pixels = np.array([(x, y) for x in range(size) for y in range(size)])
+    _, counts = np.unique(symmetry.apply(pixels), axis=0, return_counts=True)
+    assert len(counts) == size*size and (counts == 4).all()
+
+def test_rotation_of_rectangle_drops_copies_outside_of_project():
+    symmetry = Symmetry((5, 3), "rotate4")
+    assert getPoints(symmetry, [(2, 0)]) == {(2, 0), (3, 1), (2, 2), (1, 1)}
+    assert getPoints(symmetry, [(0, 1)]) == {(0, 1), (4, 1)}
+
+    #middle of an even by odd project is between pixels, so quarter turns land between them too
+    symmetry.setSize((6, 3))
+    assert getPoints(symmetry, [(2, 0)]) == {(2, 0), (3, 2)}
+
+@pytest.mark.parametrize("width, shifts", [(10, [0, 3, 7]), (9, [0, 3, 6])])
+def test_repeat_wraps_copies_across_width(width, shifts):
+    symmetry = Symmetry((width, 2), repeat=3)
+    assert getPoints(symmetry, [(8, 1)]) == {((8+shift) % width, 1) for shift in shifts}
+
+    symmetry.setMode("mirrorX")
+    assert getPoints(symmetry, [(1, 0)]) == {((x+shift) % width, 0) for x in (1, width-2) for shift in shifts}
+
+def test_points_outside_of_project_are_dropped():
+    symmetry = Symmetry((4, 4), "mirrorXY")
+    assert symmetry.apply(np.array([(-1, 0), (4, 2), (1, 7)])).shape == (0, 2)
+    symmetry.setMode("none")
+    assert getPoints(symmetry, [(-1, 0), (3, 3)]) == {(3, 3)}
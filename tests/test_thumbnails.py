@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+import projectFile
+import thumbnails
+from canvas import Canvas
+
+def requestThumbnails(cache: thumbnails.ThumbnailCache, filePaths: list) -> dict:
+    """Runs the tasks to the end and returns thumbnails announced by them"""
+    ready = {}
+    cache.ready.connect(lambda filePath, image: ready.__setitem__(filePath, image))
+    cache.request(filePaths)
+    cache.pool.waitForDone()
+    #signals of the workers are queued to this thread
+    QCoreApplication.processEvents()
+    return ready
+
+def saveProject(filePath: str, color: tuple[int, int, int], mtime: int) -> None:
+    canvas = Canvas(20, 10, (255, 255, 255))
+    canvas.setPixels(np.array([[3, 3]]), color)
+    projectFile.saveProject(filePath, "Projekt", "bracelet", canvas)
+    os.utime(filePath, ns=(mtime, mtime))
+
+def listCache(directory) -> list:
+    return sorted(os.path.relpath(os.path.join(root, name), directory) for root, _, names in os.walk(directory) for name in names)
+
+def test_only_newest_thumbnail_of_every_project_is_kept(application, tmp_path):
+    cache = thumbnails.ThumbnailCache(directory=str(tmp_path/"cache"))
+    first, second = str(tmp_path/"first.dpct"), str(tmp_path/"second.dpct")
+    saveProject(first, (255, 0, 0), 1_000_000_000)
+    saveProject(second, (0, 0, 255), 1_000_000_000)
+    assert set(requestThumbnails(cache, [first, second])) == {first, second}
+    assert len(listCache(cache.directory)) == 2
+
+    saveProject(first, (0, 255, 0), 2_000_000_000)
+    images = requestThumbnails(cache, [first])
+    assert images[first].pixelColor(8, 8).getRgb()[:3] == (0, 255, 0)
+
+    pathKey, version = thumbnails.getCacheKey(first)
+    secondKey, secondVersion = thumbnails.getCacheKey(second)
+    assert listCache(cache.directory) == sorted([os.path.join(pathKey, version+".png"), os.path.join(secondKey, secondVersion+".png")])
+
+def test_cached_thumbnail_is_not_decoded_again(application, tmp_path, monkeypatch):
+    cache = thumbnails.ThumbnailCache(directory=str(tmp_path/"cache"))
+    filePath = str(tmp_path/"project.dpct")
+    saveProject(filePath, (255, 0, 0), 1_000_000_000)
+    requestThumbnails(cache, [filePath])
+
+    def loadContents(filePath: str):
+        raise AssertionError("project decoded again")
+    monkeypatch.setattr(projectFile, "loadContents", loadContents)
+    assert filePath in requestThumbnails(cache, [filePath])
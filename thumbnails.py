@@ -0,0 +1,108 @@
+# pyright: reportGeneralTypeIssues=false, reportWildcardImportFromLibrary=false
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import hashlib
+import os
+import numpy as np
+
+import projectFile
+from canvas import Canvas
+
+THUMBNAILSIZE = 48
+
+def getCacheDirectory() -> str:
+    return os.path.join(QStandardPaths.writableLocation(QStandardPaths.CacheLocation), "designer", "thumbnails")
+
+def getPathKey(filePath: str) -> str:
+    return hashlib.sha1(os.path.abspath(filePath).encode("utf-8")).hexdigest()
+
+def getCacheKey(filePath: str) -> tuple[str, str]:
+    """Returns key of the project path and key of its version, which changes whenever the project is modified,
+    so stale thumbnails are never shown
+
+    Thumbnails are stored as <path key>/<version key>.png, so older versions of a project are found
+    by listing only its own directory
+    """
+    stat = os.stat(filePath)
+    version = hashlib.sha1(f"{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8")).hexdigest()
+    return getPathKey(filePath), version
+
+def removeStaleThumbnails(projectDirectory: str, version: str) -> None:
+    """Removes thumbnails of older versions of the project from its cache directory"""
+    for fileName in os.listdir(projectDirectory):
+        #temporary files belong to tasks still writing them
+        if fileName == version+".png" or fileName.endswith(".tmp.png"): continue
+        try:
+            os.remove(os.path.join(projectDirectory, fileName))
+        except OSError:
+            pass
+
+def renderThumbnail(canvas: Canvas, size: int = THUMBNAILSIZE) -> QImage:
+    """Scales project to fit size x size, one bead stays one solid block
+
+    Args:
+        canvas (Canvas): Composite of the project
+        size (int, optional): Max width and height. Defaults to THUMBNAILSIZE.
+
+    Returns:
+        QImage: Thumbnail owning its memory
+    """
+    width, height = canvas.size
+    scale = size / max(width, height)
+    thumbnailWidth, thumbnailHeight = max(1, round(width*scale)), max(1, round(height*scale))
+
+    #nearest neighbour sampling keeps bead colors exact
+    rows = (np.arange(thumbnailHeight) * height // thumbnailHeight)
+    columns = (np.arange(thumbnailWidth) * width // thumbnailWidth)
+    thumbnail = canvas.sample(columns, rows)
+
+    return QImage(thumbnail.data, thumbnailWidth, thumbnailHeight, thumbnailWidth*3, QImage.Format_RGB888).copy()
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, cache: "ThumbnailCache", filePath: str) -> None:
+        super().__init__()
+        self.cache = cache
+        self.filePath = filePath
+
+    def run(self) -> None:
+        try:
+            pathKey, version = getCacheKey(self.filePath)
+            projectDirectory = os.path.join(self.cache.directory, pathKey)
+            cachePath = os.path.join(projectDirectory, version + ".png")
+            image = QImage(cachePath)
+            if image.isNull():
+                #legacy pickles hold QPixmaps, which can not be created outside of the GUI thread
+                if projectFile.isLegacyFile(self.filePath): return
+                header, canvas = projectFile.loadContents(self.filePath)
+                image = renderThumbnail(canvas)
+
+                os.makedirs(projectDirectory, exist_ok=True)
+                temporaryPath = cachePath + ".tmp.png"
+                if image.save(temporaryPath):
+                    os.replace(temporaryPath, cachePath)
+                    removeStaleThumbnails(projectDirectory, version)
+        except Exception:
+            return
+
+        self.cache.ready.emit(self.filePath, image)
+
+class ThumbnailCache(QObject):
+    """Generates project thumbnails on a worker pool, every project is decoded once per change
+
+    Thumbnails are stored on disk in a directory of every project path, under a key made of modification
+    time and size, only the newest one of every project is kept
+    """
+
+    #project path, thumbnail
+    ready = pyqtSignal(str, QImage)
+
+    def __init__(self, parent: QObject = None, directory: str = None) -> None:
+        super().__init__(parent)
+        self.directory = directory or getCacheDirectory()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, QThread.idealThreadCount()-1))
+
+    def request(self, filePaths: list) -> None:
+        """Starts loading thumbnails, each one is announced by ready signal, files that fail are skipped"""
+        for filePath in filePaths:
+            self.pool.start(ThumbnailTask(self, filePath))
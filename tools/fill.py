@@ -0,0 +1,77 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable
+import numpy as np
+
+def getMatchMask(data: np.ndarray, color: tuple[int, int, int], tolerance: int = 0) -> np.ndarray:
+    difference = np.abs(data.astype(np.int16) - np.array(color, dtype=np.int16))
+    #maximum of the channels one by one, reducing the short last axis is several times slower
+    return np.maximum(np.maximum(difference[..., 0], difference[..., 1]), difference[..., 2]) <= tolerance
+
+def getRuns(row: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    #starts and inclusive ends of every run of True values in a row
+    edges = np.diff(np.concatenate(([0], row.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+def floodFillRuns(getPixelRow: Callable[[int], np.ndarray], size: tuple[int, int], start: tuple[int, int], tolerance: int = 0, diagonal: bool = False, wrap: bool = False) -> list:
+    """Scanline flood fill working on whole runs of matching pixels instead of single pixels
+
+    Rows are read only when the fill reaches them, so a fill costs as much as the area it covers
+
+    Args:
+        getPixelRow (Callable[[int], np.ndarray]): Returns (width, 3) pixels of a row
+        size (tuple[int, int]): Width and height of the project
+        start (tuple[int, int]): xy coordinates of the seed
+        tolerance (int, optional): Max difference of any channel from seed color. Defaults to 0.
+        diagonal (bool, optional): Use 8-connectivity instead of 4-connectivity. Defaults to False.
+        wrap (bool, optional): Treat first and last column as neighbours. Defaults to False.
+
+    Returns:
+        list: (y, first x, last x) runs of pixels to fill, both ends are included
+    """
+    x, y = start
+    width, height = size
+    seedRow = getPixelRow(y)
+    color = seedRow[x]
+    filled = []
+
+    rows = {}
+    def getRow(rowY: int) -> tuple[list, list, list]:
+        #plain lists, bisect on them is much faster than numpy for single values
+        if rowY not in rows:
+            starts, ends = getRuns(getMatchMask(seedRow if rowY == y else getPixelRow(rowY), color, tolerance))
+            rows[rowY] = starts.tolist(), ends.tolist(), [False]*len(starts)
+        return rows[rowY]
+
+    starts, ends, seen = getRow(y)
+    index = bisect_right(starts, x) - 1
+    seen[index] = True
+    stack = [(y, index)]
+
+    while stack:
+        rowY, index = stack.pop()
+        starts, ends, _ = rows[rowY]
+        runStart, runEnd = starts[index], ends[index]
+        filled.append((rowY, runStart, runEnd))
+
+        reach = 1 if diagonal else 0
+        spans = [(rowY-1, runStart-reach, runEnd+reach), (rowY+1, runStart-reach, runEnd+reach)]
+        if wrap:
+            #parts of spans past the seam continue on the other side of the row
+            spans.append((rowY, runStart-1, runEnd+1))
+            for spanY, spanStart, spanEnd in list(spans):
+                if spanStart < 0: spans.append((spanY, spanStart+width, width-1))
+                if spanEnd >= width: spans.append((spanY, 0, spanEnd-width))
+
+        for neighbourY, spanStart, spanEnd in spans:
+            if not 0 <= neighbourY < height: continue
+            starts, ends, seen = getRow(neighbourY)
+
+            #runs overlapping [spanStart, spanEnd]
+            first = bisect_left(ends, spanStart)
+            last = bisect_right(starts, spanEnd)
+            for neighbour in range(first, last):
+                if seen[neighbour]: continue
+                seen[neighbour] = True
+                stack.append((neighbourY, neighbour))
+
+    return filled
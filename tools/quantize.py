@@ -0,0 +1,218 @@
+import numpy as np
+
+#common opaque seed bead colors, name and RGB
+BEADCATALOGUE = [
+    ("Bialy", (250, 250, 248)),
+    ("Kremowy", (240, 228, 196)),
+    ("Bezowy", (210, 180, 140)),
+    ("Jasnoszary", (192, 192, 192)),
+    ("Szary", (128, 128, 128)),
+    ("Grafitowy", (64, 64, 68)),
+    ("Czarny", (20, 20, 20)),
+    ("Zolty", (250, 220, 40)),
+    ("Cytrynowy", (240, 240, 110)),
+    ("Zloty", (205, 160, 50)),
+    ("Pomaranczowy", (245, 130, 30)),
+    ("Brzoskwiniowy", (250, 180, 140)),
+    ("Czerwony", (200, 25, 30)),
+    ("Wisniowy", (130, 15, 35)),
+    ("Rozowy", (245, 150, 180)),
+    ("Fuksja", (210, 40, 130)),
+    ("Lawendowy", (180, 160, 215)),
+    ("Fioletowy", (100, 40, 140)),
+    ("Granatowy", (25, 35, 95)),
+    ("Niebieski", (30, 90, 190)),
+    ("Blekitny", (120, 180, 230)),
+    ("Turkusowy", (40, 180, 180)),
+    ("Morski", (20, 110, 110)),
+    ("Mietowy", (160, 220, 190)),
+    ("Jasnozielony", (130, 200, 70)),
+    ("Zielony", (30, 140, 60)),
+    ("Butelkowy", (20, 75, 40)),
+    ("Oliwkowy", (120, 120, 40)),
+    ("Brazowy", (110, 65, 30)),
+    ("Czekoladowy", (65, 40, 25)),
+    ("Terakota", (180, 90, 60)),
+    ("Srebrny", (170, 175, 180)),
+]
+
+def getCataloguePalette() -> np.ndarray:
+    return np.array([color for _, color in BEADCATALOGUE], dtype=np.uint8)
+
+def downsample(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Resizes image to width x height by averaging every block of source pixels
+
+    Args:
+        pixels (np.ndarray): (h, w, 3) RGB image
+        width (int): Output width
+        height (int): Output height
+
+    Returns:
+        np.ndarray: (height, width, 3) RGB image
+    """
+    sourceHeight, sourceWidth = pixels.shape[:2]
+    rows = np.arange(height) * sourceHeight // height
+    columns = np.arange(width) * sourceWidth // width
+
+    sums = np.add.reduceat(np.add.reduceat(pixels.astype(np.uint32), rows, axis=0), columns, axis=1)
+
+    #when upscaling, blocks repeat a single source pixel
+    rowSizes = np.maximum(np.diff(np.append(rows, sourceHeight)), 1)
+    columnSizes = np.maximum(np.diff(np.append(columns, sourceWidth)), 1)
+    sizes = np.outer(rowSizes, columnSizes)[:, :, None]
+    return ((sums + sizes//2) // sizes).astype(np.uint8)
+
+def getUniqueColors(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns (n, 3) unique colors, their pixel counts and index of color of every pixel"""
+    flat = pixels.reshape(-1, 3)
+    packed = flat[:, 0].astype(np.uint32) << 16 | flat[:, 1].astype(np.uint32) << 8 | flat[:, 2]
+    colors, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    colors = np.stack((colors >> 16, colors >> 8 & 255, colors & 255), axis=1).astype(np.uint8)
+    return colors, counts, inverse.ravel()
+
+def getColorHistogram(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Groups pixels into 5 bits per channel bins, so that palette search works on at most 32768 colors
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (n, 3) mean color of every non-empty bin and pixel count of each bin
+    """
+    flat = pixels.reshape(-1, 3)
+    bins = (flat[:, 0].astype(np.intp) >> 3) << 10 | (flat[:, 1].astype(np.intp) >> 3) << 5 | flat[:, 2] >> 3
+    counts = np.bincount(bins, minlength=1 << 15)
+    sums = np.stack([np.bincount(bins, weights=flat[:, channel], minlength=1 << 15) for channel in range(3)], axis=1)
+
+    used = counts > 0
+    return sums[used] / counts[used, None], counts[used]
+
+def getNearest(colors: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Returns index of the nearest palette color for each of the colors
+
+    Args:
+        colors (np.ndarray): (n, 3) colors
+        palette (np.ndarray): (k, 3) palette
+
+    Returns:
+        np.ndarray: (n,) palette indices
+    """
+    colors = colors.astype(np.float32)
+    palette = palette.astype(np.float32)
+    #|c-p|^2 without the |c|^2 term, which does not change the argmin
+    distances = (palette**2).sum(axis=1) - 2*colors @ palette.T
+    return distances.argmin(axis=1)
+
+def medianCut(pixels: np.ndarray, colorCount: int) -> np.ndarray:
+    """Splits the color space at weighted medians until there are colorCount boxes
+
+    Args:
+        pixels (np.ndarray): (h, w, 3) RGB image
+        colorCount (int): Max number of colors
+
+    Returns:
+        np.ndarray: (n, 3) palette, n <= colorCount
+    """
+    colors, counts = getColorHistogram(pixels)
+    boxes = [np.arange(len(colors))]
+
+    def getScore(box: np.ndarray) -> float:
+        if len(box) < 2: return -1
+        return float((colors[box].max(axis=0) - colors[box].min(axis=0)).max())
+
+    scores = [getScore(boxes[0])]
+    while len(boxes) < colorCount:
+        index = int(np.argmax(scores))
+        if scores[index] <= 0: break
+        box = boxes[index]
+
+        boxColors = colors[box]
+        channel = int((boxColors.max(axis=0) - boxColors.min(axis=0)).argmax())
+        box = box[np.argsort(boxColors[:, channel], kind="stable")]
+        weights = np.cumsum(counts[box])
+        split = int(np.searchsorted(weights, weights[-1]/2))
+        split = min(max(split, 1), len(box)-1)
+
+        boxes[index], scores[index] = box[:split], getScore(box[:split])
+        boxes.append(box[split:])
+        scores.append(getScore(box[split:]))
+
+    palette = [np.average(colors[box], axis=0, weights=counts[box]) for box in boxes]
+    return np.rint(palette).astype(np.uint8)
+
+def kMeans(pixels: np.ndarray, colorCount: int, iterations: int = 6) -> np.ndarray:
+    """Refines median cut palette with k-means, weighted by pixel count of each color bin
+
+    Returns:
+        np.ndarray: (n, 3) palette, n <= colorCount
+    """
+    colors, counts = getColorHistogram(pixels)
+    palette = medianCut(pixels, colorCount).astype(np.float64)
+    weighted = colors * counts[:, None].astype(np.float64)
+
+    for _ in range(iterations):
+        nearest = getNearest(colors, palette)
+        sizes = np.bincount(nearest, weights=counts, minlength=len(palette))
+        sums = np.stack([np.bincount(nearest, weights=weighted[:, channel], minlength=len(palette)) for channel in range(3)], axis=1)
+        used = sizes > 0
+        palette[used] = sums[used] / sizes[used, None]
+
+    return np.rint(palette).astype(np.uint8)
+
+def limitPalette(pixels: np.ndarray, palette: np.ndarray, colorCount: int) -> np.ndarray:
+    """Keeps colorCount palette colors that are nearest to the most pixels"""
+    colors, counts = getColorHistogram(pixels)
+    usage = np.bincount(getNearest(colors, palette), weights=counts, minlength=len(palette))
+    return palette[np.argsort(-usage, kind="stable")[:colorCount]]
+
+def mapToPalette(pixels: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Replaces every pixel with the nearest palette color"""
+    colors, _, inverse = getUniqueColors(pixels)
+    return palette[getNearest(colors, palette)][inverse].reshape(pixels.shape)
+
+def floydSteinberg(pixels: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Floyd-Steinberg dithering to the palette
+
+    Pixel (x, y) only depends on its left and upper neighbours, so all pixels with
+    the same x + 2y are independent and get processed together as one wavefront.
+    Instead of pushing its error to four neighbours, every pixel pulls errors of the
+    four pixels that diffuse into it, so a wave costs a single gather and a single scatter
+
+    Returns:
+        np.ndarray: (h, w, 3) image using only palette colors
+    """
+    height, width = pixels.shape[:2]
+    #4th channel is 1 for pixels and 0 for errors, so a single product adds squared norms of palette colors to distances
+    paletteFloat = np.zeros((len(palette), 4), dtype=np.float32)
+    paletteFloat[:, :3] = palette
+    paletteFloat[:, 3] = 1
+    distanceMatrix = np.concatenate((-2*paletteFloat[:, :3].T, (paletteFloat[:, :3]**2).sum(axis=1)[None]))
+
+    #pixels padded by one row at the top and one column on both sides, flattened to rows of pixels,
+    #a pixel holds its color until processed and its error afterwards
+    stride = width + 2
+    state = np.zeros((height+1, stride, 4), dtype=np.float32)
+    state[1:, 1:width+1, :3] = pixels
+    state[1:, 1:width+1, 3] = 1
+    state = state.reshape(-1, 4)
+    #each pixel viewed as one 16 byte element, fancy indexing of those is several times faster than of rows
+    stateItems = state.view(np.complex128).ravel()
+
+    #indices of all pixels ordered by wave, together with the pixels every one of them pulls from
+    ys, xs = np.divmod(np.arange(height*width), width)
+    waves = xs + 2*ys
+    order = np.argsort(waves, kind="stable")
+    indices = (ys[order]+1)*stride + xs[order]+1
+    sources = indices[:, None] + np.array([0, -stride-1, -stride, -1, -stride+1])
+    weights = np.array([1, 1/16, 5/16, 7/16, 3/16], dtype=np.float32)
+    nearest = np.empty(len(indices), dtype=np.intp)
+
+    start = 0
+    for end in np.cumsum(np.bincount(waves)).tolist():
+        values = weights @ stateItems[sources[start:end]].view(np.float32).reshape(end-start, 5, 4)
+        np.clip(values, 0, 255, out=values)
+        waveNearest = nearest[start:end] = (values @ distanceMatrix).argmin(axis=1)
+        values -= paletteFloat[waveNearest]
+        stateItems[indices[start:end]] = values.view(np.complex128).ravel()
+        start = end
+
+    result = np.empty(len(state), dtype=np.intp)
+    result[indices] = nearest
+    return palette[result.reshape(height+1, stride)[1:, 1:width+1]]
@@ -0,0 +1,52 @@
+import numpy as np
+
+def getLinePoints(p1: tuple[int, int], p2: tuple[int, int], diagonalSteps: bool = True) -> np.ndarray:
+    """Integer Bresenham line, both end points included, every point appears once
+
+    Args:
+        p1 (tuple[int, int]): Start point
+        p2 (tuple[int, int]): End point
+        diagonalSteps (bool, optional): If False, diagonal steps get an extra pixel so that
+            consecutive beads always share an edge. Defaults to True.
+
+    Returns:
+        np.ndarray: (n, 2) array of xy coordinates ordered from p1 to p2
+    """
+    x1, y1 = int(p1[0]), int(p1[1])
+    x2, y2 = int(p2[0]), int(p2[1])
+    dx, dy = x2 - x1, y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0: return np.array([[x1, y1]], dtype=np.int32)
+
+    #midpoint rounding of the minor axis, the major axis always moves by exactly one
+    step = np.arange(steps+1, dtype=np.int64)
+    xs = x1 + np.sign(dx) * ((2*step*abs(dx) + steps) // (2*steps))
+    ys = y1 + np.sign(dy) * ((2*step*abs(dy) + steps) // (2*steps))
+    points = np.stack((xs, ys), axis=1).astype(np.int32)
+
+    if diagonalSteps: return points
+
+    #insert a corner pixel before every diagonal step
+    diagonal = np.flatnonzero((np.diff(points, axis=0) != 0).all(axis=1))
+    corners = np.stack((points[diagonal+1, 0], points[diagonal, 1]), axis=1)
+    return np.insert(points, diagonal+1, corners, axis=0)
+
+def getBrushOffsets(width: int) -> np.ndarray:
+    """Offsets of all pixels of a round brush with given diameter"""
+    radius = (width - 1) / 2
+    grid = np.arange(-int(radius), int(radius)+1)
+    x, y = np.meshgrid(grid, grid)
+    inside = x**2 + y**2 <= radius**2 + radius
+    return np.stack((x[inside], y[inside]), axis=1).astype(np.int32)
+
+def getThickLinePoints(p1: tuple[int, int], p2: tuple[int, int], width: int, diagonalSteps: bool = True) -> np.ndarray:
+    """Line drawn with a round brush of given width
+
+    Returns:
+        np.ndarray: (n, 2) array of unique xy coordinates, not ordered along the line
+    """
+    points = getLinePoints(p1, p2, diagonalSteps)
+    if width <= 1: return points
+
+    stamped = (points[:, None, :] + getBrushOffsets(width)[None, :, :]).reshape(-1, 2)
+    return np.unique(stamped, axis=0)
@@ -0,0 +1,76 @@
+import numpy as np
+
+class Region:
+    """Part of a layer, mask marks which pixels of its bounding box belong to it
+
+    Selection is a region without pixels, clipboard and floating selection hold a copy of them
+    """
+
+    def __init__(self, position: tuple[int, int], mask: np.ndarray, pixels: np.ndarray | None = None) -> None:
+        self.position = tuple(int(x) for x in position)
+        self.mask = mask
+        self.pixels = pixels
+
+    @classmethod
+    def fromMask(cls, mask: np.ndarray, data: np.ndarray | None = None) -> "Region | None":
+        """Crops (height, width) mask to its bounding box, copying pixels of data under it if given
+
+        Returns:
+            Region | None: Region, None if mask is empty
+        """
+        rows, columns = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0: return None
+
+        box = slice(rows[0], rows[-1]+1), slice(columns[0], columns[-1]+1)
+        pixels = data[box].copy() if data is not None else None
+        return cls((columns[0], rows[0]), mask[box].copy(), pixels)
+
+    @classmethod
+    def fromRuns(cls, runs: list) -> "Region | None":
+        """Region covering (y, first x, last x) runs returned by flood fill, both ends are included
+
+        Returns:
+            Region | None: Region, None if there are no runs
+        """
+        if len(runs) == 0: return None
+        ys, starts, ends = np.array(runs).T
+        left, top = int(starts.min()), int(ys.min())
+        mask = np.zeros((ys.max()-top+1, ends.max()-left+1), dtype=bool)
+        for y, start, end in runs:
+            mask[y-top, start-left:end-left+1] = True
+        return cls((left, top), mask)
+
+    @classmethod
+    def fromRectangle(cls, start: tuple[int, int], end: tuple[int, int], size: tuple[int, int]) -> "Region | None":
+        """Rectangle between two corners, both included, cut to project of given size"""
+        width, height = size
+        left, right = max(min(start[0], end[0]), 0), min(max(start[0], end[0]), width-1)
+        top, bottom = max(min(start[1], end[1]), 0), min(max(start[1], end[1]), height-1)
+        if right < left or bottom < top: return None
+        return cls((left, top), np.ones((bottom-top+1, right-left+1), dtype=bool))
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.mask.shape[1], self.mask.shape[0]
+
+    def moved(self, position: tuple[int, int]) -> "Region":
+        """Same region placed at another position, arrays are shared"""
+        return Region(position, self.mask, self.pixels)
+
+    def contains(self, pixel: tuple[int, int]) -> bool:
+        x, y = pixel[0]-self.position[0], pixel[1]-self.position[1]
+        return 0 <= x < self.size[0] and 0 <= y < self.size[1] and bool(self.mask[y, x])
+
+    def cropped(self, size: tuple[int, int]) -> "Region | None":
+        """Part of the region lying inside of a project of given size, None if there is none"""
+        x, y = self.position
+        width, height = self.size
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x+width, size[0]), min(y+height, size[1])
+        if right <= left or bottom <= top: return None
+
+        box = slice(top-y, bottom-y), slice(left-x, right-x)
+        cropped = Region.fromMask(self.mask[box], self.pixels[box] if self.pixels is not None else None)
+        if cropped is None: return None
+        cropped.position = left+cropped.position[0], top+cropped.position[1]
+        return cropped
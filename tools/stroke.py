@@ -0,0 +1,32 @@
+import numpy as np
+
+from tools.raster import getLinePoints
+
+class Stroke:
+    """Connects consecutive mouse samples of a single stroke with gap-free lines"""
+
+    def __init__(self) -> None:
+        self.lastPoint = None
+
+    def reset(self) -> None:
+        self.lastPoint = None
+
+    def addSamples(self, samples: list) -> np.ndarray:
+        """Returns all pixels between previous sample and each of the new ones
+
+        Args:
+            samples (list): xy coordinates of mouse samples, oldest first
+
+        Returns:
+            np.ndarray: (n, 2) array of xy coordinates, the previous sample is not repeated
+        """
+        segments = []
+        for sample in samples:
+            if self.lastPoint is None:
+                segments.append(np.array([sample], dtype=np.int32))
+            else:
+                segments.append(getLinePoints(self.lastPoint, sample)[1:])
+            self.lastPoint = sample
+
+        if len(segments) == 0: return np.empty((0, 2), dtype=np.int32)
+        return np.concatenate(segments)
@@ -0,0 +1,101 @@
+import numpy as np
+
+#every transform around the middle of the project as (axis new x is taken from, its sign,
+#axis new y is taken from, its sign), axis 0 is x and 1 is y
+TRANSFORMS = {
+    "identity": (0, 1, 1, 1),
+    "mirrorX": (0, -1, 1, 1),
+    "mirrorY": (0, 1, 1, -1),
+    "rotate90": (1, -1, 0, 1),
+    "rotate180": (0, -1, 1, -1),
+    "rotate270": (1, 1, 0, -1),
+    "diagonal": (1, 1, 0, 1),
+    "antidiagonal": (1, -1, 0, -1),
+}
+
+#symmetry mode and transforms that make its group
+MODES = {
+    "none": ["identity"],
+    "mirrorX": ["identity", "mirrorX"],
+    "mirrorY": ["identity", "mirrorY"],
+    "mirrorXY": ["identity", "mirrorX", "mirrorY", "rotate180"],
+    "rotate2": ["identity", "rotate180"],
+    "rotate4": ["identity", "rotate90", "rotate180", "rotate270"],
+    "diagonal": ["identity", "diagonal"],
+    "diagonals": ["identity", "diagonal", "antidiagonal", "rotate180"],
+}
+
+class Symmetry:
+    """Maps painted points to all their symmetric copies
+
+    Mappings of every row and column are precomputed for the project size, so symmetry
+    costs two lookups per transform no matter how many points are painted
+    """
+
+    def __init__(self, size: tuple[int, int], mode: str = "none", repeat: int = 1) -> None:
+        self.size = tuple(size)
+        self.mode = mode
+        self.repeat = repeat
+        self.buildMappings()
+
+    def setSize(self, size: tuple[int, int]) -> None:
+        self.size = tuple(size)
+        self.buildMappings()
+
+    def setMode(self, mode: str) -> None:
+        if mode not in MODES: raise ValueError(f"Unknown symmetry mode {mode}")
+        self.mode = mode
+        self.buildMappings()
+
+    def setRepeat(self, repeat: int) -> None:
+        """Repeats everything painted repeat times across the width of the project"""
+        self.repeat = max(1, repeat)
+        self.buildMappings()
+
+    @property
+    def isActive(self) -> bool:
+        return self.mode != "none" or self.repeat > 1
+
+    def getAxisMapping(self, sourceAxis: int, sign: int, targetLength: int) -> np.ndarray:
+        #coordinates are doubled and centered, so that pixel centers stay integers
+        sourceLength = self.size[sourceAxis]
+        centered = sign * (2*np.arange(sourceLength) - (sourceLength-1))
+        doubled = centered + (targetLength-1)
+        #-1 where the symmetric pixel falls outside of the project or between two pixels
+        valid = (doubled % 2 == 0) & (doubled >= 0) & (doubled <= 2*(targetLength-1))
+        return np.where(valid, doubled//2, -1)
+
+    def buildMappings(self) -> None:
+        width, height = self.size
+        self.mappings = []
+        for name in MODES[self.mode]:
+            xAxis, xSign, yAxis, ySign = TRANSFORMS[name]
+            self.mappings.append((xAxis, self.getAxisMapping(xAxis, xSign, width), yAxis, self.getAxisMapping(yAxis, ySign, height)))
+
+        self.shifts = np.rint(np.arange(self.repeat) * width / self.repeat).astype(np.int64)
+
+    def apply(self, points: np.ndarray) -> np.ndarray:
+        """Returns points together with all their symmetric copies
+
+        Args:
+            points (np.ndarray): (n, 2) array of xy coordinates, points outside of the project are dropped
+
+        Returns:
+            np.ndarray: (m, 2) array of xy coordinates, can contain duplicates
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        width, height = self.size
+        inside = (points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)
+        points = points[inside]
+        if not self.isActive: return points
+
+        copies = []
+        for xAxis, xMapping, yAxis, yMapping in self.mappings:
+            copies.append(np.stack((xMapping[points[:, xAxis]], yMapping[points[:, yAxis]]), axis=1))
+        copies = np.concatenate(copies)
+        copies = copies[(copies >= 0).all(axis=1)]
+        xs, ys = copies[:, 0], copies[:, 1]
+
+        xs = ((xs[None, :] + self.shifts[:, None]) % width).ravel()
+        ys = np.tile(ys, len(self.shifts))
+        return np.stack((xs, ys), axis=1)